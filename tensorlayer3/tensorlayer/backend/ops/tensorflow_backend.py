@@ -7,6 +7,7 @@ import tensorflow as tf
 _dtypeDict = {
     'DType': tf.DType,
     'float16': tf.float16,
+    'bfloat16': tf.bfloat16,
     'float32': tf.float32,
     'float64': tf.float64,
     'int8': tf.int8,
@@ -278,7 +279,7 @@ def dtypes(dt):
     ----------
     dt : string
          It could be 'uint8', 'uint16', 'uint32', 'uint64', 'int8', 'int16',
-         'int32', 'int64', 'float16', 'float32', 'float64', 'DType'.
+         'int32', 'int64', 'float16', 'bfloat16', 'float32', 'float64', 'DType'.
 
     Returns
     -------
@@ -1989,13 +1989,52 @@ class grucell(object):
         h_r, h_z, h_c = tf.split(h_gates, num_or_size_splits=3, axis=-1)
 
         r = self.gate_act_fn(x_r + h_r)
-        z = self.gate_act_fn(x_r + h_z)
+        z = self.gate_act_fn(x_z + h_z)
         c = self.act_fn(x_c + r * h_c)
         h = (h - c) * z + c
 
         return h, h
 
 
+@tf.function(reduce_retracing=True)
+def _lstm_scan(x_gates, h, c, weight_hh):
+
+    def step(states, x_gate):
+        h, c = states
+        gates = x_gate + tf.matmul(h, weight_hh, transpose_b=True)
+        i, f, g, o = tf.split(gates, num_or_size_splits=4, axis=-1)
+        c = tf.sigmoid(f) * c + tf.sigmoid(i) * tf.tanh(g)
+        h = tf.sigmoid(o) * tf.tanh(c)
+        return h, c
+
+    return tf.scan(step, x_gates, initializer=(h, c))
+
+
+@tf.function(reduce_retracing=True)
+def _gru_scan(x_gates, h, weight_hh, bias_hh):
+
+    def step(h, x_gate):
+        h_gates = tf.matmul(h, weight_hh, transpose_b=True) + bias_hh
+        x_r, x_z, x_c = tf.split(x_gate, num_or_size_splits=3, axis=-1)
+        h_r, h_z, h_c = tf.split(h_gates, num_or_size_splits=3, axis=-1)
+        r = tf.sigmoid(x_r + h_r)
+        z = tf.sigmoid(x_z + h_z)
+        c = tf.tanh(x_c + r * h_c)
+        return (h - c) * z + c
+
+    return tf.scan(step, x_gates, initializer=h)
+
+
+@tf.function(reduce_retracing=True)
+def _rnn_scan(x_gates, h, weight_hh, relu=False):
+    act_fn = tf.nn.relu if relu else tf.tanh
+
+    def step(h, x_gate):
+        return act_fn(x_gate + tf.matmul(h, weight_hh, transpose_b=True))
+
+    return tf.scan(step, x_gates, initializer=h)
+
+
 class rnnbase(object):
 
     def __init__(
@@ -2097,110 +2136,66 @@ class rnnbase(object):
         #                 self.bias_bw.append(self.b_ih)
         #                 self.bias_bw.append(self.b_hh)
 
-    def _bi_rnn_forward(self, x, h, c=None):
-        time_step, batch_size, input_size = x.shape
+    def _layer_weights(self, i):
+        """Stack the weights of both directions of layer `i`, the biases are None if not used."""
+
+        weights = [self.weights_fw[2 * i:2 * i + 2]]
+        biases = [self.bias_fw[2 * i:2 * i + 2] if self.bias else (None, None)]
+        if self.bidirect == 2:
+            weights.append(self.weights_bw[2 * i:2 * i + 2])
+            biases.append(self.bias_bw[2 * i:2 * i + 2] if self.bias else (None, None))
+        weight_ih = tf.stack([w[0] for w in weights])
+        weight_hh = tf.stack([w[1] for w in weights])
+        if not self.bias:
+            return weight_ih, weight_hh, None, None
+        return weight_ih, weight_hh, tf.stack([b[0] for b in biases]), tf.stack([b[1] for b in biases])
+
+    def _forward(self, x, h, c=None):
+        """Run all layers and directions.
+
+        For every layer the input-to-hidden projection of all time steps (and both directions) is one batched
+        matmul, and the recurrence runs in a compiled ``tf.scan`` with the directions stacked along the first axis.
+        """
+
         h_out = []
         c_out = []
-        y = []
         pre_layer = x
         for i in range(self.num_layers):
-            weight_ih_fw = self.weights_fw[2 * i]
-            weight_hh_fw = self.weights_fw[2 * i + 1]
-            weight_ih_bw = self.weights_bw[2 * i]
-            weight_hh_bw = self.weights_bw[2 * i + 1]
-            if self.bias:
-                bias_ih_fw = self.bias_fw[2 * i]
-                bias_hh_fw = self.bias_fw[2 * i + 1]
-                bias_ih_bw = self.bias_bw[2 * i]
-                bias_hh_bw = self.bias_bw[2 * i + 1]
-            else:
-                bias_ih_fw = None
-                bias_hh_fw = None
-                bias_ih_bw = None
-                bias_hh_bw = None
-            h_i_fw = h[i, :, :]
-            h_i_bw = h[i + 1, :, :]
             if i != 0 and self.train:
                 pre_layer = tf.nn.dropout(pre_layer, rate=self.dropout)
-            if c is not None:
-                c_i_fw = c[i, :, :]
-                c_i_bw = c[i + 1, :, :]
-                for j in range(time_step):
-                    input = pre_layer[j, :, :]
-                    cell_fw = self.rnn_cell(weight_ih_fw, weight_hh_fw, bias_ih_fw, bias_hh_fw, self.act_fn)
-                    cell_bw = self.rnn_cell(weight_ih_bw, weight_hh_bw, bias_ih_bw, bias_hh_bw, self.act_fn)
-                    bw_input = tf.reverse(input, axis=[0])
-                    step_out_fw, h_i_fw, c_i_fw = cell_fw(input, h_i_fw, c_i_fw)
-                    step_out_bw, h_i_bw, c_i_bw = cell_bw(bw_input, h_i_bw, c_i_bw)
-                    step_out_bw = tf.reverse(step_out_bw, axis=[0])
-                    step_out = tf.concat([step_out_fw, step_out_bw], axis=-1)
-                    y.append(step_out)
-                h_out.append(h_i_fw)
-                h_out.append(h_i_bw)
-                c_out.append(c_i_fw)
-                c_out.append(c_i_bw)
-                pre_layer = tf.stack(y)
-                y = []
+            weight_ih, weight_hh, bias_ih, bias_hh = self._layer_weights(i)
+
+            # [direction, time_step, batch_size, input_size], the backward direction runs on the reversed sequence
+            inputs = tf.stack([pre_layer, tf.reverse(pre_layer, axis=[0])][:self.bidirect])
+            x_gates = tf.einsum('dtbi,dgi->dtbg', inputs, weight_ih)
+            if bias_ih is not None:
+                if self.mode != 'GRU':
+                    # the hidden bias is added outside the reset gate, so it can be folded in
+                    bias_ih = bias_ih + bias_hh
+                    bias_hh = None
+                x_gates += bias_ih[:, None, None, :]
+            x_gates = tf.transpose(x_gates, perm=(1, 0, 2, 3))
+
+            h_i = h[i * self.bidirect:(i + 1) * self.bidirect]
+            if self.mode == 'LSTM':
+                c_i = c[i * self.bidirect:(i + 1) * self.bidirect]
+                ys, cs = _lstm_scan(x_gates, h_i, c_i, weight_hh)
+                c_out.append(cs[-1])
+            elif self.mode == 'GRU':
+                if bias_hh is None:
+                    bias_hh = tf.zeros_like(weight_hh[:, :, 0])
+                ys = _gru_scan(x_gates, h_i, weight_hh, bias_hh[:, None, :])
             else:
-                for j in range(time_step):
-                    input = pre_layer[j, :, :]
-                    cell_fw = self.rnn_cell(weight_ih_fw, weight_hh_fw, bias_ih_fw, bias_hh_fw, self.act_fn)
-                    cell_bw = self.rnn_cell(weight_ih_bw, weight_hh_bw, bias_ih_bw, bias_hh_bw, self.act_fn)
-                    bw_input = tf.reverse(input, axis=[0])
-                    step_out_fw, h_i_fw = cell_fw(input, h_i_fw)
-                    step_out_bw, h_i_bw = cell_bw(bw_input, h_i_bw)
-                    step_out_bw = tf.reverse(step_out_bw, axis=[0])
-                    step_out = tf.concat([step_out_fw, step_out_bw], axis=-1)
-                    y.append(step_out)
-                h_out.append(h_i_fw)
-                h_out.append(h_i_bw)
-                pre_layer = tf.stack(y)
-                y = []
-        h_out = tf.stack(h_out)
-        c_out = tf.stack(c_out) if c is not None else None
+                ys = _rnn_scan(x_gates, h_i, weight_hh, relu=self.act_fn == 'relu')
+            h_out.append(ys[-1])
 
-        return pre_layer, h_out, c_out
-
-    def _rnn_forward(self, x, h, c=None):
-        pre_layer = x
-        h_out = []
-        c_out = []
-        y = []
-        time_step, batch_size, input_size = x.shape
-        for i in range(self.num_layers):
-            weight_ih = self.weights_fw[2 * i]
-            weight_hh = self.weights_fw[2 * i + 1]
-            if self.bias:
-                bias_ih = self.bias_fw[2 * i]
-                bias_hh = self.bias_fw[2 * i + 1]
+            # [time_step, direction, batch_size, hidden_size] -> [time_step, batch_size, direction * hidden_size]
+            if self.bidirect == 2:
+                pre_layer = tf.concat([ys[:, 0], tf.reverse(ys[:, 1], axis=[0])], axis=-1)
             else:
-                bias_ih = None
-                bias_hh = None
-            h_i = h[i, :, :]
-            if i != 0 and self.train:
-                pre_layer = tf.nn.dropout(pre_layer, rate=self.dropout)
-            if c is not None:
-                c_i = c[i, :, :]
-                for j in range(time_step):
-                    input = pre_layer[j, :, :]
-                    cell = self.rnn_cell(weight_ih, weight_hh, bias_ih, bias_hh, self.act_fn)
-                    step_out, h_i, c_i = cell(input, h_i, c_i)
-                    y.append(step_out)
-                h_out.append(h_i)
-                c_out.append(c_i)
-                pre_layer = tf.stack(y)
-                y = []
-            else:
-                for j in range(time_step):
-                    input = pre_layer[j, :, :]
-                    cell = self.rnn_cell(weight_hh, weight_ih, bias_ih, bias_hh, self.act_fn)
-                    step_out, h_i = cell(input, h_i)
-                    y.append(step_out)
-                h_out.append(h_i)
-                pre_layer = tf.stack(y)
-                y = []
-        h_out = tf.stack(h_out)
-        c_out = tf.stack(c_out) if c is not None else None
+                pre_layer = ys[:, 0]
+        h_out = tf.concat(h_out, axis=0)
+        c_out = tf.concat(c_out, axis=0) if c is not None else None
 
         return pre_layer, h_out, c_out
 
@@ -2234,10 +2229,7 @@ class rnnbase(object):
             else:
                 h = tf.zeros(shape=(self.num_layers * self.bidirect, batch_size, self.hidden_size), dtype=input_dtype)
                 c = tf.zeros(shape=(self.num_layers * self.bidirect, batch_size, self.hidden_size), dtype=input_dtype)
-            if self.bidirect == 1:
-                y, new_h, new_c = self._rnn_forward(input, h, c)
-            else:
-                y, new_h, new_c = self._bi_rnn_forward(input, h, c)
+            y, new_h, new_c = self._forward(input, h, c)
             new_states = (new_h, new_c)
         else:
             if states is not None:
@@ -2245,10 +2237,7 @@ class rnnbase(object):
                 self.check_hidden(h, batch_size)
             else:
                 h = tf.zeros(shape=(self.num_layers * self.bidirect, batch_size, self.hidden_size), dtype=input_dtype)
-            if self.bidirect == 1:
-                y, new_h, _ = self._rnn_forward(input, h)
-            else:
-                y, new_h, _ = self._bi_rnn_forward(input, h)
+            y, new_h, _ = self._forward(input, h)
             new_states = new_h
         if self.batch_first:
             y = tf.transpose(y, perm=(1, 0, 2))
@@ -0,0 +1,385 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+tl serve
+========
+
+(Alpha release - usage might change later)
+
+The tensorlayer.cli.serve module provides the ``tl serve`` subcommand.
+It serves a TensorLayer network for inference over HTTP, on a TCP port or a Unix socket.
+
+Concurrent requests are grouped into dynamic batches: the first waiting request opens a batch,
+which is run as soon as it holds ``MAX_BATCH_SIZE`` samples or its oldest request has waited
+``MAX_LATENCY`` milliseconds. A busy server therefore runs large batches, while a lone request
+is answered after at most ``MAX_LATENCY`` milliseconds of waiting.
+
+Usage
+-----
+
+tl serve [-h] [-w WEIGHTS] [--host HOST] [--port PORT] [--unix_socket PATH]
+         [-b MAX_BATCH_SIZE] [-l MAX_LATENCY] [--dtype DTYPE] <model>
+
+.. code-block:: bash
+
+  # model.py defines build_model(), which returns the network
+  tl serve model.py:build_model -w model.npz --port 8000
+
+  # a function of an importable module, served on a Unix socket
+  tl serve my_package.models:build_model -w model.h5 --unix_socket /tmp/tl.sock
+
+  curl -X POST localhost:8000/predict -d '{"inputs": [[0.1, 0.2, 0.3]]}'
+  curl localhost:8000/stats
+
+
+Command-line Arguments
+----------------------
+
+- ``model``: ``<file.py or module>:<function>``, the function is called without arguments and returns the network.
+
+- ``WEIGHTS``: The weights file given to ``network.load_weights()``, its format is decided by its postfix.
+
+- ``HOST``, ``PORT``: The address to listen on. Default ``127.0.0.1:8000``.
+
+- ``PATH``: Listen on this Unix socket instead of a TCP port.
+
+- ``MAX_BATCH_SIZE``: The largest number of samples run in one batch. Default 32.
+
+- ``MAX_LATENCY``: The longest time in milliseconds a request waits for a batch to fill. Default 5.
+
+- ``DTYPE``: The dtype of the inputs. Default float32.
+
+
+Endpoints
+---------
+
+- ``POST /predict``: the body is ``{"inputs": [sample, ...]}``, the reply is ``{"outputs": [output, ...]}``.
+  The samples of one request are always run in the same batch, and only requests whose samples have the same shape
+  are batched together. A body whose inputs are not a list of samples is answered with 400.
+
+- ``GET /stats``: the number of requests and samples, the throughput in samples per second, the mean batch size
+  and the 50th, 90th and 99th percentiles of the request latency in milliseconds.
+
+The statistics are also printed when the server stops.
+
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+__all__ = ['DynamicBatcher', 'load_network']
+
+# put on the queue to stop the worker of a DynamicBatcher
+_STOP = object()
+
+
+class _Request(object):
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.arrival = time.time()
+        self.outputs = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class DynamicBatcher(object):
+    """Groups the inputs of concurrent callers into batches for one predict function.
+
+    Parameters
+    ----------
+    predict_fn : callable
+        Maps a batch of inputs to a batch of outputs, along the first axis. Only requests whose samples have the
+        same shape are grouped into one batch.
+    max_batch_size : int
+        The largest number of samples in one batch. A request with more samples is run alone.
+    max_latency : float
+        The longest time in seconds a request waits for its batch to fill.
+
+    Examples
+    --------
+    >>> batcher = DynamicBatcher(lambda x: network(x).numpy(), max_batch_size=32, max_latency=0.005)
+    >>> y = batcher.predict(x)  # from many threads
+    >>> batcher.stop()
+    >>> print(batcher.stats())
+
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_latency=0.005):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._n_samples = 0
+        self._n_batches = 0
+        self._start = time.time()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def predict(self, inputs):
+        """Run `inputs`, a batch of one or more samples, in the next batch, and return their outputs."""
+
+        if self._worker is None:
+            raise RuntimeError("The batcher is stopped.")
+        inputs = np.asarray(inputs)
+        _check_inputs(inputs)
+        request = _Request(inputs)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.outputs
+
+    def stop(self):
+        """Finish the waiting requests and stop the worker thread."""
+
+        if self._worker is not None:
+            self._queue.put(_STOP)
+            self._worker.join()
+            self._worker = None
+
+    def stats(self):
+        """The throughput and the latency percentiles of the requests answered so far."""
+
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            n_samples, n_batches = self._n_samples, self._n_batches
+        elapsed = time.time() - self._start
+        stats = {
+            'requests': len(latencies),
+            'samples': n_samples,
+            'batches': n_batches,
+            'samples_per_second': n_samples / elapsed if elapsed > 0 else 0.0,
+            'mean_batch_size': n_samples / float(n_batches) if n_batches else 0.0,
+        }
+        for percentile in (50, 90, 99):
+            value = np.percentile(latencies, percentile) if len(latencies) else 0.0
+            stats['latency_p%d_ms' % percentile] = float(value)
+        return stats
+
+    def _run(self):
+        request = self._next_request()
+        while request is not _STOP:
+            batch = [request]
+            size, sample_shape = len(request.inputs), request.inputs.shape[1:]
+            deadline = request.arrival + self.max_latency
+            request = None
+            while size < self.max_batch_size:
+                try:
+                    request = self._next_request(deadline)
+                except queue.Empty:
+                    request = None
+                    break
+                if (request is _STOP or request.inputs.shape[1:] != sample_shape or
+                        size + len(request.inputs) > self.max_batch_size):
+                    # stops the worker after this batch, or opens the next one with a request that does not fit
+                    break
+                batch.append(request)
+                size += len(request.inputs)
+                request = None
+            self._run_batch(batch)
+            if request is None:
+                request = self._next_request()
+
+    def _next_request(self, deadline=None):
+        # a request that cannot be batched fails alone here, it must never stop the worker
+        while True:
+            timeout = None if deadline is None else max(deadline - time.time(), 0)
+            request = self._queue.get(timeout=timeout)
+            if request is _STOP:
+                return request
+            try:
+                _check_inputs(request.inputs)
+                return request
+            except Exception as e:
+                request.error = e
+                request.done.set()
+
+    def _run_batch(self, batch):
+        try:
+            inputs = batch[0].inputs if len(batch) == 1 else np.concatenate([r.inputs for r in batch])
+            outputs = np.asarray(self.predict_fn(inputs))
+            offset = 0
+            for request in batch:
+                request.outputs = outputs[offset:offset + len(request.inputs)]
+                offset += len(request.inputs)
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        now = time.time()
+        with self._lock:
+            self._latencies.extend(now - request.arrival for request in batch)
+            self._n_samples += sum(len(request.inputs) for request in batch)
+            self._n_batches += 1
+        for request in batch:
+            request.done.set()
+
+
+def _check_inputs(inputs):
+    if inputs.ndim < 1:
+        raise ValueError("The inputs should be a batch of samples, but got a %d-d array." % inputs.ndim)
+
+
+def load_network(model, weights=None):
+    """Build the network of a ``<file.py or module>:<function>`` spec, load its weights and switch it to
+    evaluation mode."""
+
+    if ':' not in model:
+        raise ValueError("The model should be given as <file.py or module>:<function>, but got %s" % model)
+    path, fn_name = model.rsplit(':', 1)
+    if path.endswith('.py'):
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(path)
+    network = getattr(module, fn_name)()
+    if weights is not None:
+        network.load_weights(weights)
+    network.set_eval()
+    return network
+
+
+class _PredictHandler(BaseHTTPRequestHandler):
+    # set on the subclass made by _make_handler
+    batcher = None
+    dtype = None
+
+    def do_POST(self):
+        if self.path != '/predict':
+            return self._reply(404, {'error': 'unknown path %s' % self.path})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            inputs = np.asarray(body['inputs'], dtype=self.dtype)
+            _check_inputs(inputs)
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {'error': 'bad request: %s' % e})
+        try:
+            outputs = self.batcher.predict(inputs)
+        except Exception as e:
+            return self._reply(500, {'error': str(e)})
+        self._reply(200, {'outputs': outputs.tolist()})
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self._reply(404, {'error': 'unknown path %s' % self.path})
+        self._reply(200, self.batcher.stats())
+
+    def _reply(self, code, content):
+        data = json.dumps(content).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # the client address of a Unix socket is empty
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super(_UnixHTTPServer, self).get_request()
+        return request, ('unix', 0)
+
+
+def _make_handler(batcher, dtype):
+    return type('PredictHandler', (_PredictHandler, ), {'batcher': batcher, 'dtype': dtype})
+
+
+def _print_stats(stats):
+    print(
+        'Served %d requests, %d samples in %d batches (mean batch size %.1f), %.1f samples/s.' %
+        (stats['requests'], stats['samples'], stats['batches'], stats['mean_batch_size'], stats['samples_per_second'])
+    )
+    print(
+        'Latency p50 %.2f ms, p90 %.2f ms, p99 %.2f ms.' %
+        (stats['latency_p50_ms'], stats['latency_p90_ms'], stats['latency_p99_ms'])
+    )
+
+
+def validate_arguments(args):
+    if args.max_batch_size < 1:
+        print('Value error: the max batch size must be at least 1.')
+        exit(1)
+
+    if args.max_latency < 0:
+        print('Value error: the max latency must not be negative.')
+        exit(1)
+
+    if args.weights is not None and not os.path.exists(args.weights):
+        print('Value error: weights file does not exist')
+        exit(1)
+
+
+def main(args):
+    validate_arguments(args)
+    network = load_network(args.model, args.weights)
+    import tensorlayer as tl
+
+    def predict_fn(inputs):
+        return tl.ops.convert_to_numpy(network(inputs))
+
+    batcher = DynamicBatcher(predict_fn, max_batch_size=args.max_batch_size, max_latency=args.max_latency / 1000.0)
+    handler = _make_handler(batcher, args.dtype)
+    if args.unix_socket:
+        if os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+        server = _UnixHTTPServer(args.unix_socket, handler)
+        print('Serving %s on unix socket %s ...' % (args.model, args.unix_socket))
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        server.daemon_threads = True
+        print('Serving %s on http://%s:%d ...' % (args.model, args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # https://docs.python.org/3/library/exceptions.html#KeyboardInterrupt
+        print('Keyboard interrupt received')
+    finally:
+        server.server_close()
+        batcher.stop()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+        _print_stats(batcher.stats())
+        print('END')
+
+
+def build_arg_parser(parser):
+    parser.add_argument('-w', '--weights', dest='weights', default=None, help='weights file of the model')
+    parser.add_argument('--host', dest='host', default='127.0.0.1', help='host to listen on')
+    parser.add_argument('--port', dest='port', type=int, default=8000, help='port to listen on')
+    parser.add_argument('--unix_socket', dest='unix_socket', default=None, help='listen on this unix socket instead')
+    parser.add_argument(
+        '-b', '--max_batch_size', dest='max_batch_size', type=int, default=32, help='max number of samples in a batch'
+    )
+    parser.add_argument(
+        '-l', '--max_latency', dest='max_latency', type=float, default=5.0,
+        help='max milliseconds a request waits for its batch to fill'
+    )
+    parser.add_argument('--dtype', dest='dtype', default='float32', help='dtype of the inputs')
+    parser.add_argument('model', help='<file.py or module>:<function> returning the network')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    build_arg_parser(parser)
+    args = parser.parse_args()
+    main(args)
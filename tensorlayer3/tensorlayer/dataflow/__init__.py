@@ -18,3 +18,5 @@ elif BACKEND == 'dragon':
 
 else:
     raise NotImplementedError("This backend is not supported")
+
+from .bucketing import *
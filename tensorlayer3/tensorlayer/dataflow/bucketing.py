@@ -0,0 +1,103 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+__all__ = [
+    'BucketBatch',
+]
+
+
+class BucketBatch(object):
+    """Batches variable-length sequences by length under a token budget,
+    see :func:`tensorlayer.prepro.bucket_sequences`.
+
+    Each batch is padded only to its longest sequence and is a contiguous numpy array, with a mask which is 1 for
+    the tokens and 0 for padding. Iterating again starts a new epoch, which is shuffled again if `shuffle` is True.
+    It can be iterated directly, or wrapped with ``tl.dataflow.FromGenerator``.
+
+    Parameters
+    ----------
+    sequences : list of list of int or list of numpy.array
+        All sequences where each row is a sequence.
+    labels : list, numpy.array or None
+        The labels of the sequences, which are batched along with them. Default None.
+    bucket_boundaries : list of int or None
+        The upper bounds (exclusive) of the sequence lengths of the buckets, in increasing order.
+    max_tokens : int
+        The largest number of tokens (including padding) in a batch.
+    max_batch_size : int or None
+        The largest number of sequences in a batch.
+    dtype : numpy.dtype or str
+        Data type of the sequence batches.
+    padding : str
+        Either 'pre' or 'post', pad either before or after each sequence.
+    value : float
+        Value to pad the sequences to the desired value.
+    shuffle : boolean
+        Whether to shuffle the batches at the start of every epoch.
+    seed : int or None
+        The random seed of the first epoch.
+
+    Examples
+    ----------
+    >>> train_batches = tl.dataflow.BucketBatch(
+    ...     X_train, y_train, bucket_boundaries=[64, 128, 256], max_tokens=8192, shuffle=True
+    ... )
+    >>> for epoch in range(n_epoch):
+    >>>     for X_batch, mask, y_batch in train_batches:
+    >>>         ...
+
+    """
+
+    def __init__(
+        self, sequences, labels=None, bucket_boundaries=None, max_tokens=4096, max_batch_size=None, dtype='int32',
+        padding='post', value=0, shuffle=False, seed=None
+    ):
+        if labels is not None and len(labels) != len(sequences):
+            raise ValueError("There are {} labels for {} sequences.".format(len(labels), len(sequences)))
+        self.sequences = sequences
+        self.labels = np.asarray(labels) if labels is not None else None
+        self.bucket_boundaries = bucket_boundaries
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.dtype = dtype
+        self.padding = padding
+        self.value = value
+        self.shuffle = shuffle
+        self.seed = seed
+        self._epoch = 0
+        self._n_batches = None
+
+    def __iter__(self):
+        # tensorlayer.prepro is imported lazily, it pulls in scipy and scikit-image
+        from tensorlayer.prepro import bucket_sequences
+
+        seed = None
+        if self.shuffle:
+            seed = None if self.seed is None else self.seed + self._epoch
+            self._epoch += 1
+        batches = bucket_sequences(
+            self.sequences, bucket_boundaries=self.bucket_boundaries, max_tokens=self.max_tokens,
+            max_batch_size=self.max_batch_size, dtype=self.dtype, padding=self.padding, value=self.value,
+            shuffle=self.shuffle, seed=seed
+        )
+        for x, mask, indices in batches:
+            if self.labels is None:
+                yield x, mask
+            else:
+                yield x, mask, self.labels[indices]
+
+    def __call__(self):
+        return iter(self)
+
+    def __len__(self):
+        # the number of batches does not depend on the shuffled order
+        if self._n_batches is None:
+            from tensorlayer.prepro import _bucket_batch_indices
+
+            lengths = np.array([len(s) for s in self.sequences], dtype=np.int64)
+            self._n_batches = len(
+                _bucket_batch_indices(lengths, self.bucket_boundaries, self.max_tokens, self.max_batch_size)
+            )
+        return self._n_batches
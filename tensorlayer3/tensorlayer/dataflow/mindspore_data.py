@@ -4,6 +4,8 @@
 import mindspore.dataset as ds
 import mindspore as ms
 from enum import Enum
+import numpy as np
+from .parallel_loader import ParallelLoader
 __all__ = [
     'Batch',
     'Concat',
@@ -119,7 +121,23 @@ def Zip(datasets):
     return ds.zip(datasets)
 
 
-def Dataloader(dataset, batch_size, shuffle=False, drop_last=False, shuffle_buffer_size=10000):
+def Dataloader(dataset, batch_size, shuffle=False, drop_last=False, shuffle_buffer_size=10000, num_workers=0):
+
+    if num_workers > 0:
+        if isinstance(dataset, ds.Dataset):
+            raise TypeError(
+                "num_workers > 0 requires a map-style tl.dataflow.Dataset, "
+                "pass the dataset directly instead of wrapping it with FromGenerator."
+            )
+        loader = ParallelLoader(dataset, batch_size, shuffle=shuffle, drop_last=drop_last, num_workers=num_workers)
+
+        def generator():
+            # the shared-memory slot is reused for later batches, so it is copied once when handed over
+            for batch in loader:
+                yield tuple(np.array(field) for field in batch) if loader.is_tuple else (np.array(batch), )
+
+        column_names = ['column_{}'.format(i) for i in range(len(loader.specs))]
+        return ds.GeneratorDataset(source=generator, column_names=column_names, shuffle=False)
 
     if shuffle:
         dataset = Shuffle(dataset, buffer_size=shuffle_buffer_size)
@@ -73,9 +73,12 @@ def Zip(datasets):
     return paddle.io.ComposeDataset(list(datasets))
 
 
-def Dataloader(dataset, batch_size=None, shuffle=False, drop_last=False, shuffle_buffer_size=0):
+def Dataloader(dataset, batch_size=None, shuffle=False, drop_last=False, shuffle_buffer_size=0, num_workers=0):
 
-    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, drop_last=drop_last, return_list=True)
+    return DataLoader(
+        dataset, batch_size=batch_size, shuffle=shuffle, drop_last=drop_last, return_list=True, num_workers=num_workers,
+        use_shared_memory=True
+    )
 
 
 def Batch(dataset, batch_size, drop_last=False):
@@ -0,0 +1,202 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import queue
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+__all__ = [
+    'ParallelLoader',
+]
+
+
+class ParallelLoader(object):
+    """Load mini-batches of a map-style dataset with a pool of worker processes.
+
+    Each worker calls `dataset[index]` (including any transforms) for the samples of a batch and
+    writes them straight into a slot of a shared-memory ring buffer, so the collated batch never
+    has to be pickled back to the main process. Iterating yields the batches in order as numpy
+    arrays which are views of the ring buffer: a batch is valid until the next one is requested,
+    so consumers that keep batches around must copy them.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        A map-style dataset implementing `__getitem__` and `__len__`. Every sample must have the same
+        shape, and be a numpy array (or scalar) or a tuple of them.
+    batch_size : int
+        Sample number in a mini-batch.
+    shuffle : boolean
+        Whether to shuffle the sample order at the start of every epoch.
+    drop_last : boolean
+        Whether to drop the last incomplete batch.
+    num_workers : int
+        Number of worker processes.
+    prefetch_factor : int
+        Number of batches loaded in advance per worker, this is also the number of ring buffer slots per worker.
+
+    Examples
+    ----------
+    >>> loader = ParallelLoader(train_dataset, batch_size=128, shuffle=True, num_workers=4)
+    >>> for X_batch, y_batch in loader:
+    >>>     ...
+
+    """
+
+    def __init__(self, dataset, batch_size, shuffle=False, drop_last=False, num_workers=1, prefetch_factor=2):
+        if not isinstance(num_workers, int) or num_workers < 1:
+            raise ValueError("num_workers should be a positive integer, but got {}.".format(num_workers))
+        if not isinstance(prefetch_factor, int) or prefetch_factor < 1:
+            raise ValueError("prefetch_factor should be a positive integer, but got {}.".format(prefetch_factor))
+        if len(dataset) == 0:
+            raise ValueError("The dataset is empty.")
+
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.num_workers = num_workers
+        self.prefetch_factor = prefetch_factor
+
+        # the layout of a batch is taken from the first sample
+        sample = dataset[0]
+        self.is_tuple = isinstance(sample, (tuple, list))
+        fields = sample if self.is_tuple else (sample, )
+        self.specs = [(np.shape(field), np.asarray(field).dtype) for field in fields]
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.dataset) // self.batch_size
+        return (len(self.dataset) + self.batch_size - 1) // self.batch_size
+
+    def _batch_indices(self):
+        n = len(self.dataset)
+        indices = np.random.permutation(n) if self.shuffle else np.arange(n)
+        return [indices[i:i + self.batch_size] for i in range(0, len(self) * self.batch_size, self.batch_size)]
+
+    def __iter__(self):
+        batches = self._batch_indices()
+        n_slots = self.num_workers * self.prefetch_factor
+        slot_nbytes = [self.batch_size * int(np.prod(shape)) * dtype.itemsize for shape, dtype in self.specs]
+
+        ctx = multiprocessing.get_context()
+        index_queue = ctx.Queue()
+        result_queue = ctx.Queue()
+        buffers = [
+            [shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+             for nbytes in slot_nbytes]
+            for _ in range(n_slots)
+        ]
+        workers = []
+        try:
+            for _ in range(self.num_workers):
+                worker = ctx.Process(
+                    target=_worker_loop, args=(
+                        self.dataset, self.specs, self.batch_size, [[shm.name for shm in slot] for slot in buffers],
+                        index_queue, result_queue
+                    )
+                )
+                worker.daemon = True
+                worker.start()
+                workers.append(worker)
+
+            views = [self._slot_views(slot) for slot in buffers]
+            batch = None
+            free_slots = list(range(n_slots))
+            ready = {}
+            n_sent = 0
+            for n_received in range(len(batches)):
+                while free_slots and n_sent < len(batches):
+                    index_queue.put((n_sent, free_slots.pop(), batches[n_sent]))
+                    n_sent += 1
+                while n_received not in ready:
+                    ready.update([_get_result(result_queue, workers)])
+                slot, n = ready.pop(n_received)
+                batch = [view[:n] for view in views[slot]]
+                yield tuple(batch) if self.is_tuple else batch[0]
+                free_slots.append(slot)
+        finally:
+            for _ in workers:
+                index_queue.put(None)
+            for worker in workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+            views = batch = None
+            _close_buffers(buffers, unlink=True)
+
+    def _slot_views(self, slot):
+        return [
+            np.ndarray((self.batch_size, ) + tuple(shape), dtype=dtype, buffer=shm.buf)
+            for shm, (shape, dtype) in zip(slot, self.specs)
+        ]
+
+
+def _close_buffers(buffers, unlink=False):
+    for slot in buffers:
+        for shm in slot:
+            try:
+                shm.close()
+            except BufferError:
+                # a batch is still referenced by the consumer, the mapping is freed with it
+                pass
+            if unlink:
+                shm.unlink()
+
+
+def _get_result(result_queue, workers):
+    while True:
+        try:
+            batch_id, slot, result = result_queue.get(timeout=5)
+        except queue.Empty:
+            if not all(worker.is_alive() for worker in workers):
+                raise RuntimeError("A dataloader worker exited unexpectedly.")
+            continue
+        if isinstance(result, str):
+            raise RuntimeError("Error in dataloader worker:\n" + result)
+        return batch_id, (slot, result)
+
+
+def _worker_loop(dataset, specs, batch_size, shm_names, index_queue, result_queue):
+    buffers = [[shared_memory.SharedMemory(name=name) for name in slot] for slot in shm_names]
+    views = [
+        [
+            np.ndarray((batch_size, ) + tuple(shape), dtype=dtype, buffer=shm.buf)
+            for shm, (shape, dtype) in zip(slot, specs)
+        ]
+        for slot in buffers
+    ]
+    try:
+        while True:
+            task = index_queue.get()
+            if task is None:
+                break
+            batch_id, slot, indices = task
+            try:
+                for i, index in enumerate(indices):
+                    sample = dataset[index]
+                    fields = sample if isinstance(sample, (tuple, list)) else (sample, )
+                    if len(fields) != len(specs):
+                        raise ValueError(
+                            "Expected {} fields per sample, but got {} for index {}.".format(
+                                len(specs), len(fields), index
+                            )
+                        )
+                    for view, field in zip(views[slot], fields):
+                        if np.shape(field) != view.shape[1:]:
+                            raise ValueError(
+                                "All samples should have the same shape, but got {} and {} for index {}.".format(
+                                    view.shape[1:], np.shape(field), index
+                                )
+                            )
+                        # collate in place instead of stacking and copying
+                        view[i] = field
+                result_queue.put((batch_id, slot, len(indices)))
+            except Exception:
+                result_queue.put((batch_id, slot, traceback.format_exc()))
+    finally:
+        views = view = None
+        _close_buffers(buffers)
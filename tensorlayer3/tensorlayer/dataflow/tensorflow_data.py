@@ -4,6 +4,7 @@
 import tensorflow as tf
 import tensorlayer as tl
 import numpy as np
+from .parallel_loader import ParallelLoader
 __all__ = [
     'Batch',
     'Concat',
@@ -305,13 +306,13 @@ def Zip(datasets):
     return tf.data.Dataset.zip(datasets)
 
 
-def Dataloader(dataset, batch_size, shuffle=False, drop_last=False, shuffle_buffer_size=10000):
+def Dataloader(dataset, batch_size, shuffle=False, drop_last=False, shuffle_buffer_size=10000, num_workers=0):
     """ Creates a Datasetloader to trian network. We recommend using this function.
 
     Parameters
     ----------
     dataset : Dataset
-        the dataset to load data from.
+        the dataset to load data from. A map-style :class:`Dataset` is required when `num_workers` > 0.
     batch_size: int or None
         sample number in a mini-batch.
     shuffle: boolean
@@ -320,6 +321,9 @@ def Dataloader(dataset, batch_size, shuffle=False, drop_last=False, shuffle_buff
         whether drop the last incomplete batch dataset size is not divisible by the batch size.
     shuffle_buffer_size: int
         The number of elements from this dataset from which the new dataset will sample. This parameter not support in Paddle backend.
+    num_workers: int
+        Number of worker processes which run `dataset.__getitem__` (and its transforms) in parallel and
+        collate the batches in shared memory. If 0, the data is loaded in the main process. Default 0.
 
     Returns
     -------
@@ -347,8 +351,32 @@ def Dataloader(dataset, batch_size, shuffle=False, drop_last=False, shuffle_buff
     >>> train_dataset = tl.dataflow.FromGenerator(train_dataset, output_types=[tl.float32, tl.int64], column_names=['data', 'label'])
     >>> train_dataloader = tl.dataflow.Dataloader(train_dataset, batch_size=128, shuffle=True, drop_last=False, shuffle_buffer_size=2000)
 
+    Load the samples with 4 worker processes, the map-style dataset is passed directly
+
+    >>> train_dataset = mnistdataset(data = X_train, label = y_train ,transform = transform)
+    >>> train_dataloader = tl.dataflow.Dataloader(train_dataset, batch_size=128, shuffle=True, num_workers=4)
+
     """
 
+    if num_workers > 0:
+        if isinstance(dataset, tf.data.Dataset):
+            raise TypeError(
+                "num_workers > 0 requires a map-style tl.dataflow.Dataset, "
+                "pass the dataset directly instead of wrapping it with FromGenerator."
+            )
+        loader = ParallelLoader(dataset, batch_size, shuffle=shuffle, drop_last=drop_last, num_workers=num_workers)
+        output_signature = tuple(tf.TensorSpec((None, ) + tuple(shape), dtype) for shape, dtype in loader.specs)
+        if not loader.is_tuple:
+            output_signature = output_signature[0]
+
+        def generator():
+            # tensorflow may alias the numpy buffer, so the shared-memory slot is copied once before it is reused
+            for batch in loader:
+                yield tuple(np.array(field) for field in batch) if loader.is_tuple else np.array(batch)
+
+        dataset = tf.data.Dataset.from_generator(generator, output_signature=output_signature)
+        return dataset.prefetch(buffer_size=tf.data.experimental.AUTOTUNE)
+
     if shuffle:
         dataset = Shuffle(dataset, buffer_size=shuffle_buffer_size)
 
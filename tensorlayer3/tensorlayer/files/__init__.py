@@ -68,6 +68,10 @@ __all__ = [
     'save_ckpt',
     'save_npz',
     'save_npz_dict',
+    'save_tlw',
+    'load_tlw',
+    'load_and_assign_tlw',
+    'AsyncCheckpointer',
     'load_and_assign_ckpt',
     'ckpt_to_npz_dict'
     #'save_graph',
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import base64
+import bisect
 import datetime
 import gzip
 import json
@@ -10,9 +11,11 @@ import os
 import pickle
 import re
 import shutil
+import struct
 # import ast
 import sys
 import tarfile
+import threading
 import time
 import zipfile
 
@@ -72,6 +75,10 @@ __all__ = [
     'save_ckpt',
     'save_npz',
     'save_npz_dict',
+    'save_tlw',
+    'load_tlw',
+    'load_and_assign_tlw',
+    'AsyncCheckpointer',
     'tf_variables_to_numpy',
     'ms_variables_to_numpy',
     'assign_tf_variable',
@@ -2090,7 +2097,8 @@ def load_and_assign_npz(name=None, network=None):
 def save_npz_dict(save_list=None, name='model.npz'):
     """Input parameters and the file name, save parameters as a dictionary into .npz file.
 
-    Use ``tl.files.load_and_assign_npz_dict()`` to restore.
+    Use ``tl.files.load_and_assign_npz_dict()`` to restore. The parameters are converted and written one at
+    a time, so saving never holds a second copy of the whole model.
 
     Parameters
     ----------
@@ -2102,22 +2110,16 @@ def save_npz_dict(save_list=None, name='model.npz'):
     """
     if save_list is None:
         save_list = []
-
-    save_list_names = [tensor.name for tensor in save_list]
-    if tl.BACKEND == 'tensorflow':
-        save_list_var = tf_variables_to_numpy(save_list)
-    elif tl.BACKEND == 'mindspore':
-        save_list_var = ms_variables_to_numpy(save_list)
-    elif tl.BACKEND == 'paddle':
-        save_list_var = pd_variables_to_numpy(save_list)
-    else:
-        raise NotImplementedError('Not implemented')
-    save_var_dict = {save_list_names[idx]: val for idx, val in enumerate(save_list_var)}
-    np.savez(name, **save_var_dict)
-    save_list_var = None
-    save_var_dict = None
-    del save_list_var
-    del save_var_dict
+    if not name.endswith('.npz'):
+        name = name + '.npz'
+
+    # the same layout as np.savez, but every tensor is converted and written on its own
+    with zipfile.ZipFile(name, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as z:
+        for tensor in save_list:
+            array = _variables_to_numpy(tensor)[0]
+            with z.open(tensor.name + '.npy', 'w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(array))
+            array = None
     logging.info("[*] Model saved in npz_dict %s" % name)
 
 
@@ -2139,33 +2141,437 @@ def load_and_assign_npz_dict(name='model.npz', network=None, skip=False):
         logging.error("file {} doesn't exist.".format(name))
         return False
 
-    weights = np.load(name, allow_pickle=True)
-    if len(weights.keys()) != len(set(weights.keys())):
-        raise Exception("Duplication in model npz_dict %s" % name)
+    weights = _load_npz_arrays(name)
+    _assign_weights_by_name(weights.items(), network, skip)
 
-    net_weights_name = [w.name for w in network.all_weights]
+    logging.info("[*] Model restored from npz_dict %s" % name)
 
-    for key in weights.keys():
-        if key not in net_weights_name:
+
+def _load_npz_arrays(name):
+    """Read the arrays of a `.npz` file by name.
+
+    The members written by ``np.savez`` are stored uncompressed, so they are memory-mapped in place instead
+    of being read through ``np.load`` one zip member at a time. Other members fall back to ``np.load``.
+    """
+    arrays = {}
+    npz = None
+    mapping = np.memmap(name, dtype=np.uint8, mode='r')
+    with open(name, 'rb') as f, zipfile.ZipFile(f) as z:
+        for info in z.infolist():
+            key = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if key in arrays:
+                raise Exception("Duplication in model npz_dict %s" % name)
+            if info.compress_type == zipfile.ZIP_STORED:
+                # skip the local file header to the .npy data
+                f.seek(info.header_offset + 26)
+                filename_size, extra_size = struct.unpack('<HH', f.read(4))
+                f.seek(info.header_offset + 30 + filename_size + extra_size)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                elif version == (2, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                else:
+                    dtype = np.dtype(object)
+                if not dtype.hasobject:
+                    start = f.tell()
+                    array = mapping[start:start + int(np.prod(shape)) * dtype.itemsize].view(dtype)
+                    arrays[key] = array.reshape(shape[::-1]).T if fortran_order else array.reshape(shape)
+                    continue
+            if npz is None:
+                npz = np.load(name, allow_pickle=True)
+            arrays[key] = npz[key]
+    return arrays
+
+
+def _weights_by_name(network):
+    """Return the weights of the network by name.
+
+    The index is cached on the network and only rebuilt when its list of weights changes. If several weights
+    share a name, the first one is used.
+    """
+    weights = network.all_weights
+    key = tuple(id(w) for w in weights)
+    cache = getattr(network, '_weights_by_name_cache', None)
+    if cache is None or cache[0] != key:
+        cache = (key, {w.name: w for w in reversed(weights)})
+        network._weights_by_name_cache = cache
+    return cache[1]
+
+
+def _assign_weights_by_name(items, network, skip=False):
+    """Assign the (name, array) pairs of `items` to the weights of the network with the same name."""
+
+    net_weights = _weights_by_name(network)
+    for key, value in items:
+        if key not in net_weights:
             if skip:
                 logging.warning("Weights named '%s' not found in network. Skip it." % key)
-            else:
-                raise RuntimeError(
-                    "Weights named '%s' not found in network. Hint: set argument skip=Ture "
-                    "if you want to skip redundant or mismatch weights." % key
-                )
+                continue
+            raise RuntimeError(
+                "Weights named '%s' not found in network. Hint: set argument skip=Ture "
+                "if you want to skip redundant or mismatch weights." % key
+            )
+        if tl.BACKEND == 'tensorflow':
+            assign_tf_variable(net_weights[key], value)
+        elif tl.BACKEND == 'mindspore':
+            assign_ms_variable(net_weights[key], Tensor(value, dtype=ms.float32))
+        elif tl.BACKEND == 'paddle':
+            assign_pd_variable(net_weights[key], value)
         else:
-            if tl.BACKEND == 'tensorflow':
-                assign_tf_variable(network.all_weights[net_weights_name.index(key)], weights[key])
-            elif tl.BACKEND == 'mindspore':
-                assign_param = Tensor(weights[key], dtype=ms.float32)
-                assign_ms_variable(network.all_weights[net_weights_name.index(key)], assign_param)
-            elif tl.BACKEND == 'paddle':
-                assign_pd_variable(network.all_weights[net_weights_name.index(key)], weights[key])
-            else:
-                raise NotImplementedError('Not implemented')
+            raise NotImplementedError('Not implemented')
 
-    logging.info("[*] Model restored from npz_dict %s" % name)
+
+_TLW_MAGIC = b'TLW\x00'
+_TLW_VERSION = 1
+# an index file which only lists the shards of a sharded checkpoint
+_TLW_SHARDED_VERSION = 2
+_TLW_ALIGNMENT = 64
+
+
+def _tlw_align(offset):
+    return (offset + _TLW_ALIGNMENT - 1) // _TLW_ALIGNMENT * _TLW_ALIGNMENT
+
+
+def _variables_to_numpy(variables):
+    if tl.BACKEND == 'tensorflow':
+        return tf_variables_to_numpy(variables)
+    elif tl.BACKEND == 'mindspore':
+        return ms_variables_to_numpy(variables)
+    elif tl.BACKEND == 'paddle':
+        return pd_variables_to_numpy(variables)
+    else:
+        raise NotImplementedError("This backend is not supported")
+
+
+def save_tlw(save_list=None, name='model.tlw', max_shard_size=None):
+    """Input parameters and the file name, save parameters into a flat `.tlw` file.
+
+    The raw bytes of every tensor are written one after another, each aligned to 64 bytes, followed by an
+    index of the name, dtype, shape and offset of every tensor. The tensors are converted and written one at
+    a time, so saving never holds a second copy of the whole model. Use ``tl.files.load_and_assign_tlw()``
+    to restore.
+
+    Parameters
+    ----------
+    save_list : list of parameters
+        A list of parameters (tensor) to be saved.
+    name : str
+        The name of the `.tlw` file.
+    max_shard_size : int or None
+        If given, the tensors are split into shard files next to `name`, named ``<name>-00001.tlw``,
+        ``<name>-00002.tlw`` and so on, and `name` only holds the list of shards and which shard every tensor
+        is in. A shard is closed as soon as it holds `max_shard_size` bytes, so it may exceed it by its last
+        tensor. ``tl.files.load_tlw()`` reads sharded and single files alike. Default None, one file.
+
+    Examples
+    --------
+    >>> tl.files.save_tlw(network.all_weights, name='model.tlw')
+    >>> tl.files.load_and_assign_tlw(name='model.tlw', network=network)
+
+    Save into shards of at most about 1 GB
+
+    >>> tl.files.save_tlw(network.all_weights, name='model.tlw', max_shard_size=2**30)
+    >>> network.load_weights('model.tlw')
+
+    """
+    if save_list is None:
+        save_list = []
+
+    named_arrays = ((tensor.name, _variables_to_numpy(tensor)[0]) for tensor in save_list)
+    if max_shard_size is None:
+        _write_tlw(name, named_arrays)
+    else:
+        _write_tlw_shards(name, named_arrays, max_shard_size)
+    logging.info("[*] Model saved in tlw %s" % name)
+
+
+def _write_tlw_shards(name, named_arrays, max_shard_size):
+    """Write the (name, array) pairs of `named_arrays` into `.tlw` shards of about `max_shard_size` bytes,
+    and the list of shards into `name`."""
+
+    if max_shard_size <= 0:
+        raise ValueError("max_shard_size should be positive, but got {}.".format(max_shard_size))
+    save_dir, file_name = os.path.split(name)
+    root = file_name[:-len('.tlw')] if file_name.endswith('.tlw') else file_name
+    named_arrays = iter(named_arrays)
+    shards = []
+    weight_map = {}
+    state = {'exhausted': False, 'count': 0}
+
+    def shard_arrays():
+        size = 0
+        for key, array in named_arrays:
+            weight_map[key] = len(shards)
+            state['count'] += 1
+            size += np.asarray(array).nbytes
+            yield key, array
+            array = None
+            if size >= max_shard_size:
+                return
+        state['exhausted'] = True
+
+    while not state['exhausted']:
+        shard = '%s-%05d.tlw' % (root, len(shards) + 1)
+        state['count'] = 0
+        _write_tlw(os.path.join(save_dir, shard), shard_arrays())
+        if state['count'] == 0:
+            # the previous shard happened to end with the last tensor
+            os.remove(os.path.join(save_dir, shard))
+            break
+        shards.append(shard)
+
+    _write_tlw(name, (), header={'version': _TLW_SHARDED_VERSION, 'shards': shards, 'weight_map': weight_map})
+
+
+def _write_tlw(name, named_arrays, fsync=False, header=None):
+    """Write the (name, array) pairs of `named_arrays` into a `.tlw` file, consuming one array at a time.
+    If `fsync` is True, the file is flushed to disk before returning. The items of `header` are added to the
+    index."""
+
+    index = []
+    with open(name, 'wb') as f:
+        # magic, then the position of the index which is filled in at the end
+        f.write(_TLW_MAGIC)
+        f.write(np.uint64(0).tobytes())
+        offset = _tlw_align(f.tell())
+        for key, array in named_arrays:
+            array = np.ascontiguousarray(array)
+            f.seek(offset)
+            f.write(array.reshape(-1).view(np.uint8).data)
+            index.append(
+                {
+                    'name': key,
+                    'dtype': array.dtype.str,
+                    'shape': list(array.shape),
+                    'offset': offset,
+                    'nbytes': array.nbytes
+                }
+            )
+            offset = _tlw_align(offset + array.nbytes)
+            array = None
+        f.seek(offset)
+        index = {'version': _TLW_VERSION, 'tensors': index}
+        if header is not None:
+            index.update(header)
+        f.write(json.dumps(index).encode('utf-8'))
+        f.seek(len(_TLW_MAGIC))
+        f.write(np.uint64(offset).tobytes())
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def load_tlw(name='model.tlw'):
+    """Memory-map the parameters saved by ``tl.files.save_tlw()``.
+
+    Parameters
+    ----------
+    name : str
+        The name of the `.tlw` file.
+
+    Returns
+    --------
+    dict of str to numpy.memmap
+        The read-only parameters by name in saved order. No tensor is read from disk until it is used.
+        The tensors of a sharded file are gathered from all of its shards.
+
+    """
+    with open(name, 'rb') as f:
+        if f.read(len(_TLW_MAGIC)) != _TLW_MAGIC:
+            raise ValueError("File %s is not a tlw file." % name)
+        index_offset = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        f.seek(index_offset)
+        header = json.loads(f.read().decode('utf-8'))
+    if header['version'] > _TLW_SHARDED_VERSION:
+        raise ValueError(
+            "File %s has tlw version %d, which is newer than this TensorLayer." % (name, header['version'])
+        )
+
+    weights = {}
+    for shard in header.get('shards', []):
+        for key, value in load_tlw(os.path.join(os.path.dirname(name), shard)).items():
+            if key in weights:
+                raise Exception("Duplication in model tlw %s" % name)
+            weights[key] = value
+    for item in header['tensors']:
+        if item['name'] in weights:
+            raise Exception("Duplication in model tlw %s" % name)
+        # one mapping per tensor, so a tensor is unmapped as soon as it is released
+        dtype, shape = np.dtype(item['dtype']), tuple(item['shape'])
+        weights[item['name']] = np.memmap(name, dtype=dtype, mode='r', offset=item['offset'], shape=shape)
+    return weights
+
+
+def load_and_assign_tlw(name='model.tlw', network=None, skip=False):
+    """Restore the parameters saved by ``tl.files.save_tlw()``.
+
+    The file is memory-mapped and every weight is assigned straight from the mapping, so the peak memory is
+    about one copy of the model.
+
+    Parameters
+    -------------
+    name : str
+        The name of the `.tlw` file.
+    network : :class:`Model`
+        The network to be assigned.
+    skip : boolean
+        If 'skip' == True, loaded weights whose name is not found in network's weights will be skipped.
+        If 'skip' is False, error will be raised when mismatch is found. Default False.
+
+    """
+    if network is None:
+        raise ValueError("network is None.")
+    if not os.path.exists(name):
+        logging.error("file {} doesn't exist.".format(name))
+        return False
+
+    weights = load_tlw(name)
+    # release every mapping right after its tensor is assigned
+    _assign_weights_by_name(((key, weights.pop(key)) for key in list(weights)), network, skip)
+
+    logging.info("[*] Model restored from tlw %s" % name)
+
+
+class AsyncCheckpointer(object):
+    """Save `.tlw` weight checkpoints from a background thread.
+
+    The training loop only pays for copying the weights to host memory. Serializing, writing and fsync-ing
+    the file happen in a background thread. Every checkpoint is written to a temporary file and renamed to
+    ``<save_dir>/<prefix>-<step>.tlw`` once it is complete, so a crash never leaves a partial checkpoint
+    behind. Only the newest `max_to_keep` checkpoints are kept. At most one checkpoint is written at a time:
+    a save issued while the previous one is still being written waits for it, so no more than two copies of
+    the weights are held in host memory.
+
+    Parameters
+    ----------
+    save_dir : str
+        The folder to save checkpoints in. Checkpoints already in it count towards `max_to_keep`, and ``step()``
+        continues counting from the highest step among them.
+    prefix : str
+        The file name prefix of the checkpoints.
+    save_steps : int
+        ``step()`` saves a checkpoint every `save_steps` calls.
+    max_to_keep : int or None
+        The number of newest checkpoints to keep. None keeps all of them.
+
+    Examples
+    --------
+    >>> checkpointer = tl.files.AsyncCheckpointer(save_dir='checkpoint', save_steps=1000, max_to_keep=3)
+    >>> model.train(n_epoch=10, train_dataset=dataset, checkpointer=checkpointer)
+    >>> model.load_weights(checkpointer.latest_checkpoint)
+
+    """
+
+    def __init__(self, save_dir='checkpoint', prefix='model', save_steps=1000, max_to_keep=5):
+        if not isinstance(save_steps, int) or save_steps < 1:
+            raise ValueError("save_steps should be a positive integer, but got {}.".format(save_steps))
+        if max_to_keep is not None and max_to_keep < 1:
+            raise ValueError("max_to_keep should be a positive integer or None, but got {}.".format(max_to_keep))
+        self.save_dir = save_dir
+        self.prefix = prefix
+        self.save_steps = save_steps
+        self.max_to_keep = max_to_keep
+
+        exists_or_mkdir(save_dir, verbose=False)
+        pattern = re.compile(r'^%s-(\d+)\.tlw$' % re.escape(prefix))
+        saved = []
+        for file_name in os.listdir(save_dir):
+            match = pattern.match(file_name)
+            if match:
+                saved.append((int(match.group(1)), os.path.join(save_dir, file_name)))
+        # (step, path) pairs sorted by step, so the newest checkpoint is the one of the highest step
+        self._checkpoints = sorted(saved)
+        self.global_step = self._checkpoints[-1][0] if self._checkpoints else 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._error = None
+
+    @property
+    def checkpoints(self):
+        """The paths of the kept checkpoints, oldest first."""
+        with self._lock:
+            return [path for _, path in self._checkpoints]
+
+    @property
+    def latest_checkpoint(self):
+        """The path of the newest complete checkpoint, or None."""
+        with self._lock:
+            return self._checkpoints[-1][1] if self._checkpoints else None
+
+    def step(self, save_list):
+        """Count one training step, and save `save_list` if it is the `save_steps`-th one since the last save."""
+        self.global_step += 1
+        if self.global_step % self.save_steps == 0:
+            self.save(save_list, self.global_step)
+
+    def save(self, save_list, step=None):
+        """Copy the parameters (tensor) in `save_list` to host and write them to a checkpoint in the background.
+
+        Parameters
+        ----------
+        save_list : list of parameters
+            A list of parameters (tensor) to be saved.
+        step : int or None
+            The step number in the file name. Default the number of ``step()`` calls so far.
+
+        """
+        if step is None:
+            step = self.global_step
+        # the only work done on the calling thread
+        snapshot = [(tensor.name, _variables_to_numpy(tensor)[0]) for tensor in save_list]
+        self.wait()
+        path = os.path.join(self.save_dir, '%s-%d.tlw' % (self.prefix, step))
+        self._thread = threading.Thread(target=self._write, args=(snapshot, step, path), name='AsyncCheckpointer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wait(self):
+        """Block until the checkpoint being written is on disk, and raise the error of a failed write."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write(self, snapshot, step, path):
+        tmp_path = path + '.tmp'
+        try:
+            _write_tlw(tmp_path, snapshot, fsync=True)
+            os.replace(tmp_path, path)
+            _fsync_dir(self.save_dir)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._error = e
+            return
+        logging.info("[*] Checkpoint saved in tlw %s" % path)
+
+        with self._lock:
+            if (step, path) not in self._checkpoints:
+                bisect.insort(self._checkpoints, (step, path))
+            removed = []
+            if self.max_to_keep is not None:
+                removed = [old_path for _, old_path in self._checkpoints[:-self.max_to_keep]]
+                self._checkpoints = self._checkpoints[-self.max_to_keep:]
+        for old_path in removed:
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+
+def _fsync_dir(path):
+    """Persist a rename into `path`. Directories cannot be opened for fsync on every platform, e.g. Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def save_ckpt(mode_name='model.ckpt', save_dir='checkpoint', var_list=None, global_step=None, printable=False):
@@ -2623,7 +3029,8 @@ def pd_variables_to_numpy(variables):
 
 def assign_tf_variable(variable, value):
     """Assign value to a TF variable"""
-    variable.assign(value)
+    # skip reading the new value back, which is an extra op per variable
+    variable.assign(value, read_value=False)
 
 
 def assign_ms_variable(variable, value):
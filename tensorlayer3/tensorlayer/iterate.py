@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
-from six.moves import xrange
 
 __all__ = [
     'minibatches',
@@ -75,6 +74,7 @@ def minibatches(inputs=None, targets=None, batch_size=None, allow_dynamic_batch_
 def seq_minibatches(inputs, targets, batch_size, seq_length, stride=1):
     """Generate a generator that return a batch of sequence inputs and targets.
     If `batch_size=100` and `seq_length=5`, one return will have 500 rows (examples).
+    The batches are read-only, as they may be views of `inputs` and `targets`: copy a batch before changing it in place.
 
     Parameters
     ----------
@@ -125,19 +125,39 @@ def seq_minibatches(inputs, targets, batch_size, seq_length, stride=1):
     if len(inputs) != len(targets):
         raise AssertionError("The length of inputs and targets should be equal")
 
-    n_loads = (batch_size * stride) + (seq_length - stride)
+    # every window is a view of `inputs`, only the flattening of a batch copies it
+    input_windows = _strided_windows(inputs, seq_length, stride)
+    target_windows = _strided_windows(targets, seq_length, stride)
 
-    for start_idx in range(0, len(inputs) - n_loads + 1, (batch_size * stride)):
-        seq_inputs = np.zeros((batch_size, seq_length) + inputs.shape[1:], dtype=inputs.dtype)
-        seq_targets = np.zeros((batch_size, seq_length) + targets.shape[1:], dtype=targets.dtype)
-        for b_idx in xrange(batch_size):
-            start_seq_idx = start_idx + (b_idx * stride)
-            end_seq_idx = start_seq_idx + seq_length
-            seq_inputs[b_idx] = inputs[start_seq_idx:end_seq_idx]
-            seq_targets[b_idx] = targets[start_seq_idx:end_seq_idx]
+    for start_idx in range(0, len(input_windows) - batch_size + 1, batch_size):
+        seq_inputs = input_windows[start_idx:start_idx + batch_size]
+        seq_targets = target_windows[start_idx:start_idx + batch_size]
         flatten_inputs = seq_inputs.reshape((-1, ) + inputs.shape[1:])
         flatten_targets = seq_targets.reshape((-1, ) + targets.shape[1:])
-        yield flatten_inputs, flatten_targets
+        # overlapping windows are copied by the reshape, keep these read-only like the views
+        yield _read_only(flatten_inputs), _read_only(flatten_targets)
+
+
+def _strided_windows(data, seq_length, stride):
+    """A read-only view of shape (n_windows, seq_length, ...) of the windows of `data` starting every `stride` rows."""
+    data = np.asarray(data)
+    n_windows = max((len(data) - seq_length) // stride + 1, 0)
+    shape = (n_windows, seq_length) + data.shape[1:]
+    strides = (data.strides[0] * stride, ) + data.strides
+    return np.lib.stride_tricks.as_strided(data, shape=shape, strides=strides, writeable=False)
+
+
+def _batch_major(data, batch_size):
+    """A read-only view of the first `batch_size * (len(data) // batch_size)` rows of `data` as `batch_size` rows of
+    consecutive elements, without copying the data."""
+    batch_len = len(data) // batch_size
+    return _read_only(data[:batch_size * batch_len].reshape((batch_size, batch_len) + data.shape[1:]))
+
+
+def _read_only(array):
+    """Make `array` read-only, so that writing to a batch which is a view of the data fails instead of changing it."""
+    array.flags.writeable = False
+    return array
 
 
 def seq_minibatches2(inputs, targets, batch_size, num_steps):
@@ -158,7 +178,8 @@ def seq_minibatches2(inputs, targets, batch_size, num_steps):
 
     Yields
     ------
-    Pairs of the batched data, each a matrix of shape [batch_size, num_steps].
+    Pairs of the batched data, each a matrix of shape [batch_size, num_steps], which are read-only views of
+    `inputs` and `targets`: copy a batch before changing it in place.
 
     Raises
     ------
@@ -189,20 +210,14 @@ def seq_minibatches2(inputs, targets, batch_size, num_steps):
 
     Notes
     -----
-    - Hint, if the input data are images, you can modify the source code `data = np.zeros([batch_size, batch_len)` to `data = np.zeros([batch_size, batch_len, inputs.shape[1], inputs.shape[2], inputs.shape[3]])`.
+    - The rows of `inputs` may also be arrays, e.g. images.
     """
     if len(inputs) != len(targets):
         raise AssertionError("The length of inputs and targets should be equal")
 
-    data_len = len(inputs)
-    batch_len = data_len // batch_size
-    # data = np.zeros([batch_size, batch_len])
-    data = np.zeros((batch_size, batch_len) + inputs.shape[1:], dtype=inputs.dtype)
-    data2 = np.zeros([batch_size, batch_len])
-
-    for i in range(batch_size):
-        data[i] = inputs[batch_len * i:batch_len * (i + 1)]
-        data2[i] = targets[batch_len * i:batch_len * (i + 1)]
+    data = _batch_major(np.asarray(inputs), batch_size)
+    data2 = _batch_major(np.asarray(targets), batch_size)
+    batch_len = data.shape[1]
 
     epoch_size = (batch_len - 1) // num_steps
 
@@ -224,10 +239,12 @@ def ptb_iterator(raw_data, batch_size, num_steps):
 
     Parameters
     ----------
-    raw_data : a list
+    raw_data : a list, numpy.array or str
             the context in list format; note that context usually be
             represented by splitting by space, and then convert to unique
-            word IDs.
+            word IDs. It may also be a memory-mapped array, or the path of
+            a `.npy` file or a raw binary file of int32 word IDs, which is
+            memory-mapped, so that a large corpus is iterated in constant memory.
     batch_size : int
             the batch size.
     num_steps : int
@@ -236,6 +253,8 @@ def ptb_iterator(raw_data, batch_size, num_steps):
     Yields
     ------
     Pairs of the batched data, each a matrix of shape [batch_size, num_steps].
+    They are read-only views of the data, or read-only copies for a memory-mapped corpus which is not int32:
+    copy a batch before changing it in place.
     The second element of the tuple is the same data time-shifted to the
     right by one.
 
@@ -264,13 +283,17 @@ def ptb_iterator(raw_data, batch_size, num_steps):
     ... [[ 7  8  9]
     ... [17 18 19]]
     """
-    raw_data = np.array(raw_data, dtype=np.int32)
-
-    data_len = len(raw_data)
-    batch_len = data_len // batch_size
-    data = np.zeros([batch_size, batch_len], dtype=np.int32)
-    for i in range(batch_size):
-        data[i] = raw_data[batch_len * i:batch_len * (i + 1)]
+    if isinstance(raw_data, str):
+        raw_data = _load_token_file(raw_data)
+    raw_data = np.asanyarray(raw_data)
+    # a memory-mapped corpus is cast one batch at a time, anything else is cast once like before
+    cast = raw_data.dtype != np.int32
+    if cast and not isinstance(raw_data, np.memmap):
+        raw_data = raw_data.astype(np.int32)
+        cast = False
+
+    data = _batch_major(raw_data, batch_size)
+    batch_len = data.shape[1]
 
     epoch_size = (batch_len - 1) // num_steps
 
@@ -280,4 +303,13 @@ def ptb_iterator(raw_data, batch_size, num_steps):
     for i in range(epoch_size):
         x = data[:, i * num_steps:(i + 1) * num_steps]
         y = data[:, i * num_steps + 1:(i + 1) * num_steps + 1]
+        if cast:
+            x, y = _read_only(x.astype(np.int32)), _read_only(y.astype(np.int32))
         yield (x, y)
+
+
+def _load_token_file(path, dtype=np.int32):
+    """Memory-map a token file, a `.npy` file or a raw binary file of `dtype` tokens."""
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    return np.memmap(path, dtype=dtype, mode='r')
@@ -9,6 +9,7 @@ from .deprecated import *
 from .dropout import *
 from .embedding import *
 from .extend import *
+from .fusion import *
 from .image_resampling import *
 from .inputs import *
 from .lambda_layers import *
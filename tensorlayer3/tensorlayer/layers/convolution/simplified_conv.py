@@ -55,6 +55,8 @@ class Conv1d(Module):
 
     """
 
+    _supports_compute_dtype = True
+
     def __init__(
         self,
         n_filter=32,
@@ -146,9 +148,9 @@ class Conv1d(Module):
                 self._built = True
             self._forward_state = True
 
-        outputs = self.conv1d(inputs, self.W)
+        outputs = self.conv1d(self._compute_cast(inputs), self._compute_cast(self.W))
         if self.b_init_flag:
-            outputs = self.bias_add(outputs, self.b)
+            outputs = self.bias_add(outputs, self._compute_cast(self.b))
         if self.act_init_flag:
             outputs = self.act(outputs)
 
@@ -196,6 +198,8 @@ class Conv2d(Module):
 
     """
 
+    _supports_compute_dtype = True
+
     def __init__(
         self,
         n_filter=32,
@@ -290,9 +294,9 @@ class Conv2d(Module):
                 self._built = True
             self._forward_state = True
 
-        outputs = self.conv2d(inputs, self.W)
+        outputs = self.conv2d(self._compute_cast(inputs), self._compute_cast(self.W))
         if self.b_init_flag:
-            outputs = self.bias_add(outputs, self.b)
+            outputs = self.bias_add(outputs, self._compute_cast(self.b))
         if self.act_init_flag:
             outputs = self.act(outputs)
         return outputs
@@ -341,6 +345,8 @@ RuntimeError: Unable to cast from non-held to held instance (T& to Holder<T>) of
 
     """
 
+    _supports_compute_dtype = True
+
     def __init__(
         self,
         n_filter=32,
@@ -437,9 +443,9 @@ RuntimeError: Unable to cast from non-held to held instance (T& to Holder<T>) of
                 self._built = True
             self._forward_state = True
 
-        outputs = self.conv3d(inputs, self.W)
+        outputs = self.conv3d(self._compute_cast(inputs), self._compute_cast(self.W))
         if self.b_init_flag:
-            outputs = self.bias_add(outputs, self.b)
+            outputs = self.bias_add(outputs, self._compute_cast(self.b))
         if self.act_init_flag:
             outputs = self.act(outputs)
         return outputs
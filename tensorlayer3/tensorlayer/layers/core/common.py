@@ -48,14 +48,17 @@ def _save_weights(net, file_path, format=None):
         Filename to which the model weights will be saved.
     format : str or None
         Saved file format.
-        Value should be None, 'hdf5', 'npz', 'npz_dict' or 'ckpt'. Other format is not supported now.
+        Value should be None, 'hdf5', 'npz', 'npz_dict', 'tlw' or 'ckpt'. Other format is not supported now.
         1) If this is set to None, then the postfix of file_path will be used to decide saved format.
-        If the postfix is not in ['h5', 'hdf5', 'npz', 'ckpt'], then file will be saved in hdf5 format by default.
+        If the postfix is not in ['h5', 'hdf5', 'npz', 'tlw', 'ckpt'], then file will be saved in hdf5 format by
+        default.
         2) 'hdf5' will save model weights name in a list and each layer has its weights stored in a group of
         the hdf5 file.
         3) 'npz' will save model weights sequentially into a npz file.
         4) 'npz_dict' will save model weights along with its name as a dict into a npz file.
-        5) 'ckpt' will save model weights into a tensorflow ckpt file.
+        5) 'tlw' will save model weights along with its name as raw aligned tensors into one flat file, which is
+        memory-mapped on loading.
+        6) 'ckpt' will save model weights into a tensorflow ckpt file.
 
         Default None.
 
@@ -74,6 +77,9 @@ def _save_weights(net, file_path, format=None):
     >>> model.save_weights('./model.npz')
     >>> model.save_weights('./model.npz', format='npz_dict')
 
+    3) Save model weights in tlw format for fast memory-mapped loading
+    >>> model.save_weights('./model.tlw')
+
     """
 
     if net.all_weights is None or len(net.all_weights) == 0:
@@ -82,7 +88,7 @@ def _save_weights(net, file_path, format=None):
 
     if format is None:
         postfix = file_path.split('.')[-1]
-        if postfix in ['h5', 'hdf5', 'npz', 'ckpt']:
+        if postfix in ['h5', 'hdf5', 'npz', 'tlw', 'ckpt']:
             format = postfix
         else:
             format = 'hdf5'
@@ -94,12 +100,14 @@ def _save_weights(net, file_path, format=None):
         utils.save_npz(net.all_weights, file_path)
     elif format == 'npz_dict':
         utils.save_npz_dict(net.all_weights, file_path)
+    elif format == 'tlw':
+        utils.save_tlw(net.all_weights, file_path)
     elif format == 'ckpt':
         # TODO: enable this when tf save ckpt is enabled
         raise NotImplementedError("ckpt load/save is not supported now.")
     else:
         raise ValueError(
-            "Save format must be 'hdf5', 'npz', 'npz_dict' or 'ckpt'."
+            "Save format must be 'hdf5', 'npz', 'npz_dict', 'tlw' or 'ckpt'."
             "Other format is not supported now."
         )
 
@@ -113,7 +121,7 @@ def _load_weights(net, file_path, format=None, in_order=True, skip=False):
         Filename from which the model weights will be loaded.
     format : str or None
         If not specified (None), the postfix of the file_path will be used to decide its format. If specified,
-        value should be 'hdf5', 'npz', 'npz_dict' or 'ckpt'. Other format is not supported now.
+        value should be 'hdf5', 'npz', 'npz_dict', 'tlw' or 'ckpt'. Other format is not supported now.
         In addition, it should be the same format when you saved the file using net.save_weights().
         Default is None.
     in_order : bool
@@ -125,7 +133,7 @@ def _load_weights(net, file_path, format=None, in_order=True, skip=False):
         Default is True.
     skip : bool
         Allow skipping weights whose name is mismatched between the file and model. Only useful when 'format' is
-        'hdf5' or 'npz_dict'. If 'skip' is True, 'in_order' argument will be ignored and those loaded weights
+        'hdf5', 'npz_dict' or 'tlw'. If 'skip' is True, 'in_order' argument will be ignored and those loaded weights
         whose name is not found in model weights (net.all_weights) will be skipped. If 'skip' is False, error will
         occur when mismatch is found.
         Default is False.
@@ -146,11 +154,14 @@ def _load_weights(net, file_path, format=None, in_order=True, skip=False):
     3) load model from a npz file, which is saved as npz_dict previously
     >>> model.load_weights('./model.npz', format='npz_dict')
 
+    4) load model from a tlw file, the weights are assigned straight from a memory mapping of the file
+    >>> model.load_weights('./model.tlw')
+
     Notes
     -------
     1) 'in_order' is only useful when 'format' is 'hdf5'. If you are trying to load a weights file which is
        saved in a different mode, it is recommended to set 'in_order' be True.
-    2) 'skip' is useful when 'format' is 'hdf5' or 'npz_dict'. If 'skip' is True,
+    2) 'skip' is useful when 'format' is 'hdf5', 'npz_dict' or 'tlw'. If 'skip' is True,
        'in_order' argument will be ignored.
 
     """
@@ -172,11 +183,13 @@ def _load_weights(net, file_path, format=None, in_order=True, skip=False):
         utils.load_and_assign_npz(file_path, net)
     elif format == 'npz_dict':
         utils.load_and_assign_npz_dict(file_path, net, skip)
+    elif format == 'tlw':
+        utils.load_and_assign_tlw(file_path, net, skip)
     elif format == 'ckpt':
         # TODO: enable this when tf save ckpt is enabled
         raise NotImplementedError("ckpt load/save is not supported now.")
     else:
         raise ValueError(
-            "File format must be 'hdf5', 'npz', 'npz_dict' or 'ckpt'. "
+            "File format must be 'hdf5', 'npz', 'npz_dict', 'tlw' or 'ckpt'. "
             "Other format is not supported now."
         )
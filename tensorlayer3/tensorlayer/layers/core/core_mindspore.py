@@ -17,6 +17,7 @@ from mindspore.common.parameter import Parameter
 __all__ = ['Module', 'SequentialLayer']
 
 _global_layer_name_dict = {}  # TODO: better implementation?
+_compute_dtypes = [None, 'float16', 'float32']
 
 
 class Module(Cell):
@@ -82,11 +83,19 @@ class Module(Cell):
         # data_format
         self.data_format = "NCHW"
 
+        # Layer compute dtype, None means computing in the dtype of the weights
+        self.compute_dtype = None
+        # whether the outputs are cast back to float32, set on the network set_compute_dtype() is called on
+        self._float32_outputs = False
+
     def forward(self, *inputs, **kwargs):
         raise Exception("The forward method must be implemented by inherited class")
 
     def construct(self, *inputs, **kwargs):
-        return self.forward(*inputs, **kwargs)
+        outputs = self.forward(*inputs, **kwargs)
+        if self._float32_outputs:
+            outputs = tl.ops.cast(outputs, ms.float32)
+        return outputs
 
     def build(self, inputs_shape):
         raise Exception("The build(self, inputs_shape) method must be implemented by inherited class")
@@ -225,6 +234,32 @@ class Module(Cell):
         self.add_flags_recursive(training=False)
         return self
 
+    def set_compute_dtype(self, dtype):
+        """Set the dtype in which the Dense and Conv layers of this network compute, i.e. mixed precision.
+        The weights stay in float32 as master weights and are cast to `dtype` in the forward pass.
+        The activations between the layers stay in `dtype`, and only the outputs of this network are cast
+        back to float32.
+
+        Parameters
+        ----------
+        dtype : str or None
+            'float16' to compute in low precision, None to compute in the dtype of the weights.
+
+        """
+
+        if dtype not in _compute_dtypes:
+            raise ValueError("Unsupported compute dtype {}, it should be one of {}.".format(dtype, _compute_dtypes))
+
+        for _, cell in self.cells_and_names():
+            cell.compute_dtype = None if dtype is None else tl.ops.dtypes(dtype)
+            cell._float32_outputs = False
+        self._float32_outputs = dtype not in (None, 'float32')
+
+    def _compute_cast(self, x):
+        if self.compute_dtype is None:
+            return x
+        return tl.ops.cast(x, self.compute_dtype)
+
     def test(self):
         """Set this network in evaluation mode."""
         self.eval()
@@ -12,6 +12,13 @@ from paddle.fluid.dygraph import parallel_helper
 import paddle as pd
 
 _global_layer_name_dict = {}
+_compute_dtypes = [None, 'float16', 'bfloat16', 'float32']
+
+
+def _cast_outputs(outputs, dtype):
+    if isinstance(outputs, (list, tuple)):
+        return type(outputs)(_cast_outputs(output, dtype) for output in outputs)
+    return pd.cast(outputs, dtype)
 
 
 class Module(Layer):
@@ -77,6 +84,11 @@ class Module(Layer):
         # layer forward  state
         self._forward_state = False
 
+        # Layer compute dtype, None means computing in the dtype of the weights
+        self.compute_dtype = None
+        # whether the outputs are cast back to float32, set on the network set_compute_dtype() is called on
+        self._float32_outputs = False
+
     def set_train(self):
         """
         Sets this Layer and all its sublayers to training mode.
@@ -160,6 +172,33 @@ class Module(Layer):
         for layer in self.sublayers():
             layer.training = False
 
+    def set_compute_dtype(self, dtype):
+        """Set the dtype in which the Dense and Conv layers of this network compute, i.e. mixed precision.
+        The weights stay in float32 as master weights and are cast to `dtype` in the forward pass.
+        The activations between the layers stay in `dtype`, and only the outputs of this network are cast
+        back to float32.
+
+        Parameters
+        ----------
+        dtype : str or None
+            'float16' or 'bfloat16' to compute in low precision, None to compute in the dtype of the weights.
+
+        """
+
+        if dtype not in _compute_dtypes:
+            raise ValueError("Unsupported compute dtype {}, it should be one of {}.".format(dtype, _compute_dtypes))
+
+        self.compute_dtype = dtype
+        self._float32_outputs = dtype not in (None, 'float32')
+        for layer in self.sublayers():
+            layer.compute_dtype = dtype
+            layer._float32_outputs = False
+
+    def _compute_cast(self, x):
+        if self.compute_dtype is None:
+            return x
+        return pd.cast(x, self.compute_dtype)
+
     def build(self, inputs_shape):
         raise Exception("The build(self, inputs_shape) method must be implemented by inherited class")
 
@@ -189,6 +228,8 @@ class Module(Layer):
                 if hook_result is not None:
                     outputs = hook_result
 
+            if self._float32_outputs:
+                outputs = _cast_outputs(outputs, 'float32')
             return outputs
 
     def _get_weights(self, var_name, shape, init=None, trainable=True, transposed=None):
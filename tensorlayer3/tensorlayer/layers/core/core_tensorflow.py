@@ -3,16 +3,71 @@
 
 from .common import str2act, _save_weights, _load_weights
 from collections import OrderedDict
+from contextlib import contextmanager
 import time
 import tensorlayer as tl
 import tensorflow as tf
+from tensorflow.python.ops.resource_variable_ops import UninitializedVariable
 from tensorlayer.layers.utils import (get_variable_with_initializer)
 from tensorlayer import logging
 
-__all__ = ['Module', 'SequentialLayer', 'LayerList']
+__all__ = ['Module', 'SequentialLayer', 'LayerList', 'deferred_init']
 
 _global_layer_name_dict = {}
+_compute_dtypes = [None, 'float16', 'bfloat16', 'float32']
 Parameter_ = tf.Variable
+_deferred_init = False
+# bumped whenever a layer or weight is added to or removed from any Module, see _invalidate_layer_caches()
+_layer_tree_version = 0
+_weight_caches = ('_all_weights', '_trainable_weights', '_nontrainable_weights')
+
+
+def _cast_structure(structure, from_dtype, to_dtype):
+    """Cast the tensors of dtype `from_dtype` in a nested structure to `to_dtype`."""
+
+    from_dtype = tf.as_dtype(from_dtype)
+
+    def cast(x):
+        if isinstance(x, (tf.Tensor, tf.Variable)) and x.dtype == from_dtype:
+            return tf.cast(x, to_dtype)
+        return x
+
+    return tf.nest.map_structure(cast, structure)
+
+
+def _invalidate_layer_caches():
+    """Mark the cached layer and weight lists of every Module as stale. A Module does not know its parents,
+    so one global version is bumped instead of clearing the caches up the tree."""
+
+    global _layer_tree_version
+    _layer_tree_version += 1
+
+
+@contextmanager
+def deferred_init():
+    """Defer the initialization of the weights of the layers created inside this context.
+
+    The weights are created with their name, shape and dtype, but without a value, and no initializer is run.
+    A weight gets its value either from ``load_weights()`` (or any other assign), or from its initializer when
+    its layer is called for the first time, or from ``Module.materialize_weights()``. So restoring a pretrained
+    model never pays for a random initialization that is overwritten right away.
+    Reading a weight which has no value yet raises an error.
+
+    Examples
+    --------
+    >>> import tensorlayer as tl
+    >>> with tl.layers.deferred_init():
+    >>>     net = tl.models.vgg16()
+    >>> net.load_weights('vgg16.npz')
+
+    """
+
+    global _deferred_init
+    previous, _deferred_init = _deferred_init, True
+    try:
+        yield
+    finally:
+        _deferred_init = previous
 
 
 class Module(object):
@@ -41,6 +96,9 @@ class Module(object):
 
         """
 
+    # whether forward() casts its inputs and weights to the compute dtype, see set_compute_dtype()
+    _supports_compute_dtype = False
+
     def __init__(self, name=None, act=None, *args, **kwargs):
         self._params = OrderedDict()
         self._layers = OrderedDict()
@@ -92,7 +150,10 @@ class Module(object):
         self._nodes = []
         self._nodes_fixed = False
 
-        # Layer weight state
+        # Layer weight state, the lists are cached until the layer tree changes
+        self._weights_versions = {}
+        self._flat_layers_cache = None
+        self._flat_layers_version = -1
         self._all_weights = None
         self._trainable_weights = None
         self._nontrainable_weights = None
@@ -103,6 +164,14 @@ class Module(object):
         # Layer training state
         self.is_train = True
 
+        # Layer compute dtype, None means computing in the dtype of the weights
+        self.compute_dtype = None
+        # whether the outputs are cast back to float32, set on the network set_compute_dtype() is called on
+        self._float32_outputs = False
+
+        # (weight, shape, initializer) of the weights created under deferred_init() which may have no value yet
+        self._deferred_weights = []
+
     def extend_repr(self):
         """
         Sets the extended representation of the Module.
@@ -157,13 +226,30 @@ class Module(object):
             #         "Do you forget to pass the keyword argument 'in_channels'? ".format(value.name)
             #     )
             layers[name] = value
+            _invalidate_layer_caches()
         else:
+            if name in _weight_caches:
+                # a weight list assigned from outside is kept as long as it is not empty
+                weights_versions = self.__dict__.get('_weights_versions')
+                if weights_versions:
+                    weights_versions.pop(name, None)
             object.__setattr__(self, name, value)
 
     def __call__(self, inputs, *args, **kwargs):
+        if self._deferred_weights:
+            self._materialize_deferred_weights()
 
-        output = self.forward(inputs, *args, **kwargs)
+        if self.compute_dtype is None:
+            return self.forward(inputs, *args, **kwargs)
 
+        if self._supports_compute_dtype or self._layers or (self._built and not self._params):
+            output = self.forward(inputs, *args, **kwargs)
+        else:
+            # a layer with float32 weights which cannot take low precision inputs computes in float32
+            inputs = _cast_structure(inputs, self.compute_dtype, tf.float32)
+            output = _cast_structure(self.forward(inputs, *args, **kwargs), tf.float32, self.compute_dtype)
+        if self._float32_outputs:
+            output = _cast_structure(output, self.compute_dtype, tf.float32)
         return output
 
     def forward(self, *inputs, **kwargs):
@@ -175,12 +261,36 @@ class Module(object):
     def _get_weights(self, var_name, shape, init=tl.initializers.random_normal(), trainable=True, transposed=None):
         """ Get trainable variables. """
 
-        weight = get_variable_with_initializer(
-            scope_name=self.name, var_name=var_name, shape=shape, init=init, trainable=trainable
-        )
+        if _deferred_init:
+            weight = UninitializedVariable(
+                shape=shape, dtype=tl.float32, name=self.name + "/" + var_name, trainable=trainable
+            )
+            self._deferred_weights.append((weight, shape, init))
+        else:
+            weight = get_variable_with_initializer(
+                scope_name=self.name, var_name=var_name, shape=shape, init=init, trainable=trainable
+            )
         self.trainable = trainable
         return weight
 
+    def _materialize_deferred_weights(self):
+        """Run the initializer of the deferred weights of this layer which have not been assigned."""
+
+        # lift the initialization out of a tf.function trace, so that it runs once instead of every step
+        with tf.init_scope():
+            for weight, shape, init in self._deferred_weights:
+                if not weight.is_initialized():
+                    weight.assign(init(shape=shape), read_value=False)
+        self._deferred_weights = []
+
+    def materialize_weights(self):
+        """Give every weight of this layer and its sublayers created under ``deferred_init()`` a value.
+        Weights which were already assigned, e.g. by ``load_weights()``, are kept."""
+
+        for _, layer in self._flat_layers():
+            if layer._deferred_weights:
+                layer._materialize_deferred_weights()
+
     def save_weights(self, file_path, format=None):
         """Input file_path, save model weights into a file of given format."""
 
@@ -201,8 +311,7 @@ class Module(object):
 
         """
 
-        layers = self.layers_and_names(name_prefix='')
-        for layer_name, layer in layers:
+        for _, layer in self._flat_layers():
             if isinstance(layer, Module):
                 layer.is_train = is_train
 
@@ -213,7 +322,7 @@ class Module(object):
         Examples
         --------
         >>> import tensorlayer as tl
-        >>> net = tl.vgg16()
+        >>> net = tl.layers.SequentialLayer([tl.layers.Dense(n_units=10, in_channels=784), tl.layers.Dropout(0.8)])
         >>> net.set_train()
 
         """
@@ -229,7 +338,7 @@ class Module(object):
         Examples
         --------
         >>> import tensorlayer as tl
-        >>> net = tl.vgg16()
+        >>> net = tl.layers.SequentialLayer([tl.layers.Dense(n_units=10, in_channels=784), tl.layers.Dropout(0.8)])
         >>> net.set_eval()
         # do evaluation
 
@@ -239,6 +348,44 @@ class Module(object):
             self.is_train = False
             self._set_mode_for_layers(False)
 
+    def set_compute_dtype(self, dtype):
+        """Set the dtype in which the Dense and Conv layers of this network compute, i.e. mixed precision.
+        The weights stay in float32 as master weights and are cast to `dtype` in the forward pass,
+        so the optimizer updates float32 values. The activations between the layers stay in `dtype`, and only
+        the outputs of this network are cast back to float32. Other layers with weights, e.g. BatchNorm,
+        compute in float32 and cast their outputs to `dtype`.
+
+        Parameters
+        ----------
+        dtype : str or None
+            'float16' or 'bfloat16' to compute in low precision, None to compute in the dtype of the weights.
+
+        Examples
+        --------
+        >>> import tensorlayer as tl
+        >>> net = tl.layers.SequentialLayer([tl.layers.Dense(n_units=800, act=tl.ReLU, in_channels=784),
+        ...                                  tl.layers.Dense(n_units=10, in_channels=800)])
+        >>> net.set_compute_dtype('bfloat16')
+        >>> y = net(x)  # float32 outputs computed in bfloat16
+
+        """
+
+        if dtype not in _compute_dtypes:
+            raise ValueError("Unsupported compute dtype {}, it should be one of {}.".format(dtype, _compute_dtypes))
+
+        for _, layer in self._flat_layers():
+            if isinstance(layer, Module):
+                layer.compute_dtype = dtype
+                layer._float32_outputs = False
+        self._float32_outputs = dtype not in (None, 'float32')
+
+    def _compute_cast(self, x):
+        """Cast a layer input or weight to the compute dtype of this layer."""
+
+        if self.compute_dtype is None:
+            return x
+        return tl.ops.cast(x, self.compute_dtype)
+
     @staticmethod
     def _compute_shape(tensors):
         if isinstance(tensors, list):
@@ -280,6 +427,7 @@ class Module(object):
             self._params_status[param_name] = self.trainable
         except:
             pass
+        _invalidate_layer_caches()
 
     def _add_node(self, input_tensors, output_tensors):
         """Add a LayerNode for this layer given input_tensors, output_tensors.
@@ -320,8 +468,10 @@ class Module(object):
     def __delattr__(self, name):
         if name in self._params:
             del self._params[name]
+            _invalidate_layer_caches()
         elif name in self._layers:
             del self._layers[name]
+            _invalidate_layer_caches()
         else:
             object.__delattr__(self, name)
 
@@ -333,19 +483,16 @@ class Module(object):
 
         """
 
-        if self._trainable_weights is not None and len(self._trainable_weights) > 0:
-            # self._trainable_weights already extracted, so do nothing
-            pass
-        else:
-            self._trainable_weights = []
-            layers = self.layers_and_names(name_prefix='')
-            for layer_name, layer in layers:
+        if self._weights_stale('_trainable_weights'):
+            trainable_weights = []
+            for _, layer in self._flat_layers():
                 params = layer._params.items()
                 params_status = layer._params_status.items()
                 params_zip = zip(params, params_status)
                 for params, params_status in params_zip:
                     if params_status[1] ==True:
-                        self._trainable_weights.append(params[1])
+                        trainable_weights.append(params[1])
+            self._cache_weights('_trainable_weights', trainable_weights)
         return self._trainable_weights
 
     @property
@@ -356,19 +503,16 @@ class Module(object):
 
         """
 
-        if self._nontrainable_weights is not None and len(self._nontrainable_weights) > 0:
-            # self._nontrainable_weights already extracted, so do nothing
-            pass
-        else:
-            self._nontrainable_weights = []
-            layers = self.layers_and_names(name_prefix='')
-            for layer_name, layer in layers:
+        if self._weights_stale('_nontrainable_weights'):
+            nontrainable_weights = []
+            for _, layer in self._flat_layers():
                 params = layer._params.items()
                 params_status = layer._params_status.items()
                 params_zip = zip(params, params_status)
                 for params, params_status in params_zip:
                     if params_status[1] == False:
-                        self._nontrainable_weights.append(params[1])
+                        nontrainable_weights.append(params[1])
+            self._cache_weights('_nontrainable_weights', nontrainable_weights)
         return self._nontrainable_weights
 
     @property
@@ -379,18 +523,39 @@ class Module(object):
 
         """
 
-        if self._all_weights is not None and len(self._all_weights) > 0:
-            # self._all_weights already extracted, so do nothing
-            pass
-        else:
-            self._all_weights = []
-            layers = self.layers_and_names(name_prefix='')
-            for layer_name, layer in layers:
+        if self._weights_stale('_all_weights'):
+            all_weights = []
+            for _, layer in self._flat_layers():
                 params = layer._params.items()
                 for par, val in params:
-                    self._all_weights.append(val)
+                    all_weights.append(val)
+            self._cache_weights('_all_weights', all_weights)
         return self._all_weights
 
+    def _weights_stale(self, attr):
+        """Whether the weight list `attr` has to be collected again."""
+
+        weights = self.__dict__.get(attr)
+        if weights is None:
+            return True
+        version = self._weights_versions.get(attr)
+        if version is None:
+            # assigned from outside, e.g. by Lambda layers
+            return len(weights) == 0
+        return version != _layer_tree_version
+
+    def _cache_weights(self, attr, weights):
+        object.__setattr__(self, attr, weights)
+        self._weights_versions[attr] = _layer_tree_version
+
+    def _flat_layers(self):
+        """The (name, layer) pairs of ``layers_and_names()``, cached until the layer tree changes."""
+
+        if self._flat_layers_version != _layer_tree_version:
+            self._flat_layers_cache = list(self.layers_and_names(name_prefix=''))
+            self._flat_layers_version = _layer_tree_version
+        return self._flat_layers_cache
+
     def get_weights(self, expand=True):
         """
         Returns an iterator over layer weights.
@@ -442,6 +607,7 @@ class Module(object):
         if not isinstance(child, Module) and child is not None:
             raise TypeError("Child layer type is incorrect.")
         self._layers[child_name] = child
+        _invalidate_layer_caches()
 
     def parameters_and_names(self, name_prefix='', expand=True):
         """
@@ -468,7 +634,9 @@ class Module(object):
         """
 
         layers = []
-        if expand:
+        if expand and not name_prefix:
+            layers = self._flat_layers()
+        elif expand:
             layers = self.layers_and_names(name_prefix=name_prefix)
         else:
             layers.append((name_prefix, self))
@@ -615,6 +783,7 @@ class SequentialLayer(Module):
             key = list(self._layers.keys())[index]
             self._layers[key] = layer
             self.layer_list = list(self._layers.values())
+            _invalidate_layer_caches()
 
     def __delitem__(self, index):
         if isinstance(index, int):
@@ -628,6 +797,7 @@ class SequentialLayer(Module):
         else:
             raise TypeError('Index {} is not int type or slice type'.format(index))
         self.layer_list = list(self._layers.values())
+        _invalidate_layer_caches()
 
     def __len__(self):
         return len(self._layers)
@@ -636,6 +806,7 @@ class SequentialLayer(Module):
         if _valid_module(layer):
             self._layers[str(len(self))] = layer
         self.layer_list = list(self._layers.values())
+        _invalidate_layer_caches()
         return self
 
     def build(self, inputs_shape):
@@ -696,6 +867,7 @@ class LayerList(Module):
             raise TypeError('Index {} is not int type'.format(index))
         index = _valid_index(len(self), index)
         self._layers[str(index)] = layer
+        _invalidate_layer_caches()
 
     def __delitem__(self, index):
         if isinstance(index, int):
@@ -711,6 +883,7 @@ class LayerList(Module):
         for idx, layer in enumerate(self._layers.values()):
             temp_dict[str(idx)] = layer
         self._layers = temp_dict
+        _invalidate_layer_caches()
 
     def __len__(self):
         return len(self._layers)
@@ -735,6 +908,7 @@ class LayerList(Module):
             self._layers[str(length)] = self._layers[str(length - 1)]
             length -= 1
         self._layers[str(idx)] = layer
+        _invalidate_layer_caches()
 
     def extend(self, layers):
         """
@@ -747,6 +921,7 @@ class LayerList(Module):
         for layer in layers:
             if _valid_module(layer):
                 self._layers[str(len(self))] = layer
+        _invalidate_layer_caches()
         return self
 
     def append(self, layer):
@@ -757,6 +932,7 @@ class LayerList(Module):
 
         if _valid_module(layer):
             self._layers[str(len(self))] = layer
+            _invalidate_layer_caches()
 
     def forward(self, *inputs):
         raise NotImplementedError
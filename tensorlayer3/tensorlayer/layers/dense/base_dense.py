@@ -47,6 +47,8 @@ class Dense(Module):
 
     """
 
+    _supports_compute_dtype = True
+
     def __init__(
         self,
         n_units,
@@ -113,9 +115,9 @@ class Dense(Module):
                 self._built = True
             self._forward_state = True
 
-        z = self.matmul(inputs, self.W)
+        z = self.matmul(self._compute_cast(inputs), self._compute_cast(self.W))
         if self.b_init_flag:
-            z = self.bias_add(z, self.b)
+            z = self.bias_add(z, self._compute_cast(self.b))
         if self.act_init_flag:
             z = self.act(z)
         return z
@@ -0,0 +1,231 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import tensorflow as tf
+
+import tensorlayer as tl
+from tensorlayer.layers.activation import (
+    HardTanh, LeakyReLU, LeakyReLU6, LeakyTwiceRelu6, Mish, PRelu, PRelu6, PTRelu6, Ramp, Swish
+)
+from tensorlayer.layers.convolution.simplified_conv import Conv2d
+from tensorlayer.layers.core import SequentialLayer
+from tensorlayer.layers.dense.base_dense import Dense
+from tensorlayer.layers.dropout import Dropout
+from tensorlayer.layers.normalization import BatchNorm
+from tensorlayer.layers.utils import bias_fold, w_fold
+
+__all__ = ['capture_graph', 'CapturedGraph', 'GraphNode']
+
+# layers which compute each output element from the input element at the same position only
+_elementwise_layers = (HardTanh, LeakyReLU, LeakyReLU6, LeakyTwiceRelu6, Mish, PRelu, PRelu6, PTRelu6, Ramp, Swish)
+
+
+class GraphNode(object):
+    """One step of a :class:`CapturedGraph`, which covers one or more layers of the captured module.
+
+    Parameters
+    ----------
+    layers : list of Module
+        The layers covered by this node, in call order.
+    fn : callable
+        Computes the output of the node from its input.
+    kind : str
+        'layer' for a layer which is called as is, 'conv_bn' or 'dense_bn' for a Conv2d or Dense layer with
+        the following BatchNorm folded into its weights.
+
+    """
+
+    def __init__(self, layers, fn, kind='layer'):
+        self.layers = layers
+        self.fn = fn
+        self.kind = kind
+
+    @property
+    def name(self):
+        return '+'.join(layer.name for layer in self.layers)
+
+    def __call__(self, inputs):
+        return self.fn(inputs)
+
+    def __repr__(self):
+        return 'GraphNode({}, kind={})'.format(self.name, self.kind)
+
+
+class CapturedGraph(object):
+    """An inference callable built by :func:`capture_graph`.
+
+    All nodes run inside one ``tf.function`` whose batch dimension is ``None``, so a batch of another size
+    reuses the same trace.
+
+    Parameters
+    ----------
+    nodes : list of :class:`GraphNode`
+        The nodes, in call order.
+    inputs : tensor or numpy.array
+        A sample input, which gives the signature of the graph.
+    jit_compile : boolean
+        Compile the graph with XLA, which fuses the elementwise chains into the kernels around them.
+
+    """
+
+    def __init__(self, nodes, inputs, jit_compile=False):
+        self.nodes = nodes
+        spec = tf.TensorSpec([None] + list(inputs.shape[1:]), dtype=tf.as_dtype(inputs.dtype))
+        kwargs = {'jit_compile': True} if jit_compile else {}
+        self._forward = tf.function(self._run, input_signature=[spec], **kwargs)
+
+    def _run(self, inputs):
+        outputs = inputs
+        for node in self.nodes:
+            outputs = node(outputs)
+        return outputs
+
+    def __call__(self, inputs):
+        return self._forward(inputs)
+
+    def __repr__(self):
+        return 'CapturedGraph<\n  ' + '\n  '.join(repr(node) for node in self.nodes) + '\n>'
+
+
+def capture_graph(module, inputs, fuse=True, jit_compile=False):
+    """Trace a module once and return an optimized inference callable.
+
+    The module is switched to evaluation mode and called once on `inputs`, which builds its layers. Nested
+    :class:`SequentialLayer` are flattened into a list of nodes, and any other module is one opaque node.
+    Then the fusion passes run over the nodes:
+
+    1) Dropout is removed, it is the identity at inference.
+    2) A Conv2d or Dense layer without activation followed by a BatchNorm is folded into one layer, whose
+       weights and biases are ``w_fold``/``bias_fold`` of both, and which applies the activation of the
+       BatchNorm.
+    3) Elementwise activation layers (e.g. ``LeakyReLU``, ``Swish``, ``PRelu``) are merged into the node
+       before them, so that a Dense/Conv and its activations are one node.
+
+    The folded weights are a snapshot taken at capture time, so capture the module again after its weights
+    change.
+
+    Parameters
+    ----------
+    module : Module
+        The network to be captured.
+    inputs : tensor or numpy.array
+        A sample input batch.
+    fuse : boolean
+        Whether to run the fusion passes. Default True.
+    jit_compile : boolean
+        Compile the graph with XLA. Default False.
+
+    Returns
+    -------
+    :class:`CapturedGraph`
+        Call it with a batch of inputs to run inference.
+
+    Examples
+    --------
+    >>> net = tl.layers.SequentialLayer([
+    >>>     tl.layers.Conv2d(16, (3, 3), in_channels=3, b_init=None),
+    >>>     tl.layers.BatchNorm2d(num_features=16, act=tl.ReLU),
+    >>> ])
+    >>> graph = tl.layers.capture_graph(net, x)
+    >>> print(graph)
+    >>> y = graph(x)
+
+    """
+
+    if tl.BACKEND != 'tensorflow':
+        raise NotImplementedError("capture_graph is only supported by the tensorflow backend.")
+
+    module.set_eval()
+    module(inputs)
+
+    nodes = [GraphNode([layer], layer) for layer in _flatten_sequential(module)]
+    if fuse:
+        for fusion_pass in (_remove_dropout, _fold_batchnorm, _fuse_elementwise):
+            nodes = fusion_pass(nodes)
+    return CapturedGraph(nodes, inputs, jit_compile=jit_compile)
+
+
+def _flatten_sequential(module):
+    if isinstance(module, SequentialLayer):
+        for layer in module.layer_list:
+            for sublayer in _flatten_sequential(layer):
+                yield sublayer
+    else:
+        yield module
+
+
+def _remove_dropout(nodes):
+    return [node for node in nodes if not (node.kind == 'layer' and isinstance(node.layers[0], Dropout))]
+
+
+def _fold_batchnorm(nodes):
+    fused = []
+    for node in nodes:
+        if fused and node.kind == 'layer' and isinstance(node.layers[0], BatchNorm) and fused[-1].kind == 'layer':
+            folded = _fold_batchnorm_node(fused[-1].layers[0], node.layers[0])
+            if folded is not None:
+                fused[-1] = folded
+                continue
+        fused.append(node)
+    return fused
+
+
+def _fold_batchnorm_node(layer, bn):
+    """A node running `layer` with `bn` folded into it, or None if they cannot be folded."""
+
+    if not getattr(layer, '_built', False) or layer.compute_dtype is not None or layer.act_init_flag:
+        return None
+    if type(layer) is Conv2d:
+        channels_last = layer.data_format == 'NHWC'
+    elif type(layer) is Dense:
+        channels_last = True
+    else:
+        return None
+    if (bn.data_format == 'channels_last') != channels_last:
+        return None
+
+    W, b = _batchnorm_folded_weights(layer, bn)
+    data_format = layer.data_format if type(layer) is Conv2d else None
+
+    def folded(inputs):
+        if type(layer) is Conv2d:
+            outputs = layer.conv2d(inputs, W)
+        else:
+            outputs = layer.matmul(inputs, W)
+        outputs = tf.nn.bias_add(outputs, b, data_format=data_format)
+        if bn.act_init_flag:
+            outputs = bn.act(outputs)
+        return outputs
+
+    return GraphNode([layer, bn], folded, kind='conv_bn' if type(layer) is Conv2d else 'dense_bn')
+
+
+def _batchnorm_folded_weights(layer, bn):
+    """The weights and biases of `layer` followed by `bn` at inference, as one layer. The output channels are
+    the last axis of the weights of both Conv2d and Dense."""
+
+    gamma = bn.gamma if bn.gamma is not None else tf.ones_like(bn.moving_var)
+    beta = bn.beta if bn.beta is not None else tf.zeros_like(bn.moving_mean)
+    # the bias of the layer is subtracted by the normalization like the mean is
+    mean = bn.moving_mean - layer.b if layer.b_init_flag else bn.moving_mean
+    W = w_fold(layer.W, gamma, bn.moving_var, bn.epsilon)
+    b = bias_fold(beta, gamma, mean, bn.moving_var, bn.epsilon)
+    return tf.convert_to_tensor(W), tf.convert_to_tensor(b)
+
+
+def _fuse_elementwise(nodes):
+    fused = []
+    for node in nodes:
+        if fused and node.kind == 'layer' and isinstance(node.layers[0], _elementwise_layers):
+            fused[-1] = GraphNode(fused[-1].layers + node.layers, _chain(fused[-1].fn, node.fn), fused[-1].kind)
+            continue
+        fused.append(node)
+    return fused
+
+
+def _chain(first, second):
+
+    def chained(inputs):
+        return second(first(inputs))
+
+    return chained
@@ -1,6 +1,7 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
+import numpy as np
 import paddle
 from paddle.metric.metrics import Metric
 
@@ -21,18 +22,26 @@ class Accuracy(object):
 
         self.topk = topk
         self.accuracy = paddle.metric.Accuracy(topk=(self.topk, ))
+        self.reset()
 
     def update(self, y_pred, y_true):
 
-        self.accuracy.update(self.accuracy.compute(y_pred, y_true))
+        # paddle.metric.Accuracy.update() copies every batch to host, so the correct
+        # predictions are summed on device instead and only fetched by result().
+        correct = self.accuracy.compute(y_pred, y_true)
+        self.num_corrects = self.num_corrects + paddle.sum(correct[..., :self.topk])
+        self.num_samples += int(np.prod(correct.shape[:-1]))
 
     def result(self):
 
-        return self.accuracy.accumulate()
+        if self.num_samples == 0:
+            return 0.0
+        return float(self.num_corrects) / self.num_samples
 
     def reset(self):
 
-        self.accuracy.reset()
+        self.num_corrects = 0.0
+        self.num_samples = 0
 
 
 class Auc(object):
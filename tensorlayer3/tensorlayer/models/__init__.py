@@ -4,3 +4,5 @@
 from .core import Model
 from .core import WithLoss
 from .core import TrainOneStep
+from .core import DynamicLossScale
+from .transforms import fold_batchnorm, quantize_int8
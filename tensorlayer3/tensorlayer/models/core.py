@@ -5,6 +5,7 @@ from collections.abc import Iterable
 from tensorlayer.layers.core.common import _save_weights, _load_weights
 import tensorlayer as tl
 from tensorlayer.layers.core import Module
+from tensorlayer import logging
 import numpy as np
 import time
 
@@ -14,10 +15,11 @@ if tl.BACKEND == 'mindspore':
     from mindspore.ops import composite
     from mindspore.ops import operations as P
     from mindspore.common import ParameterTuple
+    import mindspore.common.dtype as mstype
 if tl.BACKEND == 'paddle':
     import paddle as pd
 
-__all__ = ['Model', 'WithLoss', 'TrainOneStep']
+__all__ = ['Model', 'WithLoss', 'TrainOneStep', 'DynamicLossScale']
 
 
 class Model:
@@ -39,8 +41,9 @@ class Model:
 
     Methods
     ---------
-    trin()
-        Model training.
+    train()
+        Model training. Set ``jit=True`` to run every batch through one compiled train step,
+        see :func:`Model.train` for its retrace policy.
     eval()
         Model prediction.
     save_weights()
@@ -84,47 +87,98 @@ class Model:
         self.all_weights = network.all_weights
         self.train_weights = self.network.trainable_weights
 
-    def train(self, n_epoch, train_dataset=None, test_dataset=False, print_train_batch=False, print_freq=5):
+    def train(
+        self, n_epoch, train_dataset=None, test_dataset=False, print_train_batch=False, print_freq=5, jit=False,
+        grad_accum_steps=1, checkpointer=None
+    ):
+        """Train the network for a given number of epochs.
+
+        Parameters
+        ----------
+        n_epoch : int
+            Number of training epochs.
+        train_dataset : Iterable
+            Yields ``(X_batch, y_batch)`` tuples.
+        test_dataset : Iterable or False
+            If given, the network is evaluated on it every `print_freq` epochs.
+        print_train_batch : boolean
+            Whether to print the running loss and accuracy after every batch.
+        print_freq : int
+            Print (and evaluate) every `print_freq` epochs.
+        jit : boolean
+            If True, forward, loss, gradient and optimizer update are traced once into a single compiled
+            step function (``tf.function``) which is reused for every batch. Only supported by the
+            tensorflow backend, other backends fall back to eager execution. Default False.
+        grad_accum_steps : int
+            Number of consecutive batches (micro-batches) whose gradients are averaged into one optimizer update.
+            Training on micro-batches of size B with ``grad_accum_steps=N`` gives the same update as one batch of
+            size N * B, while only one micro-batch of activations is kept in memory. A trailing group of fewer
+            than N batches is applied at the end of the epoch, averaged over its own size. Default 1, update after
+            every batch.
+        checkpointer : :class:`tl.files.AsyncCheckpointer` or None
+            If given, ``checkpointer.step()`` is called after every batch, which saves the weights every
+            ``checkpointer.save_steps`` batches. Only copying the weights to host blocks training, the file is
+            written in the background. All checkpoints are on disk when ``train()`` returns. Default None.
+
+        Notes
+        -----
+        Retrace policy of ``jit=True``: the step is traced with the leading (batch) dimension of every input
+        relaxed to ``None``, so a smaller last batch reuses the same trace. A batch whose non-batch shape or
+        dtype differs from all previous ones is traced again and the new trace is cached next to the old ones,
+        so feeding a few distinct input shapes costs one trace per shape. Python side effects inside the
+        network (e.g. printing, reading ``is_train``) only happen while tracing.
+
+        """
+
         if not isinstance(train_dataset, Iterable):
             raise Exception("Expected type in (train_dataset, Iterable), but got {}.".format(type(train_dataset)))
 
+        if not isinstance(grad_accum_steps, int) or grad_accum_steps < 1:
+            raise ValueError("grad_accum_steps should be a positive integer, but got {}.".format(grad_accum_steps))
+
+        if jit and tl.BACKEND != 'tensorflow':
+            logging.warning("jit=True is only supported by the tensorflow backend, fall back to eager training.")
+
         if tl.BACKEND == 'tensorflow':
             self.tf_train(
                 n_epoch=n_epoch, train_dataset=train_dataset, network=self.network, loss_fn=self.loss_fn,
                 train_weights=self.train_weights, optimizer=self.optimizer, metrics=self.metrics,
-                print_train_batch=print_train_batch, print_freq=print_freq, test_dataset=test_dataset
+                print_train_batch=print_train_batch, print_freq=print_freq, test_dataset=test_dataset, jit=jit,
+                grad_accum_steps=grad_accum_steps, checkpointer=checkpointer
             )
         elif tl.BACKEND == 'mindspore':
             self.ms_train(
                 n_epoch=n_epoch, train_dataset=train_dataset, network=self.network, loss_fn=self.loss_fn,
                 train_weights=self.train_weights, optimizer=self.optimizer, metrics=self.metrics,
-                print_train_batch=print_train_batch, print_freq=print_freq, test_dataset=test_dataset
+                print_train_batch=print_train_batch, print_freq=print_freq, test_dataset=test_dataset,
+                grad_accum_steps=grad_accum_steps, checkpointer=checkpointer
             )
         elif tl.BACKEND == 'paddle':
             self.pd_train(
                 n_epoch=n_epoch, train_dataset=train_dataset, network=self.network, loss_fn=self.loss_fn,
                 train_weights=self.train_weights, optimizer=self.optimizer, metrics=self.metrics,
-                print_train_batch=print_train_batch, print_freq=print_freq, test_dataset=test_dataset
+                print_train_batch=print_train_batch, print_freq=print_freq, test_dataset=test_dataset,
+                grad_accum_steps=grad_accum_steps, checkpointer=checkpointer
             )
 
+        if checkpointer is not None:
+            checkpointer.wait()
+
     def eval(self, test_dataset):
         self.network.set_eval()
         test_loss, test_acc, n_iter = 0, 0, 0
+        if self.metrics:
+            self.metrics.reset()
         for X_batch, y_batch in test_dataset:
             _logits = self.network(X_batch)
             test_loss += self.loss_fn(_logits, y_batch)
             if self.metrics:
-                try:
-                    test_acc += self.metrics(_logits, y_batch)
-                except:
-                    self.metrics.update(_logits, y_batch)
-                    test_acc += self.metrics.result()
-                    self.metrics.reset()
+                self.metrics.update(_logits, y_batch)
             else:
-                test_acc += np.mean(np.equal(np.argmax(_logits, 1), y_batch))
+                test_acc += _batch_accuracy(_logits, y_batch)
             n_iter += 1
-        print("   test loss: {}".format(test_loss / n_iter))
-        print("   test acc:  {}".format(test_acc / n_iter))
+        print("   test loss: {}".format(_to_host(test_loss / n_iter)))
+        print("   test acc:  {}".format(_epoch_accuracy(self.metrics, test_acc, n_iter)))
 
     def save_weights(self, file_path, format=None):
         """Input file_path, save model weights into a file of given format.
@@ -221,64 +275,93 @@ class Model:
 
     def tf_train(
         self, n_epoch, train_dataset, network, loss_fn, train_weights, optimizer, metrics, print_train_batch,
-        print_freq, test_dataset
+        print_freq, test_dataset, jit=False, grad_accum_steps=1, checkpointer=None
     ):
+        if grad_accum_steps > 1:
+            accum_grads = _tf_gradient_accumulators(train_weights)
+
+        def train_step(X_batch, y_batch):
+            with tf.GradientTape() as tape:
+                # compute outputs
+                _logits = network(X_batch)
+                # compute loss and update model
+                _loss_ce = loss_fn(_logits, y_batch)
+
+            if grad_accum_steps == 1:
+                grad = tape.gradient(_loss_ce, train_weights)
+                optimizer.apply_gradients(zip(grad, train_weights))
+            else:
+                grad = tape.gradient(_loss_ce, train_weights)
+                _tf_accumulate_gradients(accum_grads, grad)
+            return _logits, _loss_ce
+
+        def apply_step(group_size):
+            optimizer.apply_gradients(zip(_tf_pop_accumulated_gradients(accum_grads, group_size), train_weights))
+
+        if jit:
+            train_step = _tf_compile_step(train_step)
+            apply_step = tf.function(apply_step)
+
         for epoch in range(n_epoch):
             start_time = time.time()
 
             train_loss, train_acc, n_iter = 0, 0, 0
+            if metrics:
+                metrics.reset()
             for X_batch, y_batch in train_dataset:
                 network.set_train()
 
-                with tf.GradientTape() as tape:
-                    # compute outputs
-                    _logits = network(X_batch)
-                    # compute loss and update model
-                    _loss_ce = loss_fn(_logits, y_batch)
-
-                grad = tape.gradient(_loss_ce, train_weights)
-                optimizer.apply_gradients(zip(grad, train_weights))
+                _logits, _loss_ce = train_step(X_batch, y_batch)
 
+                # loss and accuracy stay on device, they are only fetched when printed
                 train_loss += _loss_ce
                 if metrics:
                     metrics.update(_logits, y_batch)
-                    train_acc += metrics.result()
-                    metrics.reset()
                 else:
-                    train_acc += np.mean(np.equal(np.argmax(_logits, 1), y_batch))
+                    train_acc += _batch_accuracy(_logits, y_batch)
                 n_iter += 1
 
+                if grad_accum_steps > 1 and n_iter % grad_accum_steps == 0:
+                    apply_step(grad_accum_steps)
+
+                if checkpointer is not None:
+                    checkpointer.step(network.all_weights)
+
                 if print_train_batch:
                     print("Epoch {} of {} took {}".format(epoch + 1, n_epoch, time.time() - start_time))
-                    print("   train loss: {}".format(train_loss / n_iter))
-                    print("   train acc:  {}".format(train_acc / n_iter))
+                    print("   train loss: {}".format(_to_host(train_loss / n_iter)))
+                    print("   train acc:  {}".format(_epoch_accuracy(metrics, train_acc, n_iter)))
+
+            # apply the gradients of a trailing group of fewer than grad_accum_steps batches
+            if grad_accum_steps > 1 and n_iter % grad_accum_steps != 0:
+                apply_step(n_iter % grad_accum_steps)
 
             if epoch + 1 == 1 or (epoch + 1) % print_freq == 0:
                 print("Epoch {} of {} took {}".format(epoch + 1, n_epoch, time.time() - start_time))
-                print("   train loss: {}".format(train_loss / n_iter))
-                print("   train acc:  {}".format(train_acc / n_iter))
+                print("   train loss: {}".format(_to_host(train_loss / n_iter)))
+                print("   train acc:  {}".format(_epoch_accuracy(metrics, train_acc, n_iter)))
 
             if test_dataset:
                 # use training and evaluation sets to evaluate the model every print_freq epoch
                 if epoch + 1 == 1 or (epoch + 1) % print_freq == 0:
                     network.set_eval()
                     val_loss, val_acc, n_iter = 0, 0, 0
+                    if metrics:
+                        metrics.reset()
                     for X_batch, y_batch in test_dataset:
                         _logits = network(X_batch)  # is_train=False, disable dropout
                         val_loss += loss_fn(_logits, y_batch, name='eval_loss')
                         if metrics:
                             metrics.update(_logits, y_batch)
-                            val_acc += metrics.result()
-                            metrics.reset()
                         else:
-                            val_acc += np.mean(np.equal(np.argmax(_logits, 1), y_batch))
+                            val_acc += _batch_accuracy(_logits, y_batch)
                         n_iter += 1
-                    print("   val loss: {}".format(val_loss / n_iter))
-                    print("   val acc:  {}".format(val_acc / n_iter))
+                    print("   val loss: {}".format(_to_host(val_loss / n_iter)))
+                    print("   val acc:  {}".format(_epoch_accuracy(metrics, val_acc, n_iter)))
 
     def ms_train(
         self, n_epoch, train_dataset, network, loss_fn, train_weights, optimizer, metrics, print_train_batch,
-        print_freq, test_dataset
+        print_freq, test_dataset, grad_accum_steps=1, checkpointer=None
     ):
         net_with_criterion = WithLoss(network, loss_fn)
         train_network = GradWrap(net_with_criterion, network.trainable_weights)
@@ -286,102 +369,220 @@ class Model:
         for epoch in range(n_epoch):
             start_time = time.time()
             train_loss, train_acc, n_iter = 0, 0, 0
+            accum_grads = None
+            if metrics:
+                metrics.reset()
             for X_batch, y_batch in train_dataset:
                 output = network(X_batch)
                 loss_output = loss_fn(output, y_batch)
                 grads = train_network(X_batch, y_batch)
-                success = optimizer.apply_gradients(zip(grads, train_weights))
-                loss = loss_output.asnumpy()
-                train_loss += loss
+                if grad_accum_steps == 1:
+                    success = optimizer.apply_gradients(zip(grads, train_weights))
+                else:
+                    accum_grads = _ms_accumulate_gradients(accum_grads, grads)
+
+                # loss and accuracy stay on device, they are only fetched when printed
+                train_loss += loss_output
                 if metrics:
                     metrics.update(output, y_batch)
-                    train_acc += metrics.result()
-                    metrics.reset()
                 else:
-                    train_acc += np.mean((P.Equal()(P.Argmax(axis=1)(output), y_batch).asnumpy()))
+                    train_acc += _batch_accuracy(output, y_batch)
                 n_iter += 1
 
+                if grad_accum_steps > 1 and n_iter % grad_accum_steps == 0:
+                    optimizer.apply_gradients(zip([g / grad_accum_steps for g in accum_grads], train_weights))
+                    accum_grads = None
+
+                if checkpointer is not None:
+                    checkpointer.step(network.all_weights)
+
                 if print_train_batch:
                     print("Epoch {} of {} took {}".format(epoch + 1, n_epoch, time.time() - start_time))
-                    print("   train loss: {}".format(train_loss / n_iter))
-                    print("   train acc:  {}".format(train_acc / n_iter))
+                    print("   train loss: {}".format(_to_host(train_loss / n_iter)))
+                    print("   train acc:  {}".format(_epoch_accuracy(metrics, train_acc, n_iter)))
+
+            # apply the gradients of a trailing group of fewer than grad_accum_steps batches
+            if grad_accum_steps > 1 and n_iter % grad_accum_steps != 0:
+                group_size = n_iter % grad_accum_steps
+                optimizer.apply_gradients(zip([g / group_size for g in accum_grads], train_weights))
 
             if epoch + 1 == 1 or (epoch + 1) % print_freq == 0:
                 print("Epoch {} of {} took {}".format(epoch + 1, n_epoch, time.time() - start_time))
-                print("   train loss: {}".format(train_loss / n_iter))
-                print("   train acc:  {}".format(train_acc / n_iter))
+                print("   train loss: {}".format(_to_host(train_loss / n_iter)))
+                print("   train acc:  {}".format(_epoch_accuracy(metrics, train_acc, n_iter)))
 
             if test_dataset:
                 # use training and evaluation sets to evaluate the model every print_freq epoch
                 if epoch + 1 == 1 or (epoch + 1) % print_freq == 0:
                     network.set_eval()
                     val_loss, val_acc, n_iter = 0, 0, 0
+                    if metrics:
+                        metrics.reset()
                     for X_batch, y_batch in test_dataset:
                         _logits = network(X_batch)
                         val_loss += loss_fn(_logits, y_batch, name='eval_loss')
                         if metrics:
                             metrics.update(_logits, y_batch)
-                            val_acc += metrics.result()
-                            metrics.reset()
                         else:
-                            val_acc += np.mean((P.Equal()(P.Argmax(axis=1)(_logits), y_batch).asnumpy()))
+                            val_acc += _batch_accuracy(_logits, y_batch)
                         n_iter += 1
-                    print("   val loss: {}".format(val_loss / n_iter))
-                    print("   val acc:  {}".format(val_acc / n_iter))
+                    print("   val loss: {}".format(_to_host(val_loss / n_iter)))
+                    print("   val acc:  {}".format(_epoch_accuracy(metrics, val_acc, n_iter)))
 
     def pd_train(
         self, n_epoch, train_dataset, network, loss_fn, train_weights, optimizer, metrics, print_train_batch,
-        print_freq, test_dataset
+        print_freq, test_dataset, grad_accum_steps=1, checkpointer=None
     ):
         for epoch in range(n_epoch):
             start_time = time.time()
 
             train_loss, train_acc, n_iter = 0, 0, 0
+            if metrics:
+                metrics.reset()
             for X_batch, y_batch in train_dataset:
                 network.set_train()
 
                 output = network(X_batch)
                 loss = loss_fn(output, y_batch)
-                loss_ce = loss.numpy()
-                params_grads = optimizer.gradient(loss, train_weights)
-                optimizer.apply_gradients(params_grads)
+                if grad_accum_steps == 1:
+                    params_grads = optimizer.gradient(loss, train_weights)
+                    optimizer.apply_gradients(params_grads)
+                else:
+                    # paddle sums the gradients of every backward() into param.grad until apply_gradients()
+                    # clears them, so the pairs returned for the latest micro-batch hold the whole group.
+                    params_grads = optimizer.gradient(loss / grad_accum_steps, train_weights)
 
-                train_loss += loss_ce
+                # loss and accuracy stay on device, they are only fetched when printed.
+                # detach() keeps the accumulated loss from holding on to the autograd graph of every step.
+                train_loss += loss.detach()
                 if metrics:
                     metrics.update(output, y_batch)
-                    train_acc += metrics.result()
-                    metrics.reset()
                 else:
-                    train_acc += pd.metric.accuracy(output, y_batch)
+                    train_acc += _batch_accuracy(output, y_batch)
                 n_iter += 1
 
+                if grad_accum_steps > 1 and n_iter % grad_accum_steps == 0:
+                    optimizer.apply_gradients(params_grads)
+
+                if checkpointer is not None:
+                    checkpointer.step(network.all_weights)
+
                 if print_train_batch:
                     print("Epoch {} of {} took {}".format(epoch + 1, n_epoch, time.time() - start_time))
-                    print("   train loss: {}".format(train_loss / n_iter))
-                    print("   train acc:  {}".format(train_acc / n_iter))
+                    print("   train loss: {}".format(_to_host(train_loss / n_iter)))
+                    print("   train acc:  {}".format(_epoch_accuracy(metrics, train_acc, n_iter)))
+
+            # apply the gradients of a trailing group of fewer than grad_accum_steps batches
+            if grad_accum_steps > 1 and n_iter % grad_accum_steps != 0:
+                # the gradients were divided by grad_accum_steps, rescale them to the mean over the group
+                rescale = grad_accum_steps / float(n_iter % grad_accum_steps)
+                optimizer.apply_gradients([(weight, grad * rescale) for weight, grad in params_grads])
 
             if epoch + 1 == 1 or (epoch + 1) % print_freq == 0:
                 print("Epoch {} of {} took {}".format(epoch + 1, n_epoch, time.time() - start_time))
-                print("   train loss: {}".format(train_loss / n_iter))
-                print("   train acc:  {}".format(train_acc / n_iter))
+                print("   train loss: {}".format(_to_host(train_loss / n_iter)))
+                print("   train acc:  {}".format(_epoch_accuracy(metrics, train_acc, n_iter)))
 
             if test_dataset:
                 # use training and evaluation sets to evaluate the model every print_freq epoch
                 if epoch + 1 == 1 or (epoch + 1) % print_freq == 0:
                     network.set_eval()
                     val_loss, val_acc, n_iter = 0, 0, 0
+                    if metrics:
+                        metrics.reset()
                     for X_batch, y_batch in test_dataset:
                         _logits = network(X_batch)  # is_train=False, disable dropout
                         val_loss += loss_fn(_logits, y_batch, name='eval_loss')
                         if metrics:
                             metrics.update(_logits, y_batch)
-                            val_acc += metrics.result()
-                            metrics.reset()
                         else:
-                            val_acc += np.mean(np.equal(np.argmax(_logits, 1), y_batch))
+                            val_acc += _batch_accuracy(_logits, y_batch)
                         n_iter += 1
-                    print("   val loss: {}".format(val_loss / n_iter))
-                    print("   val acc:  {}".format(val_acc / n_iter))
+                    print("   val loss: {}".format(_to_host(val_loss / n_iter)))
+                    print("   val acc:  {}".format(_epoch_accuracy(metrics, val_acc, n_iter)))
+
+
+def _batch_accuracy(logits, labels):
+    """Top-1 accuracy of a batch, returned as a backend tensor so that no host sync is needed."""
+
+    if tl.BACKEND == 'tensorflow':
+        correct = tf.equal(tf.argmax(logits, 1), tf.cast(labels, tf.int64))
+        return tf.reduce_mean(tf.cast(correct, tf.float32))
+    elif tl.BACKEND == 'mindspore':
+        correct = P.Equal()(P.Argmax(axis=1)(logits), labels)
+        return P.ReduceMean()(P.Cast()(correct, mstype.float32))
+    elif tl.BACKEND == 'paddle':
+        return pd.metric.accuracy(logits, labels)
+    else:
+        raise NotImplementedError("This backend is not supported")
+
+
+def _to_host(value):
+    """Fetch an accumulated loss or accuracy to host for printing."""
+
+    if isinstance(value, (int, float, np.ndarray, np.generic)):
+        return value
+    return tl.ops.convert_to_numpy(value)
+
+
+def _epoch_accuracy(metrics, acc, n_iter):
+    """Result of the epoch-level metrics if given, else the mean of the accumulated batch accuracies."""
+
+    if metrics:
+        return _to_host(metrics.result())
+    return _to_host(acc / n_iter)
+
+
+def _tf_compile_step(step_fn):
+    """Wrap `step_fn(X_batch, y_batch)` into compiled ``tf.function`` traces.
+
+    One trace is kept per distinct non-batch input signature, and the batch dimension of every trace is
+    ``None``, so batches of a different size never trigger a retrace.
+
+    """
+
+    traces = {}
+
+    def _spec(t):
+        return tf.TensorSpec([None] + t.shape.as_list()[1:], t.dtype)
+
+    def compiled_step(X_batch, y_batch):
+        inputs = tf.nest.map_structure(tf.convert_to_tensor, (X_batch, y_batch))
+        signature = tf.nest.map_structure(_spec, inputs)
+        key = tuple((tuple(s.shape.as_list()), s.dtype) for s in tf.nest.flatten(signature))
+        if key not in traces:
+            traces[key] = tf.function(step_fn, input_signature=signature)
+        return traces[key](*inputs)
+
+    return compiled_step
+
+
+def _tf_gradient_accumulators(train_weights):
+    """Create one zero-initialized, non-trainable variable per weight to sum micro-batch gradients into."""
+
+    return [tf.Variable(tf.zeros_like(w), trainable=False) for w in train_weights]
+
+
+def _tf_accumulate_gradients(accum_grads, grads):
+    for accum, grad in zip(accum_grads, grads):
+        if grad is not None:
+            accum.assign_add(grad)
+
+
+def _tf_pop_accumulated_gradients(accum_grads, group_size):
+    """Return the mean of the gradients accumulated over `group_size` micro-batches and reset the accumulators
+    to zero."""
+
+    grads = [accum.read_value() / group_size for accum in accum_grads]
+    for accum in accum_grads:
+        accum.assign(tf.zeros_like(accum))
+    return grads
+
+
+def _ms_accumulate_gradients(accum_grads, grads):
+    if accum_grads is None:
+        return list(grads)
+    return [accum + grad for accum, grad in zip(accum_grads, grads)]
 
 
 class WithLoss(Module):
@@ -437,51 +638,173 @@ class GradWrap(Module):
         return composite.GradOperation(get_by_list=True)(self.network, self.weights)(x, label)
 
 
+class DynamicLossScale(object):
+    """
+    Dynamic loss scaling for mixed precision training.
+
+    The loss is multiplied by `scale` before the backward pass, so that small float16 gradients do not
+    underflow, and the gradients are divided by it again before the update. If any gradient overflows
+    (inf or nan), the update is skipped and the scale is multiplied by `backoff_factor`. After
+    `growth_interval` finite updates in a row, the scale is multiplied by `growth_factor`.
+
+    Parameters
+    ----------
+    initial_scale : float
+        The loss scale to start with.
+    growth_factor : float
+        Factor to increase the scale by after `growth_interval` finite updates.
+    backoff_factor : float
+        Factor to decrease the scale by when the gradients overflow.
+    growth_interval : int
+        Number of finite updates in a row before the scale is increased.
+
+    Examples
+    --------
+    >>> import tensorlayer as tl
+    >>> net = vgg16()
+    >>> net.set_compute_dtype('float16')
+    >>> net_with_loss = tl.models.WithLoss(net, tl.cost.softmax_cross_entropy_with_logits)
+    >>> train_one_step = tl.models.TrainOneStep(
+    >>>     net_with_loss, optimizer, net.trainable_weights, loss_scale=tl.models.DynamicLossScale()
+    >>> )
+
+    """
+
+    def __init__(self, initial_scale=2.0**15, growth_factor=2.0, backoff_factor=0.5, growth_interval=2000):
+        self.scale = float(initial_scale)
+        self.growth_factor = growth_factor
+        self.backoff_factor = backoff_factor
+        self.growth_interval = growth_interval
+        self._good_steps = 0
+
+    def unscale(self, grads):
+        """Divide the gradients of the scaled loss by the loss scale."""
+
+        return [None if grad is None else grad / self.scale for grad in grads]
+
+    def update(self, grads):
+        """Adjust the scale given the unscaled gradients, return False if the update should be skipped."""
+
+        if not _all_finite(grads):
+            self.scale = max(self.scale * self.backoff_factor, 1.0)
+            self._good_steps = 0
+            return False
+
+        self._good_steps += 1
+        if self._good_steps >= self.growth_interval:
+            self.scale *= self.growth_factor
+            self._good_steps = 0
+        return True
+
+
+def _all_finite(grads):
+    grads = [grad for grad in grads if grad is not None]
+    if tl.BACKEND == 'tensorflow':
+        return bool(tf.reduce_all([tf.reduce_all(tf.math.is_finite(grad)) for grad in grads]))
+    elif tl.BACKEND == 'paddle':
+        return all(bool(pd.isfinite(grad).all()) for grad in grads)
+    else:
+        raise NotImplementedError("This backend is not supported")
+
+
 class TrainOneStepWithTF(object):
 
-    def __init__(self, net_with_loss, optimizer, train_weights):
+    def __init__(self, net_with_loss, optimizer, train_weights, grad_accum_steps=1, loss_scale=None):
         self.net_with_loss = net_with_loss
         self.optimzer = optimizer
         self.train_weights = train_weights
+        self.grad_accum_steps = grad_accum_steps
+        self.loss_scale = loss_scale
+        self.n_step = 0
+        if grad_accum_steps > 1:
+            self.accum_grads = _tf_gradient_accumulators(train_weights)
 
     def __call__(self, data, label):
         with tf.GradientTape() as tape:
             loss = self.net_with_loss(data, label)
-        grad = tape.gradient(loss, self.train_weights)
-        self.optimzer.apply_gradients(zip(grad, self.train_weights))
+            scaled_loss = loss if self.loss_scale is None else loss * self.loss_scale.scale
+        grad = tape.gradient(scaled_loss, self.train_weights)
+        if self.grad_accum_steps == 1:
+            self._apply_gradients(grad)
+        else:
+            _tf_accumulate_gradients(self.accum_grads, grad)
+            self.n_step += 1
+            if self.n_step % self.grad_accum_steps == 0:
+                self._apply_gradients(_tf_pop_accumulated_gradients(self.accum_grads, self.grad_accum_steps))
         return loss
 
+    def _apply_gradients(self, grad):
+        if self.loss_scale is not None:
+            grad = self.loss_scale.unscale(grad)
+            if not self.loss_scale.update(grad):
+                # the gradients overflowed, skip this update and retry with the lowered scale
+                return
+        self.optimzer.apply_gradients(zip(grad, self.train_weights))
+
 
 class TrainOneStepWithMS(object):
 
-    def __init__(self, net_with_loss, optimizer, train_weights):
+    def __init__(self, net_with_loss, optimizer, train_weights, grad_accum_steps=1):
         self.net_with_loss = net_with_loss
         self.optimizer = optimizer
         self.train_weights = train_weights
         self.net_with_loss = net_with_loss
         self.train_network = GradWrap(net_with_loss, train_weights)
+        self.grad_accum_steps = grad_accum_steps
+        self.n_step = 0
+        self.accum_grads = None
 
     def __call__(self, data, label):
         loss = self.net_with_loss(data, label)
         grads = self.train_network(data, label)
-        self.optimizer.apply_gradients(zip(grads, self.train_weights))
+        if self.grad_accum_steps == 1:
+            self.optimizer.apply_gradients(zip(grads, self.train_weights))
+        else:
+            self.accum_grads = _ms_accumulate_gradients(self.accum_grads, grads)
+            self.n_step += 1
+            if self.n_step % self.grad_accum_steps == 0:
+                grads = [g / self.grad_accum_steps for g in self.accum_grads]
+                self.optimizer.apply_gradients(zip(grads, self.train_weights))
+                self.accum_grads = None
         loss = loss.asnumpy()
         return loss
 
 
 class TrainOneStepWithPD(object):
 
-    def __init__(self, net_with_loss, optimizer, train_weights):
+    def __init__(self, net_with_loss, optimizer, train_weights, grad_accum_steps=1, loss_scale=None):
         self.net_with_loss = net_with_loss
         self.optimizer = optimizer
         self.train_weights = train_weights
+        self.grad_accum_steps = grad_accum_steps
+        self.loss_scale = loss_scale
+        self.n_step = 0
 
     def __call__(self, data, label):
         loss = self.net_with_loss(data, label)
-        params_grads = self.optimizer.gradient(loss, self.train_weights)
-        self.optimizer.apply_gradients(params_grads)
+        scaled_loss = loss if self.loss_scale is None else loss * self.loss_scale.scale
+        if self.grad_accum_steps == 1:
+            params_grads = self.optimizer.gradient(scaled_loss, self.train_weights)
+            self._apply_gradients(params_grads)
+        else:
+            # gradients are summed into param.grad until apply_gradients() clears them
+            params_grads = self.optimizer.gradient(scaled_loss / self.grad_accum_steps, self.train_weights)
+            self.n_step += 1
+            if self.n_step % self.grad_accum_steps == 0:
+                self._apply_gradients(params_grads)
         return loss.numpy()
 
+    def _apply_gradients(self, params_grads):
+        if self.loss_scale is not None:
+            grads = self.loss_scale.unscale([grad for _, grad in params_grads])
+            if not self.loss_scale.update(grads):
+                # the gradients overflowed, drop them and retry with the lowered scale
+                for weight in self.train_weights:
+                    weight.clear_gradient()
+                return
+            params_grads = [(weight, grad) for (weight, _), grad in zip(params_grads, grads)]
+        self.optimizer.apply_gradients(params_grads)
+
 
 class TrainOneStep(object):
     """
@@ -497,6 +820,12 @@ class TrainOneStep(object):
         Optimizer for updating the weights
     train_weights : class
         Dict or set of metrics to be evaluated by the model during
+    grad_accum_steps : int
+        Number of calls (micro-batches) whose gradients are averaged into one optimizer update.
+        The weights are only updated on every `grad_accum_steps`-th call. Default 1.
+    loss_scale : DynamicLossScale or None
+        Loss scaling for float16 mixed precision training, see :class:`DynamicLossScale` and
+        ``Module.set_compute_dtype``. Only supported by the tensorflow and paddle backends. Default None.
 
     Examples
     --------
@@ -512,13 +841,22 @@ class TrainOneStep(object):
 
     """
 
-    def __init__(self, net_with_loss, optimizer, train_weights):
+    def __init__(self, net_with_loss, optimizer, train_weights, grad_accum_steps=1, loss_scale=None):
+        if not isinstance(grad_accum_steps, int) or grad_accum_steps < 1:
+            raise ValueError("grad_accum_steps should be a positive integer, but got {}.".format(grad_accum_steps))
+
         if tl.BACKEND == 'tensorflow':
-            self.net_with_train = TrainOneStepWithTF(net_with_loss, optimizer, train_weights)
+            self.net_with_train = TrainOneStepWithTF(
+                net_with_loss, optimizer, train_weights, grad_accum_steps, loss_scale
+            )
         elif tl.BACKEND == 'mindspore':
-            self.net_with_train = TrainOneStepWithMS(net_with_loss, optimizer, train_weights)
+            if loss_scale is not None:
+                raise NotImplementedError("loss_scale is not supported by the mindspore backend.")
+            self.net_with_train = TrainOneStepWithMS(net_with_loss, optimizer, train_weights, grad_accum_steps)
         elif tl.BACKEND == 'paddle':
-            self.net_with_train = TrainOneStepWithPD(net_with_loss, optimizer, train_weights)
+            self.net_with_train = TrainOneStepWithPD(
+                net_with_loss, optimizer, train_weights, grad_accum_steps, loss_scale
+            )
         else:
             raise NotImplementedError("This backend is not supported")
 
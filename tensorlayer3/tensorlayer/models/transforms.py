@@ -0,0 +1,383 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import inspect
+
+import numpy as np
+import tensorflow as tf
+
+import tensorlayer as tl
+from tensorlayer import logging
+from tensorlayer.layers.convolution.simplified_conv import Conv1d, Conv2d, Conv3d
+from tensorlayer.layers.core import LayerList, Module, SequentialLayer
+from tensorlayer.layers.dense.base_dense import Dense
+from tensorlayer.layers.fusion import _batchnorm_folded_weights
+from tensorlayer.layers.normalization import BatchNorm
+
+__all__ = ['fold_batchnorm', 'quantize_int8']
+
+_channels_last_formats = ('NWC', 'NHWC', 'NDHWC')
+
+# int8 x int8 -> int32 matmul, older TensorFlow releases have no output_type
+_int8_matmul = 'output_type' in inspect.signature(tf.linalg.matmul).parameters
+
+
+class _FoldedBatchNorm(Module):
+    """Stands in for a BatchNorm which has been folded into the layer before it, only its activation is left."""
+
+    def __init__(self, act, name=None):
+        super(_FoldedBatchNorm, self).__init__(name=name)
+        self.act = act
+        self._built = True
+
+    def forward(self, inputs):
+        if self.act is not None:
+            return self.act(inputs)
+        return inputs
+
+
+def fold_batchnorm(network, inputs=None):
+    """Fold every BatchNorm into the Conv1d, Conv2d, Conv3d or Dense layer before it, for inference.
+
+    The moving mean and variance, gamma and beta of the BatchNorm are baked into the weights and biases of the
+    layer before it (a bias is added if it has none), and the BatchNorm is replaced by a layer which only applies
+    its activation. This saves one pass over the activations per BatchNorm. The network is switched to
+    evaluation mode and changed in place, training it afterwards is not supported.
+
+    A layer and a BatchNorm are folded if the layer has no activation and computes in the dtype of its weights,
+    and the BatchNorm normalizes the channel axis of the layer, and
+
+    1) they are next to each other in a :class:`SequentialLayer`, or
+    2) `inputs` is given, and tracing the network on `inputs` shows that the output of the layer is only used
+       by the BatchNorm. The network is then run on `inputs` again, and if its output changed, it is restored
+       and a RuntimeError is raised, e.g. when the output of the layer is also used outside of a layer call.
+
+    Parameters
+    ----------
+    network : Module
+        The network to be folded.
+    inputs : tensor, numpy.array or None
+        A sample input batch, which is needed to find the layers which are called one after another in the
+        ``forward`` of a custom Module, e.g. the blocks of a ResNet. Default None, only SequentialLayer is
+        searched.
+
+    Returns
+    -------
+    Module
+        The folded `network`.
+
+    Examples
+    --------
+    >>> net = ResNet50(pretrained=True)
+    >>> net = tl.models.fold_batchnorm(net, inputs=x[:1])
+    >>> net.set_eval()
+    >>> y = net(x)
+
+    """
+
+    if tl.BACKEND != 'tensorflow':
+        raise NotImplementedError("fold_batchnorm is only supported by the tensorflow backend.")
+
+    network.set_eval()
+    pairs = _sequential_pairs(network)
+    if inputs is not None:
+        expected = tl.ops.convert_to_numpy(network(inputs))
+        folded_bns = set(id(bn) for _, bn in pairs)
+        pairs += [(layer, bn) for layer, bn in _traced_pairs(network, inputs) if id(bn) not in folded_bns]
+
+    parents = _parents(network)
+    undo = [_fold_pair(layer, bn, parents[id(bn)]) for layer, bn in pairs]
+
+    if inputs is not None:
+        outputs = tl.ops.convert_to_numpy(network(inputs))
+        if np.max(np.abs(outputs - expected)) > 1e-3 * max(1.0, np.max(np.abs(expected))):
+            for restore in reversed(undo):
+                restore()
+            raise RuntimeError(
+                "The output of the network changed after folding its BatchNorm, the network is restored. "
+                "It may use the output of a folded layer outside of a layer call."
+            )
+    logging.info("Folded %d BatchNorm layers of %s" % (len(pairs), network.name))
+    return network
+
+
+def _foldable(layer, bn):
+    if not isinstance(bn, BatchNorm) or type(layer) not in (Conv1d, Conv2d, Conv3d, Dense):
+        return False
+    if not getattr(layer, '_built', False) or not getattr(bn, '_built', False):
+        return False
+    if layer.compute_dtype is not None or layer.act_init_flag:
+        return False
+    channels_last = type(layer) is Dense or layer.data_format in _channels_last_formats
+    return (bn.data_format == 'channels_last') == channels_last
+
+
+def _sequential_pairs(network):
+    pairs = []
+    for _, layer in network.layers_and_names(name_prefix=''):
+        if isinstance(layer, SequentialLayer):
+            for prev, layer in zip(layer.layer_list[:-1], layer.layer_list[1:]):
+                if _foldable(prev, layer):
+                    pairs.append((prev, layer))
+    return pairs
+
+
+def _traced_pairs(network, inputs):
+    """Run the network on `inputs`, recording the inputs and outputs of every call of a layer without sublayers,
+    and return the (layer, BatchNorm) pairs where the output of the layer is only used by the BatchNorm."""
+
+    calls = []
+
+    def recorded(layer, forward):
+
+        def forward_and_record(inputs, *args, **kwargs):
+            outputs = forward(inputs, *args, **kwargs)
+            calls.append((layer, inputs, outputs))
+            return outputs
+
+        return forward_and_record
+
+    leaves = [layer for _, layer in network.layers_and_names(name_prefix='') if not layer._layers]
+    for layer in leaves:
+        object.__setattr__(layer, 'forward', recorded(layer, layer.forward))
+    try:
+        network(inputs)
+    finally:
+        for layer in leaves:
+            del layer.__dict__['forward']
+
+    n_calls = {}
+    for layer, _, _ in calls:
+        n_calls[id(layer)] = n_calls.get(id(layer), 0) + 1
+    pairs = []
+    for layer, _, outputs in calls:
+        consumers = [consumer for consumer, consumer_inputs, _ in calls if consumer_inputs is outputs]
+        if len(consumers) != 1 or n_calls[id(layer)] != 1 or n_calls[id(consumers[0])] != 1:
+            continue
+        if _foldable(layer, consumers[0]):
+            pairs.append((layer, consumers[0]))
+    return pairs
+
+
+def _parents(network):
+    """The (parent, key) of every layer in the network by id."""
+
+    parents = {}
+    for _, layer in network.layers_and_names(name_prefix=''):
+        for key, child in layer._layers.items():
+            if child is not None:
+                parents[id(child)] = (layer, key)
+    return parents
+
+
+def _replace_child(parent, key, child):
+    if isinstance(parent, (SequentialLayer, LayerList)):
+        parent[list(parent._layers.keys()).index(key)] = child
+    else:
+        setattr(parent, key, child)
+
+
+def _fold_pair(layer, bn, parent):
+    """Fold `bn` into `layer` and replace it in `parent`. Returns a function undoing this."""
+
+    old_W = np.array(layer.W.numpy(), copy=True)
+    old_b = np.array(layer.b.numpy(), copy=True) if layer.b_init_flag else None
+    W, b = _batchnorm_folded_weights(layer, bn)
+
+    layer.W.assign(W)
+    if layer.b_init_flag:
+        layer.b.assign(b)
+    else:
+        layer.b = layer._get_weights("biases", shape=tuple(b.shape), init=tl.initializers.zeros())
+        layer.b.assign(b)
+        layer.bias_add = tl.ops.BiasAdd() if type(layer) is Dense else tl.ops.BiasAdd(layer.data_format)
+        layer.b_init_flag = True
+    _replace_child(parent[0], parent[1], _FoldedBatchNorm(bn.act if bn.act_init_flag else None, name=bn.name))
+
+    def restore():
+        _replace_child(parent[0], parent[1], bn)
+        layer.W.assign(old_W)
+        if old_b is None:
+            del layer.b
+            layer.b_init_flag = False
+        else:
+            layer.b.assign(old_b)
+
+    return restore
+
+
+class _Int8Layer(Module):
+    """Stands in for a Conv2d or Dense layer whose weights are quantized to int8 with one scale per output
+    channel. The output channels are the last axis of the weights of both."""
+
+    def __init__(self, layer, input_range):
+        super(_Int8Layer, self).__init__(name=layer.name)
+        W = layer.W.numpy()
+        reduce_axes = tuple(range(W.ndim - 1))
+        scale = np.max(np.abs(W), axis=reduce_axes) / 127.0
+        scale[scale == 0] = 1.0
+        self.act = layer.act if layer.act_init_flag else None
+        self.input_scale = max(float(input_range), 1e-8) / 127.0
+        self.trainable = False
+        self.W_int8 = tf.Variable(
+            np.clip(np.round(W / scale), -127, 127).astype(np.int8), trainable=False, name=self.name + "/weights_int8"
+        )
+        self.W_scale = tf.Variable(scale.astype(np.float32), trainable=False, name=self.name + "/weights_scale")
+        self.b = layer.b if layer.b_init_flag else None
+        if self.b is not None:
+            self.bias_add = layer.bias_add
+        self._built = True
+
+    def forward(self, inputs):
+        outputs = self.int8_forward(inputs)
+        if self.b is not None:
+            outputs = self.bias_add(outputs, self.b)
+        if self.act is not None:
+            outputs = self.act(outputs)
+        return outputs
+
+    def dequantized_weights(self):
+        return tf.cast(self.W_int8, tf.float32) * self.W_scale
+
+
+class _Int8Dense(_Int8Layer):
+
+    def __init__(self, layer, input_range):
+        super(_Int8Dense, self).__init__(layer, input_range)
+        self.matmul = layer.matmul
+
+    def int8_forward(self, inputs):
+        if not _int8_matmul:
+            return self.matmul(inputs, self.dequantized_weights())
+        inputs_int8 = tf.cast(tf.clip_by_value(tf.round(inputs / self.input_scale), -127, 127), tf.int8)
+        outputs = tf.linalg.matmul(inputs_int8, self.W_int8, output_type=tf.int32)
+        return tf.cast(outputs, tf.float32) * (self.W_scale * self.input_scale)
+
+
+class _Int8Conv2d(_Int8Layer):
+
+    def __init__(self, layer, input_range):
+        super(_Int8Conv2d, self).__init__(layer, input_range)
+        self.conv2d = layer.conv2d
+
+    def int8_forward(self, inputs):
+        # TensorFlow has no int8 convolution on CPU, the weights are only stored as int8
+        return self.conv2d(inputs, self.dequantized_weights())
+
+
+def quantize_int8(network, calibration_data, validation_data=None):
+    """Post-training quantization of the Conv2d and Dense layers of a float network to int8, for inference.
+
+    The calibration batches are run through the network to record the largest absolute input of every Conv2d
+    and Dense layer. Then the weights of each of these layers are quantized to int8 with one scale per output
+    channel, and the layer is replaced by one which keeps only the int8 weights, their scales and the float
+    biases. A Dense layer quantizes its input with the calibrated range and runs an int8 matmul with int32
+    accumulation. A Conv2d layer dequantizes its weights for a float convolution, as TensorFlow has no int8
+    convolution on CPU. The network is switched to evaluation mode and changed in place, training it afterwards
+    is not supported.
+
+    Layers which compute in another dtype than their weights, or which are not called on the calibration data,
+    are kept as they are. Fold the BatchNorm layers first with :func:`fold_batchnorm`, so that the folded layers
+    are quantized too.
+
+    Parameters
+    ----------
+    network : Module
+        The network to be quantized.
+    calibration_data : iterable
+        Input batches, or (inputs, labels) batches, which should cover the range of the inputs at inference.
+        A few hundred samples are usually enough.
+    validation_data : iterable of (inputs, labels) or None
+        Batches with integer class labels to measure the accuracy of the network before and after quantization.
+        It is iterated twice, so it must not be a generator. Default None.
+
+    Returns
+    -------
+    dict
+        The report of the quantization, with the number of quantized `layers`, the size of all weights
+        in bytes before and after (`float_bytes`, `int8_bytes`) and their `size_ratio`. If `validation_data`
+        is given, also `float_accuracy`, `int8_accuracy`, `accuracy_drop` and `agreement`, the fraction of
+        samples for which both networks predict the same class.
+
+    Examples
+    --------
+    >>> net = tl.models.fold_batchnorm(net, inputs=x_val[:1])
+    >>> report = tl.models.quantize_int8(net, x_train[:512:32], validation_data=val_batches)
+    >>> print(report['size_ratio'], report['accuracy_drop'])
+
+    """
+
+    if tl.BACKEND != 'tensorflow':
+        raise NotImplementedError("quantize_int8 is only supported by the tensorflow backend.")
+
+    network.set_eval()
+    report = {'float_bytes': _weights_nbytes(network)}
+    if validation_data is not None:
+        float_accuracy, float_predictions = _evaluate(network, validation_data)
+
+    ranges = _calibrate(network, calibration_data)
+    parents = _parents(network)
+    layers = [layer for _, layer in network.layers_and_names(name_prefix='') if id(layer) in ranges]
+    for layer in layers:
+        int8_class = _Int8Dense if type(layer) is Dense else _Int8Conv2d
+        _replace_child(*parents[id(layer)], int8_class(layer, ranges[id(layer)]))
+
+    report['layers'] = len(layers)
+    report['int8_bytes'] = _weights_nbytes(network)
+    report['size_ratio'] = report['float_bytes'] / float(max(report['int8_bytes'], 1))
+    if validation_data is not None:
+        int8_accuracy, int8_predictions = _evaluate(network, validation_data)
+        report['float_accuracy'] = float_accuracy
+        report['int8_accuracy'] = int8_accuracy
+        report['accuracy_drop'] = float_accuracy - int8_accuracy
+        report['agreement'] = float(np.mean(float_predictions == int8_predictions))
+    logging.info("Quantized %d layers of %s to int8: %s" % (len(layers), network.name, report))
+    return report
+
+
+def _quantizable(layer):
+    if type(layer) not in (Conv2d, Dense) or not getattr(layer, '_built', False):
+        return False
+    return layer.compute_dtype is None
+
+
+def _calibrate(network, calibration_data):
+    """The largest absolute input of every quantizable layer on the calibration data, by id."""
+
+    ranges = {}
+
+    def recorded(layer, forward):
+
+        def forward_and_record(inputs, *args, **kwargs):
+            input_range = float(np.max(np.abs(np.asarray(inputs))))
+            ranges[id(layer)] = max(ranges.get(id(layer), 0.0), input_range)
+            return forward(inputs, *args, **kwargs)
+
+        return forward_and_record
+
+    layers = [layer for _, layer in network.layers_and_names(name_prefix='') if _quantizable(layer)]
+    for layer in layers:
+        object.__setattr__(layer, 'forward', recorded(layer, layer.forward))
+    try:
+        for batch in calibration_data:
+            network(batch[0] if isinstance(batch, (tuple, list)) else batch)
+    finally:
+        for layer in layers:
+            del layer.__dict__['forward']
+    return ranges
+
+
+def _evaluate(network, data):
+    """The accuracy of the network on (inputs, labels) batches, and its predicted classes."""
+
+    predictions, labels = [], []
+    for inputs, batch_labels in data:
+        outputs = tl.ops.convert_to_numpy(network(inputs))
+        predictions.append(np.argmax(outputs, axis=-1))
+        labels.append(np.reshape(np.asarray(batch_labels), (-1, )))
+    predictions = np.concatenate(predictions)
+    return float(np.mean(predictions == np.concatenate(labels))), predictions
+
+
+def _weights_nbytes(network):
+    return sum(weight.numpy().nbytes for weight in network.all_weights)
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import collections
+import functools
+import io
+import itertools
+import multiprocessing
 import os
 import random
 import re
@@ -28,6 +32,7 @@ __all__ = [
     'SimpleVocabulary',
     'Vocabulary',
     'process_sentence',
+    'count_words',
     'create_vocab',
     'simple_read_words',
     'read_words',
@@ -43,6 +48,7 @@ __all__ = [
     'initialize_vocabulary',
     'sentence_to_token_ids',
     'data_to_token_ids',
+    'TokenIdCorpus',
     'moses_multi_bleu',
 ]
 
@@ -279,6 +285,11 @@ class Vocabulary(object):
         Special word denoting sentence end.
     unk_word : str
         Special word denoting unknown words.
+    pad_word : str
+        Special word denoting padding.
+    cache_size : int
+        The number of sentences whose ids are kept in an LRU cache by :meth:`encode_batch`, which helps when
+        the same sentences are encoded again and again, e.g. over epochs. Default 0, no cache.
 
     Attributes
     ------------
@@ -313,7 +324,7 @@ class Vocabulary(object):
 
     """
 
-    def __init__(self, vocab_file, start_word="<S>", end_word="</S>", unk_word="<UNK>", pad_word="<PAD>"):
+    def __init__(self, vocab_file, start_word="<S>", end_word="</S>", unk_word="<UNK>", pad_word="<PAD>", cache_size=0):
         if not tf.io.gfile.exists(vocab_file):
             tl.logging.fatal("Vocab file %s not found." % vocab_file)
         tl.logging.info("Initializing vocabulary from file: %s" % vocab_file)
@@ -351,6 +362,12 @@ class Vocabulary(object):
         tl.logging.info("      unk_id  : %d" % self.unk_id)
         tl.logging.info("      pad_id  : %d" % self.pad_id)
 
+        # the id to word table of decode_batch, and the sentence encoder of encode_batch
+        self._id_to_word = np.array(reverse_vocab, dtype=object)
+        self._cache_size = cache_size
+        if cache_size:
+            self._encode_sentence = functools.lru_cache(maxsize=cache_size)(self._encode_sentence)
+
     def word_to_id(self, word):
         """Returns the integer word id of a word string."""
         if word in self.vocab:
@@ -365,6 +382,76 @@ class Vocabulary(object):
         else:
             return self.reverse_vocab[word_id]
 
+    def encode_batch(self, sentences, max_length=None, dtype=np.int32):
+        """Returns the word ids of a batch of sentences, padded with `pad_id`, and the length of every sentence.
+
+        Parameters
+        ----------
+        sentences : list of list of str
+            The sentences, each a list of words.
+        max_length : int or None
+            Truncate longer sentences to this number of words. Default None, pad to the longest sentence.
+        dtype : numpy.dtype or str
+            Data type of the word ids.
+
+        Returns
+        -------
+        ids : numpy.array
+            With dimensions (number_of_sentences, padded_length).
+        lengths : numpy.array
+            The int64 number of words of every sentence, after truncating.
+
+        Examples
+        --------
+        >>> vocab = tl.nlp.Vocabulary('vocab.txt', cache_size=10000)
+        >>> ids, lengths = vocab.encode_batch([['<S>', 'one', 'two', '</S>'], ['<S>', 'five', '</S>']])
+
+        """
+        if self._cache_size:
+            encoded = [self._encode_sentence(tuple(words)) for words in sentences]
+        else:
+            encoded = [self._encode_sentence(words) for words in sentences]
+        lengths = np.array([len(word_ids) for word_ids in encoded], dtype=np.int64)
+        if max_length is not None:
+            lengths = np.minimum(lengths, max_length)
+            encoded = [word_ids[:max_length] for word_ids in encoded]
+        padded_length = int(lengths.max()) if len(lengths) else 0
+
+        ids = np.full((len(encoded), padded_length), self.pad_id, dtype=dtype)
+        flat = np.fromiter(itertools.chain.from_iterable(encoded), dtype=dtype, count=int(lengths.sum()))
+        ids[np.arange(padded_length) < lengths[:, None]] = flat
+        return ids, lengths
+
+    def decode_batch(self, ids, lengths=None, separator=' '):
+        """Returns the sentence strings of a batch of word ids, e.g. from :meth:`encode_batch`.
+
+        Parameters
+        ----------
+        ids : numpy.array
+            The word ids with dimensions (number_of_sentences, length). Ids outside the vocabulary are decoded as
+            `unk_word`.
+        lengths : numpy.array or None
+            The length of every sentence. Default None, all `pad_id` are dropped.
+        separator : str
+            The string between the words.
+
+        Returns
+        -------
+        list of str
+            The sentences.
+
+        """
+        ids = np.asarray(ids)
+        ids = np.where((ids < 0) | (ids >= len(self._id_to_word)), self.unk_id, ids)
+        words = self._id_to_word[ids]
+        if lengths is None:
+            keep = ids != self.pad_id
+            return [separator.join(row[row_keep]) for row, row_keep in zip(words, keep)]
+        return [separator.join(row[:length]) for row, length in zip(words, lengths)]
+
+    def _encode_sentence(self, words):
+        return list(map(self.vocab.get, words, itertools.repeat(self.unk_id)))
+
 
 def process_sentence(sentence, start_word="<S>", end_word="</S>"):
     """Seperate a sentence string into a list of string words, add start_word and end_word,
@@ -409,7 +496,85 @@ def process_sentence(sentence, start_word="<S>", end_word="</S>"):
     return process_sentence
 
 
-def create_vocab(sentences, word_counts_output_file, min_word_count=1):
+def count_words(sentences, tokenizer=None, num_workers=1, chunk_size=10000, max_words=None):
+    """Count the words of a stream of sentences, e.g. the lines of an open file, in chunks and optionally with
+    a pool of processes.
+
+    The sentences are read in chunks of `chunk_size`, so a file is never read at once. With `num_workers` > 1,
+    every process counts the chunks given to it, and the partial counts are merged in the order of the chunks,
+    so the result, including the order of words with the same count, is the same as counting in this process.
+
+    Parameters
+    ----------
+    sentences : iterable
+        The sentences, each a list of words, or anything `tokenizer` turns into a list of words, e.g. a line.
+    tokenizer : function or None
+        A function turning a sentence into a list of words. It must be picklable if `num_workers` > 1.
+        Default None, the sentences are lists of words.
+    num_workers : int
+        The number of processes counting chunks in parallel. Default 1, count in this process.
+    chunk_size : int
+        The number of sentences given to a process at once.
+    max_words : int or None
+        Cap the memory for a huge vocabulary: whenever more than `max_words` distinct words are counted,
+        the words with the lowest counts are pruned, so the counts of rare words may be lower than their
+        real counts, while frequent words are counted exactly. Default None, count all words exactly.
+
+    Returns
+    -------
+    collections.Counter
+        The count of every word, in the order the words first appear.
+
+    Examples
+    --------
+    >>> with open('train.txt', 'rb') as f:
+    >>>     counter = tl.nlp.count_words(f, tokenizer=tl.nlp.basic_tokenizer, num_workers=8)
+    >>> print(counter.most_common(10))
+
+    """
+    chunks = _line_chunks(sentences, chunk_size)
+    if num_workers > 1:
+        pool = multiprocessing.Pool(num_workers, initializer=_init_count_worker, initargs=(tokenizer, ))
+        partial_counters = pool.imap(_count_chunk, chunks)
+    else:
+        pool = None
+        _init_count_worker(tokenizer)
+        partial_counters = map(_count_chunk, chunks)
+
+    counter = Counter()
+    min_count = 1
+    try:
+        for n_chunks, partial_counter in enumerate(partial_counters, 1):
+            counter.update(partial_counter)
+            while max_words is not None and len(counter) > max_words:
+                # prune when full, the word2vec way: drop the rarest words and raise the bar for the next time
+                for word in [word for word, count in counter.items() if count <= min_count]:
+                    del counter[word]
+                min_count += 1
+            if n_chunks % 10 == 0:
+                tl.logging.info("  counted %d chunks, %d words" % (n_chunks, len(counter)))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return counter
+
+
+_count_tokenizer = None
+
+
+def _init_count_worker(tokenizer):
+    global _count_tokenizer
+    _count_tokenizer = tokenizer
+
+
+def _count_chunk(sentences):
+    counter = Counter()
+    for sentence in sentences:
+        counter.update(_count_tokenizer(sentence) if _count_tokenizer is not None else sentence)
+    return counter
+
+
+def create_vocab(sentences, word_counts_output_file, min_word_count=1, num_workers=1, max_words=None):
     """Creates the vocabulary of word to word_id.
 
     See ``tutorial_tfrecord3.py``.
@@ -425,6 +590,10 @@ def create_vocab(sentences, word_counts_output_file, min_word_count=1):
         The file name.
     min_word_count : int
         Minimum number of occurrences for a word.
+    num_workers : int
+        The number of processes counting the words, see :func:`count_words`.
+    max_words : int or None
+        Cap the number of distinct words counted at once, see :func:`count_words`.
 
     Returns
     --------
@@ -465,11 +634,7 @@ def create_vocab(sentences, word_counts_output_file, min_word_count=1):
     """
     tl.logging.info("Creating vocabulary.")
 
-    counter = Counter()
-
-    for c in sentences:
-        counter.update(c)
-        # tl.logging.info('c',c)
+    counter = count_words(sentences, num_workers=num_workers, max_words=max_words)
     tl.logging.info("    Total words: %d" % len(counter))
 
     # Filter uncommon words and sort by descending count.
@@ -611,7 +776,7 @@ def read_analogies_file(eval_file='questions-words.txt', word2id=None):
     return analogy_questions
 
 
-def build_vocab(data):
+def build_vocab(data, num_workers=1):
     """Build vocabulary.
 
     Given the context in list format.
@@ -622,6 +787,8 @@ def build_vocab(data):
     ----------
     data : list of str
         The context in list format
+    num_workers : int
+        The number of processes counting the words, see :func:`count_words`.
 
     Returns
     --------
@@ -640,7 +807,7 @@ def build_vocab(data):
 
     """
     # data = _read_words(filename)
-    counter = collections.Counter(data)
+    counter = _count_word_list(data, num_workers)
     # tl.logging.info('counter %s' % counter)   # dictionary for the occurrence number of each word, e.g. 'banknote': 1, 'photography': 1, 'kia': 1
     count_pairs = sorted(counter.items(), key=lambda x: (-x[1], x[0]))
     # tl.logging.info('count_pairs %s' % count_pairs)  # convert dictionary to list of tuple, e.g. ('ssangyong', 1), ('swapo', 1), ('wachter', 1)
@@ -651,6 +818,14 @@ def build_vocab(data):
     return word_to_id
 
 
+def _count_word_list(words, num_workers, chunk_size=100000):
+    """Count a list of words, in slices of `chunk_size` words with `num_workers` > 1."""
+    if num_workers <= 1:
+        return Counter(words)
+    slices = (words[i:i + chunk_size] for i in range(0, len(words), chunk_size))
+    return count_words(slices, num_workers=num_workers, chunk_size=1)
+
+
 def build_reverse_dictionary(word_to_id):
     """Given a dictionary that maps word to integer id.
     Returns a reverse dictionary that maps a id to word.
@@ -670,7 +845,7 @@ def build_reverse_dictionary(word_to_id):
     return reverse_dictionary
 
 
-def build_words_dataset(words=None, vocabulary_size=50000, printable=True, unk_key='UNK'):
+def build_words_dataset(words=None, vocabulary_size=50000, printable=True, unk_key='UNK', num_workers=1):
     """Build the words dictionary and replace rare words with 'UNK' token.
     The most common word has the smallest integer id.
 
@@ -684,6 +859,8 @@ def build_words_dataset(words=None, vocabulary_size=50000, printable=True, unk_k
         Whether to print the read vocabulary size of the given words.
     unk_key : str
         Represent the unknown words.
+    num_workers : int
+        The number of processes counting the words, see :func:`count_words`.
 
     Returns
     --------
@@ -713,8 +890,9 @@ def build_words_dataset(words=None, vocabulary_size=50000, printable=True, unk_k
     if words is None:
         raise Exception("words : list of str or byte")
 
+    counter = _count_word_list(words, num_workers)
     count = [[unk_key, -1]]
-    count.extend(collections.Counter(words).most_common(vocabulary_size - 1))
+    count.extend(counter.most_common(vocabulary_size - 1))
     dictionary = dict()
     for word, _ in count:
         dictionary[word] = len(dictionary)
@@ -730,9 +908,9 @@ def build_words_dataset(words=None, vocabulary_size=50000, printable=True, unk_k
     count[0][1] = unk_count
     reverse_dictionary = dict(zip(dictionary.values(), dictionary.keys()))
     if printable:
-        tl.logging.info('Real vocabulary size    %d' % len(collections.Counter(words).keys()))
+        tl.logging.info('Real vocabulary size    %d' % len(counter))
         tl.logging.info('Limited vocabulary size {}'.format(vocabulary_size))
-    if len(collections.Counter(words).keys()) < vocabulary_size:
+    if len(counter) < vocabulary_size:
         raise Exception(
             "len(collections.Counter(words).keys()) >= vocabulary_size , the limited vocabulary_size must be less than or equal to the read vocabulary_size"
         )
@@ -786,12 +964,10 @@ def words_to_word_ids(data=None, word_to_id=None, unk_key='UNK'):
     #     return [word_to_id[str(word)] for word in data]
     # else:
 
-    word_ids = []
-    for word in data:
-        if word_to_id.get(word) is not None:
-            word_ids.append(word_to_id[word])
-        else:
-            word_ids.append(word_to_id[unk_key])
+    # one dict lookup per word, without a Python call per word
+    word_ids = list(map(word_to_id.get, data, itertools.repeat(word_to_id.get(unk_key))))
+    if unk_key not in word_to_id and None in word_ids:
+        raise KeyError(unk_key)
     return word_ids
     # return [word_to_id[word] for word in data]    # this one
 
@@ -907,7 +1083,7 @@ def basic_tokenizer(sentence, _WORD_SPLIT=re.compile(b"([.,!?\"':;)(])")):
 
 def create_vocabulary(
     vocabulary_path, data_path, max_vocabulary_size, tokenizer=None, normalize_digits=True,
-    _DIGIT_RE=re.compile(br"\d"), _START_VOCAB=None
+    _DIGIT_RE=re.compile(br"\d"), _START_VOCAB=None, num_workers=1, chunk_size=10000, max_words=None
 ):
     r"""Create vocabulary file (if it does not exist yet) from data file.
 
@@ -933,6 +1109,13 @@ def create_vocabulary(
         Default is ``re.compile(br"\d")``.
     _START_VOCAB : list of str
         The pad, go, eos and unk token, default is ``[b"_PAD", b"_GO", b"_EOS", b"_UNK"]``.
+    num_workers : int
+        The number of processes tokenizing and counting chunks of lines, see :func:`count_words`. The tokenizer
+        must be picklable if it is more than 1.
+    chunk_size : int
+        The number of lines given to a process at once.
+    max_words : int or None
+        Cap the number of distinct words counted at once, see :func:`count_words`.
 
     References
     ----------
@@ -943,20 +1126,11 @@ def create_vocabulary(
         _START_VOCAB = [b"_PAD", b"_GO", b"_EOS", b"_UNK"]
     if not gfile.Exists(vocabulary_path):
         tl.logging.info("Creating vocabulary %s from data %s" % (vocabulary_path, data_path))
-        vocab = {}
         with gfile.GFile(data_path, mode="rb") as f:
-            counter = 0
-            for line in f:
-                counter += 1
-                if counter % 100000 == 0:
-                    tl.logging.info("  processing line %d" % counter)
-                tokens = tokenizer(line) if tokenizer else basic_tokenizer(line)
-                for w in tokens:
-                    word = re.sub(_DIGIT_RE, b"0", w) if normalize_digits else w
-                    if word in vocab:
-                        vocab[word] += 1
-                    else:
-                        vocab[word] = 1
+            vocab = count_words(
+                f, tokenizer=_VocabularyTokenizer(tokenizer, normalize_digits, _DIGIT_RE), num_workers=num_workers,
+                chunk_size=chunk_size, max_words=max_words
+            )
             vocab_list = _START_VOCAB + sorted(vocab, key=vocab.get, reverse=True)
             if len(vocab_list) > max_vocabulary_size:
                 vocab_list = vocab_list[:max_vocabulary_size]
@@ -967,6 +1141,21 @@ def create_vocabulary(
         tl.logging.info("Vocabulary %s from data %s exists" % (vocabulary_path, data_path))
 
 
+class _VocabularyTokenizer(object):
+    """Tokenizes a line for create_vocabulary, as a picklable object for the processes counting words."""
+
+    def __init__(self, tokenizer, normalize_digits, _DIGIT_RE):
+        self.tokenizer = tokenizer
+        self.normalize_digits = normalize_digits
+        self._DIGIT_RE = _DIGIT_RE
+
+    def __call__(self, line):
+        tokens = self.tokenizer(line) if self.tokenizer else basic_tokenizer(line)
+        if not self.normalize_digits:
+            return tokens
+        return [re.sub(self._DIGIT_RE, b"0", w) for w in tokens]
+
+
 def initialize_vocabulary(vocabulary_path):
     """Initialize vocabulary from file, return the `word_to_id` (dictionary)
     and `id_to_word` (list).
@@ -1051,7 +1240,7 @@ def sentence_to_token_ids(
 
 def data_to_token_ids(
     data_path, target_path, vocabulary_path, tokenizer=None, normalize_digits=True, UNK_ID=3,
-    _DIGIT_RE=re.compile(br"\d")
+    _DIGIT_RE=re.compile(br"\d"), format='text', num_workers=1, chunk_size=10000
 ):
     """Tokenize data file and turn into token-ids using given vocabulary file.
 
@@ -1071,28 +1260,198 @@ def data_to_token_ids(
         A function to use to tokenize each sentence. If None, ``basic_tokenizer`` will be used.
     normalize_digits : boolean
         If true, all digits are replaced by 0.
+    format : str
+        'text' writes the token-ids of a sentence as one line of space-separated numbers.
+        'npy' writes a binary corpus of two files, ``target_path + '.ids.npy'`` with the token-ids of all
+        sentences one after another (uint16 if the vocabulary has at most 65535 words, otherwise int32), and
+        ``target_path + '.offsets.npy'`` with the int64 offset of every sentence in it and the total number
+        of tokens. It is read back memory-mapped by :class:`TokenIdCorpus`. Default 'text'.
+    num_workers : int
+        The number of processes tokenizing chunks of lines in parallel, the tokenizer must be picklable
+        if it is more than 1. Default 1, tokenize in this process.
+    chunk_size : int
+        The number of lines given to a process at once.
+
+    Examples
+    --------
+    >>> tl.nlp.data_to_token_ids('train.en', 'train.ids', 'vocab.en', format='npy', num_workers=8)
+    >>> corpus = tl.nlp.TokenIdCorpus('train.ids')
+    >>> for x, y in tl.iterate.ptb_iterator(corpus.tokens, batch_size=32, num_steps=35):
+    >>>     ...
 
     References
     ----------
     - Code from ``/tensorflow/models/rnn/translation/data_utils.py``
 
     """
-    if not gfile.Exists(target_path):
-        tl.logging.info("Tokenizing data in %s" % data_path)
-        vocab, _ = initialize_vocabulary(vocabulary_path)
-        with gfile.GFile(data_path, mode="rb") as data_file:
-            with gfile.GFile(target_path, mode="w") as tokens_file:
-                counter = 0
-                for line in data_file:
-                    counter += 1
-                    if counter % 100000 == 0:
-                        tl.logging.info("  tokenizing line %d" % counter)
-                    token_ids = sentence_to_token_ids(
-                        line, vocab, tokenizer, normalize_digits, UNK_ID=UNK_ID, _DIGIT_RE=_DIGIT_RE
-                    )
-                    tokens_file.write(" ".join([str(tok) for tok in token_ids]) + "\n")
-    else:
-        tl.logging.info("Target path %s exists" % target_path)
+    if format not in ('text', 'npy'):
+        raise ValueError("format should be 'text' or 'npy', but got %s" % format)
+    exists_path = target_path if format == 'text' else target_path + '.offsets.npy'
+    if gfile.Exists(exists_path):
+        tl.logging.info("Target path %s exists" % exists_path)
+        return
+
+    tl.logging.info("Tokenizing data in %s" % data_path)
+    vocab, _ = initialize_vocabulary(vocabulary_path)
+    dtype = np.uint16 if max(len(vocab), UNK_ID + 1) <= 65535 else np.int32
+    tokenize_args = (vocab, tokenizer, normalize_digits, UNK_ID, _DIGIT_RE, dtype)
+
+    with gfile.GFile(data_path, mode="rb") as data_file:
+        chunks = _line_chunks(data_file, chunk_size)
+        if num_workers > 1:
+            pool = multiprocessing.Pool(num_workers, initializer=_init_tokenize_worker, initargs=tokenize_args)
+            tokenized = pool.imap(_tokenize_chunk, chunks)
+        else:
+            pool = None
+            _init_tokenize_worker(*tokenize_args)
+            tokenized = map(_tokenize_chunk, chunks)
+        try:
+            if format == 'text':
+                _write_token_ids_text(tokenized, target_path, chunk_size)
+            else:
+                _write_token_ids_npy(tokenized, target_path, dtype, chunk_size)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+
+def _line_chunks(lines, chunk_size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_tokenize_args = None
+
+
+def _init_tokenize_worker(*args):
+    global _tokenize_args
+    _tokenize_args = args
+
+
+def _tokenize_chunk(lines):
+    """The token-ids of all lines of a chunk one after another, and the number of tokens of each line."""
+    vocab, tokenizer, normalize_digits, UNK_ID, _DIGIT_RE, dtype = _tokenize_args
+    ids, lengths = [], np.zeros(len(lines), dtype=np.int64)
+    for i, line in enumerate(lines):
+        token_ids = sentence_to_token_ids(line, vocab, tokenizer, normalize_digits, UNK_ID=UNK_ID, _DIGIT_RE=_DIGIT_RE)
+        ids.extend(token_ids)
+        lengths[i] = len(token_ids)
+    return np.array(ids, dtype=dtype), lengths
+
+
+def _write_token_ids_text(tokenized, target_path, chunk_size):
+    with gfile.GFile(target_path, mode="w") as tokens_file:
+        counter = 0
+        for ids, lengths in tokenized:
+            ids = ids.tolist()
+            start = 0
+            for length in lengths:
+                tokens_file.write(" ".join([str(tok) for tok in ids[start:start + length]]) + "\n")
+                start += length
+            counter += len(lengths)
+            if counter % (10 * chunk_size) < len(lengths):
+                tl.logging.info("  tokenizing line %d" % counter)
+
+
+class _NpyStreamWriter(object):
+    """Writes a 1-D .npy file of unknown length, its header is written when it is closed."""
+
+    # the header of a 1-D array fits in 128 bytes, and the data stays aligned like np.save does
+    header_size = 128
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self.file = open(path + '.tmp', 'wb')
+        self.file.write(b'\0' * self.header_size)
+
+    def write(self, array):
+        self.file.write(np.ascontiguousarray(array, dtype=self.dtype).tobytes())
+        self.length += len(array)
+
+    def close(self):
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header, {
+                'descr': np.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (self.length, )
+            }
+        )
+        if len(header.getvalue()) != self.header_size:
+            raise RuntimeError("Unexpected .npy header size %d" % len(header.getvalue()))
+        self.file.seek(0)
+        self.file.write(header.getvalue())
+        self.file.close()
+        os.replace(self.path + '.tmp', self.path)
+
+
+def _write_token_ids_npy(tokenized, target_path, dtype, chunk_size):
+    ids_file = _NpyStreamWriter(target_path + '.ids.npy', dtype)
+    offsets_file = _NpyStreamWriter(target_path + '.offsets.npy', np.int64)
+    offsets_file.write(np.zeros(1, dtype=np.int64))
+    n_tokens, counter = 0, 0
+    for ids, lengths in tokenized:
+        ids_file.write(ids)
+        offsets_file.write(n_tokens + np.cumsum(lengths))
+        n_tokens += len(ids)
+        counter += len(lengths)
+        if counter % (10 * chunk_size) < len(lengths):
+            tl.logging.info("  tokenizing line %d" % counter)
+    # the offsets are written last, so that they only exist for a complete corpus
+    ids_file.close()
+    offsets_file.close()
+
+
+class TokenIdCorpus(object):
+    """A binary token-id corpus written by ``data_to_token_ids(..., format='npy')``, memory-mapped so that opening
+    it does not read it. Like a map-style dataset, item i is the token-ids of sentence i.
+
+    Parameters
+    ----------
+    path : str
+        The `target_path` given to :func:`data_to_token_ids`.
+
+    Attributes
+    ----------
+    tokens : numpy.memmap
+        The token-ids of all sentences one after another, e.g. for :func:`tensorlayer.iterate.ptb_iterator`.
+    offsets : numpy.memmap
+        The offset of every sentence in `tokens` and the total number of tokens.
+
+    Examples
+    --------
+    >>> corpus = tl.nlp.TokenIdCorpus('train.ids')
+    >>> print(len(corpus), corpus[0])
+    >>> for batch, _ in tl.iterate.minibatches(corpus, np.zeros(len(corpus)), batch_size=64, shuffle=True):
+    >>>     ...
+
+    """
+
+    def __init__(self, path):
+        self.tokens = np.load(path + '.ids.npy', mmap_mode='r')
+        self.offsets = np.load(path + '.offsets.npy', mmap_mode='r')
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("sentence index %d out of range" % index)
+            return self.tokens[self.offsets[index]:self.offsets[index + 1]]
+        if isinstance(index, slice):
+            index = range(*index.indices(len(self)))
+        return [self[i] for i in index]
+
+    def __len__(self):
+        return len(self.offsets) - 1
 
 
 def moses_multi_bleu(hypotheses, references, lowercase=False):
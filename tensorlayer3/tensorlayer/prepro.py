@@ -1,11 +1,12 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
+import concurrent.futures
 import copy
 import math
 import random
-import threading
 import time
+from multiprocessing import shared_memory
 
 import numpy as np
 import PIL
@@ -100,6 +101,7 @@ __all__ = [
     'obj_box_shift',
     'obj_box_zoom',
     'pad_sequences',
+    'bucket_sequences',
     'remove_pad_sequences',
     'process_sequences',
     'sequences_add_start_id',
@@ -112,10 +114,11 @@ __all__ = [
     'keypoint_random_flip',
     'keypoint_random_resize',
     'keypoint_random_resize_shortestedge',
+    'keypoint_random_affine',
 ]
 
 
-def threading_data(data=None, fn=None, thread_count=None, **kwargs):
+def threading_data(data=None, fn=None, thread_count=None, executor='thread', chunk_size=None, **kwargs):
     """Process a batch of data by given function by threading.
 
     Usually be used for data augmentation.
@@ -126,8 +129,18 @@ def threading_data(data=None, fn=None, thread_count=None, **kwargs):
         The data to be processed.
     thread_count : int
         The number of threads to use.
+        If None, `fn` is applied to every sample. Otherwise the data is split into `thread_count` parts and `fn`
+        is applied to every part.
     fn : function
         The function for data processing.
+    executor : str
+        The worker pool to run `fn` in, 'thread' or 'process'. The pools are created once and reused by later calls.
+        Use 'process' for GIL-bound NumPy/scipy augmentation such as ``elastic_transform`` and ``swirl``: `fn` must
+        then be picklable (defined at module level), and when `thread_count` is None the data and results are
+        passed through shared memory, so `fn` must return arrays of the same shape for every sample.
+    chunk_size : int or None
+        The number of samples sent to a worker at once when `thread_count` is None.
+        If None, the samples are split into about four chunks per worker.
     more args : the args for `fn`
         Ssee Examples below.
 
@@ -180,6 +193,10 @@ def threading_data(data=None, fn=None, thread_count=None, **kwargs):
     >>> data = tl.prepro.threading_data([_ for _ in zip(X, Y)], distort_img)
     >>> X_, Y_ = data.transpose((1,0,2,3,4))
 
+    Run a GIL-bound augmentation in a process pool.
+
+    >>> images = tl.prepro.threading_data(images, tl.prepro.elastic_transform, executor='process', alpha=720, sigma=24)
+
     Returns
     -------
     list or numpyarray
@@ -192,40 +209,143 @@ def threading_data(data=None, fn=None, thread_count=None, **kwargs):
 
     """
 
-    def apply_fn(results, i, data, kwargs):
-        results[i] = fn(data, **kwargs)
-
-    if thread_count is None:
-        results = [None] * len(data)
-        threads = []
-        # for i in range(len(data)):
-        #     t = threading.Thread(name='threading_and_return', target=apply_fn, args=(results, i, data[i], kwargs))
-        for i, d in enumerate(data):
-            t = threading.Thread(name='threading_and_return', target=apply_fn, args=(results, i, d, kwargs))
-            t.start()
-            threads.append(t)
-    else:
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor should be 'thread' or 'process', but got {}.".format(executor))
+
+    if thread_count is not None:
+        pool = _get_executor(executor, thread_count)
         divs = np.linspace(0, len(data), thread_count + 1)
         divs = np.round(divs).astype(int)
-        results = [None] * thread_count
-        threads = []
-        for i in range(thread_count):
-            t = threading.Thread(
-                name='threading_and_return', target=apply_fn, args=(results, i, data[divs[i]:divs[i + 1]], kwargs)
-            )
-            t.start()
-            threads.append(t)
+        futures = [pool.submit(fn, data[divs[i]:divs[i + 1]], **kwargs) for i in range(thread_count)]
+        return np.concatenate([future.result() for future in futures])
+
+    n = len(data)
+    if n == 0:
+        return np.asarray([])
+    if executor == 'process':
+        return _process_map(fn, data, chunk_size, kwargs)
+
+    # the first result gives the shape of the preallocated output
+    first = fn(data[0], **kwargs)
+    first_array = _as_numeric_array(first)
+    if first_array is None:
+        results = [first] + [None] * (n - 1)
+    else:
+        results = np.empty((n, ) + first_array.shape, dtype=first_array.dtype)
+        results[0] = first_array
+    # results which do not fit the preallocated output without a cast or a reshape
+    misfits = {}
+
+    def apply_fn(start, stop):
+        for i in range(start, stop):
+            result = fn(data[i], **kwargs)
+            if isinstance(results, list):
+                results[i] = result
+                continue
+            result_array = _as_numeric_array(result)
+            if (result_array is not None and result_array.shape == results.shape[1:] and
+                    np.can_cast(result_array.dtype, results.dtype, 'safe')):
+                results[i] = result_array
+            else:
+                misfits[i] = result
 
-    for t in threads:
-        t.join()
+    pool = _get_executor('thread')
+    futures = [pool.submit(apply_fn, start, stop) for start, stop in _chunks(1, n, pool._max_workers, chunk_size)]
+    for future in futures:
+        future.result()
 
-    if thread_count is None:
+    if misfits or isinstance(results, list):
+        results = [misfits[i] if i in misfits else results[i] for i in range(n)]
         try:
             return np.asarray(results)
         except Exception:
             return results
-    else:
-        return np.concatenate(results)
+    return results
+
+
+def _as_numeric_array(x):
+    try:
+        x = np.asarray(x)
+    except ValueError:
+        return None
+    return None if x.dtype == object else x
+
+
+_executors = {}
+
+
+def _get_executor(kind, max_workers=None):
+    """Return the persistent thread or process pool of the given size, creating it on the first call."""
+
+    key = (kind, max_workers)
+    if key not in _executors:
+        if kind == 'thread':
+            _executors[key] = concurrent.futures.ThreadPoolExecutor(max_workers)
+        else:
+            _executors[key] = concurrent.futures.ProcessPoolExecutor(max_workers)
+    return _executors[key]
+
+
+def _chunks(start, stop, n_workers, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = max(1, int(math.ceil((stop - start) / (4.0 * n_workers))))
+    return [(i, min(i + chunk_size, stop)) for i in range(start, stop, chunk_size)]
+
+
+def _process_map(fn, data, chunk_size, kwargs):
+    data = np.ascontiguousarray(data)
+    if data.dtype == object:
+        raise ValueError("executor='process' requires data which can be converted to a numeric numpy array.")
+
+    first = _as_numeric_array(fn(data[0], **kwargs))
+    if first is None:
+        raise ValueError("executor='process' requires fn to return numeric arrays.")
+
+    n = len(data)
+    out_shape = (n, ) + first.shape
+    in_shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    out_shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(out_shape)) * first.dtype.itemsize, 1))
+    try:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=in_shm.buf)[...] = data
+        results = np.ndarray(out_shape, dtype=first.dtype, buffer=out_shm.buf)
+        results[0] = first
+
+        pool = _get_executor('process')
+        in_spec = (in_shm.name, data.shape, data.dtype.str)
+        out_spec = (out_shm.name, out_shape, first.dtype.str)
+        futures = [
+            pool.submit(_process_chunk, fn, in_spec, out_spec, start, stop, kwargs)
+            for start, stop in _chunks(1, n, pool._max_workers, chunk_size)
+        ]
+        for future in futures:
+            future.result()
+        results = results.copy()
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+    return results
+
+
+def _process_chunk(fn, in_spec, out_spec, start, stop, kwargs):
+    in_shm = shared_memory.SharedMemory(name=in_spec[0])
+    out_shm = shared_memory.SharedMemory(name=out_spec[0])
+    try:
+        data = np.ndarray(in_spec[1], dtype=in_spec[2], buffer=in_shm.buf)
+        results = np.ndarray(out_spec[1], dtype=out_spec[2], buffer=out_shm.buf)
+        for i in range(start, stop):
+            result = fn(data[i], **kwargs)
+            if np.shape(result) != results.shape[1:]:
+                raise ValueError(
+                    "executor='process' requires fn to return arrays of the same shape, "
+                    "but got {} and {}.".format(results.shape[1:], np.shape(result))
+                )
+            results[i] = result
+    finally:
+        data = results = None
+        in_shm.close()
+        out_shm.close()
 
 
 def affine_rotation_matrix(angle=(-20, 20)):
@@ -3327,7 +3447,7 @@ def pad_sequences(sequences, maxlen=None, dtype='int32', padding='post', truncat
             sample_shape = np.asarray(s).shape[1:]
             break
 
-    x = (np.ones((nb_samples, maxlen) + sample_shape) * value).astype(dtype)
+    x = np.full((nb_samples, maxlen) + sample_shape, value, dtype=dtype)
     for idx, s in enumerate(sequences):
         if len(s) == 0:
             continue  # empty list was found
@@ -3355,6 +3475,115 @@ def pad_sequences(sequences, maxlen=None, dtype='int32', padding='post', truncat
     return x.tolist()
 
 
+def bucket_sequences(
+    sequences, bucket_boundaries=None, max_tokens=4096, max_batch_size=None, dtype='int32', padding='post', value=0,
+    shuffle=False, seed=None
+):
+    """Group sequences of similar length into batches under a token budget, and pad each batch only to its longest
+    sequence.
+
+    The sequences are put into buckets by length, and sorted by length in each bucket. The batches are then cut
+    from each bucket such that the number of sequences times the padded length of a batch is at most
+    `max_tokens`, so batches of short sequences hold more of them. A sequence longer than `max_tokens` is
+    a batch by itself.
+
+    Parameters
+    ----------
+    sequences : list of list of int or list of numpy.array
+        All sequences where each row is a sequence, the elements may also be vectors of the same shape.
+    bucket_boundaries : list of int or None
+        The upper bounds (exclusive) of the sequence lengths of the buckets, in increasing order. The sequences
+        of at least the last boundary form one more bucket. If None, all sequences are in one bucket, so batches
+        are cut from the sequences sorted by length.
+    max_tokens : int
+        The largest number of tokens (including padding) in a batch.
+    max_batch_size : int or None
+        The largest number of sequences in a batch. Default None, no limit.
+    dtype : numpy.dtype or str
+        Data type of the batches.
+    padding : str
+        Either 'pre' or 'post', pad either before or after each sequence.
+    value : float
+        Value to pad the sequences to the desired value.
+    shuffle : boolean
+        Shuffle the order of the batches and of the sequences of the same length. Default False.
+    seed : int or None
+        The random seed when shuffling.
+
+    Returns
+    -------
+    generator of (numpy.array, numpy.array, numpy.array)
+        For every batch, the padded sequences with dimensions (batch_size, padded_length, ...), the mask with
+        dimensions (batch_size, padded_length) which is 1 for the tokens and 0 for padding, and the indices of
+        the sequences in `sequences`, e.g. to gather their labels.
+
+    Examples
+    --------
+    >>> sequences = [[1, 1, 1, 1, 1], [2, 2, 2], [3, 3], [4, 4, 4, 4]]
+    >>> for x, mask, indices in tl.prepro.bucket_sequences(sequences, bucket_boundaries=[4], max_tokens=8):
+    >>>     print(x.tolist(), indices.tolist())
+    [[3, 3, 0], [2, 2, 2]] [2, 1]
+    [[4, 4, 4, 4]] [3]
+    [[1, 1, 1, 1, 1]] [0]
+
+    """
+    if padding not in ('pre', 'post'):
+        raise ValueError('Padding type "%s" not understood' % padding)
+    if max_tokens < 1:
+        raise ValueError("max_tokens should be a positive integer, but got %s" % max_tokens)
+    lengths = np.array([len(s) for s in sequences], dtype=np.int64)
+    batches = _bucket_batch_indices(lengths, bucket_boundaries, max_tokens, max_batch_size, shuffle, seed)
+
+    sample_shape = tuple()
+    for s in sequences:
+        if len(s) > 0:
+            sample_shape = np.asarray(s).shape[1:]
+            break
+
+    for indices in batches:
+        maxlen = int(lengths[indices].max())
+        x = np.full((len(indices), maxlen) + sample_shape, value, dtype=dtype)
+        mask = np.zeros((len(indices), maxlen), dtype=np.int32)
+        for row, idx in enumerate(indices):
+            n = lengths[idx]
+            if n == 0:
+                continue
+            if padding == 'post':
+                x[row, :n] = sequences[idx]
+                mask[row, :n] = 1
+            else:
+                x[row, maxlen - n:] = sequences[idx]
+                mask[row, maxlen - n:] = 1
+        yield x, mask, indices
+
+
+def _bucket_batch_indices(lengths, bucket_boundaries, max_tokens, max_batch_size=None, shuffle=False, seed=None):
+    """The indices of the sequences of every batch of :func:`bucket_sequences`."""
+    rng = np.random.RandomState(seed)
+    boundaries = np.asarray(bucket_boundaries if bucket_boundaries is not None else [], dtype=np.int64)
+    buckets = np.searchsorted(boundaries, lengths, side='right')
+
+    batches = []
+    for bucket in np.unique(buckets):
+        indices = np.flatnonzero(buckets == bucket)
+        if shuffle:
+            rng.shuffle(indices)
+        # a stable sort keeps the shuffled order of sequences of the same length
+        indices = indices[np.argsort(lengths[indices], kind='stable')]
+        start = 0
+        for end in range(1, len(indices) + 1):
+            n_tokens = (end - start) * max(lengths[indices[end - 1]], 1)
+            full = max_batch_size is not None and end - start > max_batch_size
+            if (n_tokens > max_tokens or full) and end - 1 > start:
+                batches.append(indices[start:end - 1])
+                start = end - 1
+        if start < len(indices):
+            batches.append(indices[start:])
+    if shuffle:
+        rng.shuffle(batches)
+    return batches
+
+
 def remove_pad_sequences(sequences, pad_id=0):
     """Remove padding.
 
@@ -4112,3 +4341,115 @@ def keypoint_random_resize_shortestedge(
             return dst, adjust_joint_list, None
 
     return pose_resize_shortestedge(image, annos, mask, target_size)
+
+
+def keypoint_random_affine(
+    image, keypoints, visible=None, mask=None, size=(368, 368), rg=15., zoom_range=(0.8, 1.2), prob=0.5,
+    flip_list=(0, 1, 5, 6, 7, 2, 3, 4, 11, 12, 13, 8, 9, 10, 15, 14, 17, 16, 18), pad_val=0, mask_pad_val=1
+):
+    """Randomly resize, rotate, flip and crop an image and all keypoints with a single affine warp.
+
+    This is the vectorized counterpart of chaining ``keypoint_random_resize_shortestedge``, ``keypoint_random_rotate``,
+    ``keypoint_random_flip`` and ``keypoint_random_crop``. The four steps are composed into one matrix, the image and
+    the mask are warped once, and the keypoints of all people are transformed by one matrix product.
+
+    Parameters
+    -----------
+    image : 3 channel image
+        The given image for augmentation.
+    keypoints : numpy.array or list of list of floats
+        The keypoints of people with shape (n_people, n_joints, 2) in (x, y) order.
+    visible : numpy.array of bool or None
+        The visibility of the keypoints with shape (n_people, n_joints).
+        If None, the keypoints with a negative coordinate are invisible.
+    mask : single channel image or None
+        The mask if available.
+    size : tuple of int
+        The size (height, width) of returned image.
+    rg : int or float
+        Degree to rotate, the angle is drawn from [-rg, rg].
+    zoom_range : tuple of two floats
+        The minimum and maximum factor to zoom in or out after the shorter edge is resized to fit `size`.
+    prob : float, 0 to 1
+        The probability to flip the image.
+    flip_list : tuple of int
+        Denotes how the keypoints number be changed after flipping, see ``keypoint_random_flip``. It should
+        have one entry per joint, the default is for the 19 joints of COCO. An empty tuple keeps the order.
+    pad_val : int/float or tuple of them
+        The padding value of the image.
+    mask_pad_val : int or float
+        The padding value of the mask.
+
+    Returns
+    ----------
+    preprocessed image, keypoints, visible, mask
+        The keypoints have shape (n_people, n_joints, 2). The keypoints which are invisible or outside the returned
+        image are marked False in `visible`.
+
+    Examples
+    ---------
+    >>> annos = np.asarray(annos, dtype=np.float32) # [n_people, n_joints, 2], missing joints are (-1000, -1000)
+    >>> image, annos, visible, mask = tl.prepro.keypoint_random_affine(image, annos, mask=mask, size=(368, 368))
+
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    if keypoints.ndim != 3 or keypoints.shape[-1] != 2:
+        raise ValueError("keypoints should have shape (n_people, n_joints, 2), but got {}.".format(keypoints.shape))
+    if visible is None:
+        visible = np.all(keypoints >= 0, axis=-1)
+    visible = np.asarray(visible, dtype=bool)
+    if visible.shape != keypoints.shape[:2]:
+        raise ValueError("visible should have shape {}, but got {}.".format(keypoints.shape[:2], visible.shape))
+    if prob > 0 and len(flip_list) > 0 and len(flip_list) != keypoints.shape[1]:
+        raise ValueError(
+            "flip_list should have one entry for each of the {} joints, but got {} entries.".format(
+                keypoints.shape[1], len(flip_list)
+            )
+        )
+
+    if len(np.shape(image)) == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    height, width = np.shape(image)[:2]
+    target_height, target_width = size
+
+    # resize the shorter edge to fit `size`, then zoom
+    scale = min(target_width / width, target_height / height) * np.random.uniform(zoom_range[0], zoom_range[1])
+    scaled_width, scaled_height = width * scale, height * scale
+    matrix = np.diag([scale, scale, 1.0])
+
+    # rotate around the center of the resized image
+    center = ((scaled_width - 1) * 0.5, (scaled_height - 1) * 0.5)
+    rotation = np.eye(3)
+    rotation[:2] = cv2.getRotationMatrix2D(center, np.random.uniform(-rg, rg), 1)
+    matrix = rotation @ matrix
+
+    flip = np.random.uniform(0, 1.0) < prob
+    if flip:
+        matrix = np.array([[-1.0, 0, scaled_width - 1], [0, 1, 0], [0, 0, 1]]) @ matrix
+
+    # crop `size` at a random offset, or pad around the image if it is smaller
+    offset_x = np.random.uniform(0, scaled_width - target_width) if scaled_width > target_width else \
+        (scaled_width - target_width) * 0.5
+    offset_y = np.random.uniform(0, scaled_height - target_height) if scaled_height > target_height else \
+        (scaled_height - target_height) * 0.5
+    matrix = np.array([[1.0, 0, -offset_x], [0, 1, -offset_y], [0, 0, 1]]) @ matrix
+
+    image = cv2.warpAffine(
+        image, matrix[:2], (target_width, target_height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+        borderValue=pad_val
+    )
+    if mask is not None:
+        mask = cv2.warpAffine(
+            mask, matrix[:2], (target_width, target_height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+            borderValue=mask_pad_val
+        )
+
+    keypoints = keypoints @ matrix[:2, :2].T.astype(np.float32) + matrix[:2, 2].astype(np.float32)
+    if flip and len(flip_list) > 0:
+        # keep the left and right body parts
+        keypoints = keypoints[:, list(flip_list)]
+        visible = visible[:, list(flip_list)]
+    visible = visible & (keypoints[..., 0] >= 0) & (keypoints[..., 0] <= target_width - 1) & \
+        (keypoints[..., 1] >= 0) & (keypoints[..., 1] <= target_height - 1)
+
+    return image, keypoints, visible, mask
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numbers
+
+import numpy as np
+
+from .functional_cv2 import affine_transform as _cv2_affine_transform
+
+__all__ = [
+    'hwc_to_chw',
+    'chw_to_hwc',
+    'hflip',
+    'vflip',
+    'normalize',
+    'standardize',
+    'adjust_brightness',
+    'adjust_contrast',
+    'adjust_saturation',
+    'adjust_hue',
+    'random_hflip',
+    'random_vflip',
+    'random_crop',
+    'color_jitter',
+    'affine_transform',
+]
+
+# The functions below work on a whole NHWC numpy batch at once. The random ones draw one parameter per sample
+# as an array, so each op is a single vectorized call instead of a python loop over the images.
+# Integer images are treated as [0, 255] and float images as [0, 1], like the per-image ops.
+
+
+def _check_batch(images):
+    images = np.asarray(images)
+    if images.ndim != 4:
+        raise ValueError('images should be a batch of shape (N, H, W, C). Got shape {}'.format(images.shape))
+    return images
+
+
+def _to_float(images):
+    return images.astype(np.float32, copy=False)
+
+
+def _from_float(images, dtype):
+    if np.issubdtype(dtype, np.integer):
+        return np.clip(np.rint(images), 0, 255).astype(dtype)
+    return np.clip(images, 0, 1).astype(dtype, copy=False)
+
+
+def _per_sample(factors, n):
+    return np.broadcast_to(np.asarray(factors, dtype=np.float32), (n, )).reshape((n, 1, 1, 1))
+
+
+def _grayscale(images):
+    return np.tensordot(images[..., :3], np.array([0.2989, 0.5870, 0.1140], np.float32), axes=([-1], [0]))[..., None]
+
+
+def hwc_to_chw(images):
+    return np.transpose(_check_batch(images), (0, 3, 1, 2))
+
+
+def chw_to_hwc(images):
+    images = np.asarray(images)
+    if images.ndim != 4:
+        raise ValueError('images should be a batch of shape (N, C, H, W). Got shape {}'.format(images.shape))
+    return np.transpose(images, (0, 2, 3, 1))
+
+
+def hflip(images):
+    return _check_batch(images)[:, :, ::-1]
+
+
+def vflip(images):
+    return _check_batch(images)[:, ::-1]
+
+
+def normalize(images, mean, std, data_format='HWC'):
+    images = np.asarray(images, dtype=np.float32)
+    if images.ndim != 4:
+        raise ValueError('images should be a batch of 4 dimensions. Got shape {}'.format(images.shape))
+    if data_format == 'HWC':
+        shape = (1, 1, 1, -1)
+    elif data_format == 'CHW':
+        shape = (1, -1, 1, 1)
+    else:
+        raise ValueError('data_format should be CHW or HWC. Got {}'.format(data_format))
+    mean = np.asarray(mean, dtype=np.float32).reshape(shape)
+    std = np.asarray(std, dtype=np.float32).reshape(shape)
+    return (images - mean) / std
+
+
+def standardize(images):
+    images = _to_float(_check_batch(images))
+    num_pixels = np.prod(images.shape[1:])
+    mean = images.mean(axis=(1, 2, 3), keepdims=True)
+    std = np.maximum(images.std(axis=(1, 2, 3), keepdims=True), 1.0 / np.sqrt(num_pixels))
+    return (images - mean) / std
+
+
+def adjust_brightness(images, brightness_factors):
+    images = _check_batch(images)
+    if np.any(np.asarray(brightness_factors) < 0):
+        raise ValueError('brightness_factors ({}) are not non-negative.'.format(brightness_factors))
+    factors = _per_sample(brightness_factors, len(images))
+    return _from_float(_to_float(images) * factors, images.dtype)
+
+
+def adjust_contrast(images, contrast_factors):
+    images = _check_batch(images)
+    if np.any(np.asarray(contrast_factors) < 0):
+        raise ValueError('contrast_factors ({}) are not non-negative.'.format(contrast_factors))
+    factors = _per_sample(contrast_factors, len(images))
+    flt_images = _to_float(images)
+    mean = _grayscale(flt_images).mean(axis=(1, 2, 3), keepdims=True)
+    return _from_float(factors * flt_images + (1 - factors) * mean, images.dtype)
+
+
+def adjust_saturation(images, saturation_factors):
+    images = _check_batch(images)
+    if np.any(np.asarray(saturation_factors) < 0):
+        raise ValueError('saturation_factors ({}) are not non-negative.'.format(saturation_factors))
+    factors = _per_sample(saturation_factors, len(images))
+    flt_images = _to_float(images)
+    return _from_float(factors * flt_images + (1 - factors) * _grayscale(flt_images), images.dtype)
+
+
+def adjust_hue(images, hue_factors):
+    images = _check_batch(images)
+    if np.any(np.abs(np.asarray(hue_factors)) > 0.5):
+        raise ValueError('hue_factors ({}) are not in [-0.5, 0.5].'.format(hue_factors))
+    factors = _per_sample(hue_factors, len(images))
+    scale = 255.0 if np.issubdtype(images.dtype, np.integer) else 1.0
+    hsv = _rgb_to_hsv(_to_float(images) / scale)
+    hsv[..., 0:1] = (hsv[..., 0:1] + factors) % 1.0
+    return _from_float(_hsv_to_rgb(hsv) * scale, images.dtype)
+
+
+def _rgb_to_hsv(rgb):
+    maxc = rgb.max(axis=-1)
+    minc = rgb.min(axis=-1)
+    delta = maxc - minc
+    safe_delta = np.where(delta > 0, delta, 1)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    h = np.where(
+        maxc == r, (g - b) / safe_delta, np.where(maxc == g, 2.0 + (b - r) / safe_delta, 4.0 + (r - g) / safe_delta)
+    )
+    h = np.where(delta > 0, (h / 6.0) % 1.0, 0.0)
+    s = np.where(maxc > 0, delta / np.where(maxc > 0, maxc, 1), 0.0)
+    return np.stack([h, s, maxc], axis=-1).astype(np.float32)
+
+
+def _hsv_to_rgb(hsv):
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(np.int32) % 6
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    return np.stack([r, g, b], axis=-1)
+
+
+def random_hflip(images, prob):
+    images = _check_batch(images)
+    flip = np.random.uniform(size=len(images)) < prob
+    images = images.copy()
+    images[flip] = images[flip][:, :, ::-1]
+    return images
+
+
+def random_vflip(images, prob):
+    images = _check_batch(images)
+    flip = np.random.uniform(size=len(images)) < prob
+    images = images.copy()
+    images[flip] = images[flip][:, ::-1]
+    return images
+
+
+def _pad(images, padding, fill, padding_mode):
+    if isinstance(padding, int):
+        left = top = right = bottom = padding
+    elif isinstance(padding, (tuple, list)) and len(padding) == 2:
+        left = right = padding[0]
+        top = bottom = padding[1]
+    elif isinstance(padding, (tuple, list)) and len(padding) == 4:
+        left, top, right, bottom = padding
+    else:
+        raise TypeError(
+            "Padding can be any of: a number, a tuple or list of size 2 or 4."
+            "But got {}".format(padding)
+        )
+
+    pad_width = ((0, 0), (top, bottom), (left, right), (0, 0))
+    if padding_mode == 'constant':
+        if isinstance(fill, numbers.Number):
+            return np.pad(images, pad_width, mode='constant', constant_values=fill)
+        # one fill value per channel
+        padded = np.pad(images, pad_width, mode='constant')
+        mask = np.ones(padded.shape[1:3], dtype=bool)
+        mask[top:top + images.shape[1], left:left + images.shape[2]] = False
+        padded[:, mask] = np.asarray(fill, dtype=images.dtype)
+        return padded
+    elif padding_mode in ('edge', 'reflect', 'symmetric'):
+        return np.pad(images, pad_width, mode=padding_mode)
+    raise ValueError("Padding mode should be 'constant', 'edge', 'reflect', or 'symmetric'.")
+
+
+def random_crop(images, size, padding=None, pad_if_needed=False, fill=0, padding_mode='constant'):
+    images = _check_batch(images)
+    if isinstance(size, int):
+        size = (size, size)
+    elif not (isinstance(size, (tuple, list)) and len(size) == 2):
+        raise ValueError('Size should be a int or a list/tuple with length of 2. '
+                         'But got {}'.format(size))
+    target_height, target_width = size
+
+    if padding is not None:
+        images = _pad(images, padding, fill, padding_mode)
+    height, width = images.shape[1:3]
+    if pad_if_needed and height < target_height:
+        images = _pad(images, (0, target_height - height), fill, padding_mode)
+    if pad_if_needed and width < target_width:
+        images = _pad(images, (target_width - width, 0), fill, padding_mode)
+
+    n, height, width = images.shape[:3]
+    if height < target_height or width < target_width:
+        raise ValueError(
+            'Crop size {} should be smaller than input image size {}. '.format(
+                (target_height, target_width), (height, width)
+            )
+        )
+
+    offset_height = np.random.randint(0, height - target_height + 1, size=n)
+    offset_width = np.random.randint(0, width - target_width + 1, size=n)
+    rows = offset_height[:, None] + np.arange(target_height)
+    cols = offset_width[:, None] + np.arange(target_width)
+    return images[np.arange(n)[:, None, None], rows[:, :, None], cols[:, None, :]]
+
+
+def color_jitter(images, brightness=None, contrast=None, saturation=None, hue=None):
+    """Randomly change the brightness, contrast, saturation and hue of a batch.
+
+    Each range is a [min, max] list or None. The factors are drawn per sample, the order of the four
+    adjustments is drawn once for the whole batch.
+    """
+
+    images = _check_batch(images)
+    n = len(images)
+    for fn_id in np.random.permutation(np.arange(4)):
+        if fn_id == 0 and brightness is not None:
+            images = adjust_brightness(images, np.random.uniform(brightness[0], brightness[1], size=n))
+        elif fn_id == 1 and contrast is not None:
+            images = adjust_contrast(images, np.random.uniform(contrast[0], contrast[1], size=n))
+        elif fn_id == 2 and saturation is not None:
+            images = adjust_saturation(images, np.random.uniform(saturation[0], saturation[1], size=n))
+        elif fn_id == 3 and hue is not None:
+            images = adjust_hue(images, np.random.uniform(hue[0], hue[1], size=n))
+    return images
+
+
+def affine_transform(images, matrices, interpolation, fill):
+    """Warp each image of the batch with its own 3x3 matrix mapping output to input pixel coordinates."""
+
+    images = _check_batch(images)
+    return np.stack(
+        [_cv2_affine_transform(image, matrix, interpolation, fill) for image, matrix in zip(images, matrices)]
+    )
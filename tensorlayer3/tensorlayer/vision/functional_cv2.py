@@ -665,3 +665,32 @@ def random_affine(image, degrees, shift, zoom, shear, interpolation, fill):
                               borderValue=fill)[:, :, np.newaxis]
     else:
         return cv2.warpAffine(image, matrix, (w, h), flags=_cv2_interp_from_str[interpolation], borderValue=fill)
+
+
+def affine_transform(image, matrix, interpolation, fill):
+
+    cv2 = try_import('cv2')
+    _cv2_interp_from_str = {
+        'nearest': cv2.INTER_NEAREST,
+        'bilinear': cv2.INTER_LINEAR,
+        'area': cv2.INTER_AREA,
+        'bicubic': cv2.INTER_CUBIC,
+        'lanczos': cv2.INTER_LANCZOS4
+    }
+
+    h, w, c = image.shape
+    if isinstance(fill, numbers.Number):
+        fill = (fill, ) * c
+    elif not (isinstance(fill, (list, tuple)) and len(fill) == c):
+        raise ValueError(
+            'If fill should be a single number or a list/tuple with length of image channels.'
+            'But got {}'.format(fill)
+        )
+
+    # the matrix maps output to input coordinates, so cv2 must not invert it
+    matrix = np.asarray(matrix, dtype=np.float64)[:2]
+    flags = _cv2_interp_from_str[interpolation] | cv2.WARP_INVERSE_MAP
+    if c == 1:
+        return cv2.warpAffine(image, matrix, (w, h), flags=flags, borderValue=fill)[:, :, np.newaxis]
+    else:
+        return cv2.warpAffine(image, matrix, (w, h), flags=flags, borderValue=fill)
@@ -482,8 +482,8 @@ def random_shift(image, shift, interpolation, fill):
     center = (w / 2.0, h / 2.0)
     hrg = shift[0]
     wrg = shift[1]
-    tx = np.random.uniform(-hrg, hrg) * h
-    ty = np.random.uniform(-wrg, wrg) * w
+    tx = np.random.uniform(-hrg, hrg) * w
+    ty = np.random.uniform(-wrg, wrg) * h
     matrix = get_affine_matrix(center=center, angle=0, translate=(tx, ty), scale=1.0, shear=(0, 0))
     print(matrix)
 
@@ -552,3 +552,13 @@ def random_affine(image, degrees, shift, zoom, shear, interpolation, fill):
     output_size = (w, h)
     kwargs = {"fillcolor": fill}
     return image.transform(output_size, Image.AFFINE, matrix, interpolation, **kwargs)
+
+
+def affine_transform(image, matrix, interpolation, fill):
+
+    # PIL takes the matrix mapping output to input coordinates
+    matrix = np.asarray(matrix, dtype=np.float64)[:2].reshape(-1).tolist()
+    output_size = image.size
+    interpolation = _pil_interp_from_str[interpolation]
+    kwargs = {"fillcolor": fill}
+    return image.transform(output_size, Image.AFFINE, matrix, interpolation, **kwargs)
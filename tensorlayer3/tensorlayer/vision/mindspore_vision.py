@@ -47,6 +47,8 @@ __all__ = [
     'random_shift',
     'random_zoom',
     'random_affine',
+    'affine_transform',
+    'random_factor',
 ]
 
 
@@ -71,7 +73,7 @@ def _get_image_size(img):
         raise TypeError("Unexpected type {}".format(type(img)))
 
 
-def random_factor(factor, name, center=1, bound=(0, float('inf')), non_negative=True):
+def random_factor(factor, name, center=1, bound=(0, float('inf')), non_negative=True, size=None):
     if isinstance(factor, numbers.Number):
         if factor < 0:
             raise ValueError('The input value of {} cannot be negative.'.format(name))
@@ -86,7 +88,7 @@ def random_factor(factor, name, center=1, bound=(0, float('inf')), non_negative=
             )
     else:
         raise TypeError("Input of {} should be either a single value, or a list/tuple of " "length 2.".format(name))
-    factor = np.random.uniform(factor[0], factor[1])
+    factor = np.random.uniform(factor[0], factor[1], size)
     return factor
 
 
@@ -608,3 +610,14 @@ def random_affine(image, degrees, shift, zoom, shear, interpolation, fill):
         return F_pil.random_affine(image, degrees, shift, zoom, shear, interpolation, fill)
     else:
         return F_cv2.random_affine(image, degrees, shift, zoom, shear, interpolation, fill)
+
+
+def affine_transform(image, matrix, interpolation, fill):
+
+    if not (_is_pil_image(image) or _is_numpy_image(image)):
+        raise TypeError('image should be PIL Image or ndarray with dim=[2 or 3]. Got {}'.format(type(image)))
+
+    if _is_pil_image(image):
+        return F_pil.affine_transform(image, matrix, interpolation, fill)
+    else:
+        return F_cv2.affine_transform(image, matrix, interpolation, fill)
@@ -49,6 +49,8 @@ __all__ = [
     'random_shift',
     'random_zoom',
     'random_affine',
+    'affine_transform',
+    'random_factor',
 ]
 
 
@@ -70,7 +72,7 @@ def _get_image_size(image):
         return height, width
 
 
-def random_factor(factor, name, center=1, bound=(0, float('inf')), non_negative=True):
+def random_factor(factor, name, center=1, bound=(0, float('inf')), non_negative=True, size=None):
     if isinstance(factor, numbers.Number):
         if factor < 0:
             raise ValueError('The input value of {} cannot be negative.'.format(name))
@@ -85,7 +87,7 @@ def random_factor(factor, name, center=1, bound=(0, float('inf')), non_negative=
             )
     else:
         raise TypeError("Input of {} should be either a single value, or a list/tuple of " "length 2.".format(name))
-    factor = np.random.uniform(factor[0], factor[1])
+    factor = np.random.uniform(factor[0], factor[1], size)
     return factor
 
 
@@ -1055,7 +1057,7 @@ def random_rotation(image, degrees, interpolation, expand, center, fill):
         raise ValueError('Interpolation only support {\'nearest\', \'bilinear\'} .')
 
     orig_dtype = image.dtype
-    image = np.asarray(image, dtype=np.float)
+    image = np.asarray(image, dtype=np.float64)
     theta = np.random.uniform(degrees[0], degrees[1])
     angle = -math.radians(theta)
     rotation_matrix = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
@@ -1161,7 +1163,7 @@ def random_shear(image, degrees, interpolation, fill):
         )
 
     orig_dtype = image.dtype
-    image = np.asarray(image, dtype=np.float)
+    image = np.asarray(image, dtype=np.float64)
     shear = [np.random.uniform(degrees[0], degrees[1]), np.random.uniform(degrees[2], degrees[3])]
     shear = np.deg2rad(shear)
     shear_matrix = np.array(
@@ -1222,13 +1224,14 @@ def random_shift(image, shift, interpolation, fill):
         )
 
     orig_dtype = image.dtype
-    image = np.asarray(image, dtype=np.float)
+    image = np.asarray(image, dtype=np.float64)
     hrg = shift[0]
     wrg = shift[1]
     tx = -np.random.uniform(-hrg, hrg) * w
     ty = -np.random.uniform(-wrg, wrg) * h
 
-    shift_matrix = np.array([[1, 0, tx], [0, 1, ty], [0, 0, 1]])
+    # ndimage indexes the image as (row, column), so the vertical shift goes first
+    shift_matrix = np.array([[1, 0, ty], [0, 1, tx], [0, 0, 1]])
 
     transform_matrix = transform_matrix_offset_center(shift_matrix, h, w)
     shift_matrix = transform_matrix[:2, :2]
@@ -1286,7 +1289,7 @@ def random_zoom(image, zoom, interpolation, fill):
         )
 
     orig_dtype = image.dtype
-    image = np.asarray(image, dtype=np.float)
+    image = np.asarray(image, dtype=np.float64)
     zoom_factor = 1 / np.random.uniform(zoom[0], zoom[1])
     zoom_matrix = np.array([[zoom_factor, 0, 0], [0, zoom_factor, 0], [0, 0, 1]])
     transform_matrix = transform_matrix_offset_center(zoom_matrix, h, w)
@@ -1335,7 +1338,7 @@ def random_affine(image, degrees, shift, zoom, shear, interpolation, fill):
             'But got {}'.format(fill)
         )
     orig_dtype = image.dtype
-    image = np.asarray(image, dtype=np.float)
+    image = np.asarray(image, dtype=np.float64)
     theta = np.random.uniform(degrees[0], degrees[1])
     theta = np.deg2rad(theta)
     rotation_matrix = np.array([[np.cos(theta), -np.sin(theta), 0], [np.sin(theta), np.cos(theta), 0], [0, 0, 1]])
@@ -1394,3 +1397,55 @@ def random_affine(image, degrees, shift, zoom, shear, interpolation, fill):
     image = np.asarray(image, dtype=orig_dtype)
     image = ops.convert_to_tensor(image)
     return image
+
+
+def affine_transform(image, matrix, interpolation, fill):
+    '''Warp the image with an affine matrix in a single resampling pass.
+
+    Parameters
+    ----------
+    image:
+        3-D Tensor or np.ndarray of shape [height, width, channels].
+    matrix:
+        3x3 matrix mapping output pixel coordinates (x, y, 1) to input pixel coordinates.
+    interpolation:
+        Interpolation method, 'nearest' or 'bilinear'.
+    fill:
+        Pixel fill value for the area outside the image. A single number or a sequence with one value per channel.
+
+    Returns:
+        Warped image tensor.
+    -------
+
+    '''
+    if interpolation not in ('nearest', 'bilinear'):
+        raise ValueError('Interpolation only support {\'nearest\', \'bilinear\'} .')
+
+    image = ops.convert_to_tensor(image, name='image')
+    orig_dtype = image.dtype
+    c = image.shape[-1]
+    if isinstance(fill, numbers.Number):
+        fill = (fill, ) * c
+    elif not (isinstance(fill, (list, tuple)) and len(fill) == c):
+        raise ValueError(
+            'If fill should be a single number or a list/tuple with length of image channels.'
+            'But got {}'.format(fill)
+        )
+
+    matrix = np.asarray(matrix, dtype=np.float64)
+    matrix = matrix / matrix[2, 2]
+    transforms = tf.constant(matrix.reshape(-1)[:8][None], dtype=tf.float32)
+
+    image = math_ops.cast(image, tf.float32)
+    # warp a channel of ones along with the image to blend in a per-channel fill value
+    image = tf.concat([image, tf.ones_like(image[..., :1])], axis=-1)
+    image = tf.raw_ops.ImageProjectiveTransformV3(
+        images=image[None], transforms=transforms, output_shape=tf.shape(image)[:2], fill_value=0.0,
+        interpolation=interpolation.upper(), fill_mode='CONSTANT'
+    )[0]
+    mask = image[..., -1:]
+    image = image[..., :-1]
+    image = image * mask + (1.0 - mask) * tf.constant(fill, dtype=tf.float32)
+    if orig_dtype.is_integer:
+        image = tf.round(image)
+    return math_ops.cast(image, orig_dtype)
@@ -3,8 +3,11 @@
 
 import tensorlayer as tl
 from . import load_vision_backend as F
+from . import functional_batch as F_batch
+from .functional_cv2 import get_affine_matrix
 import numbers
 import numpy as np
+from PIL import Image
 __all__ = [
     'Crop',
     'CentralCrop',
@@ -126,6 +129,15 @@ class Compose(object):
     ----------
     transforms : list of 'transform' objects
         list of transforms to compose.
+    batched : boolean
+        If True, the input is a batch of images of shape (N, H, W, C) and a numpy batch is returned.
+        Transforms which implement `batch_call` (the flips, crops, color and normalization transforms) run
+        as one vectorized call on the whole batch with random parameters drawn per sample, the others are
+        applied to the images one by one. Default False.
+    fuse_affine : boolean
+        If True, consecutive geometric transforms (:class:`RandomRotation` without expand, :class:`RandomShear`,
+        :class:`RandomShift` and :class:`RandomZoom`) with the same interpolation and fill are fused: their
+        matrices are multiplied and the image is resampled once instead of once per transform. Default True.
 
     Examples
     ----------
@@ -137,20 +149,97 @@ class Compose(object):
     >>> print(image)
     >>> image shape : (100, 100, 3)
 
+    >>> images = (np.random.rand(128, 32, 32, 3) * 255.).astype(np.uint8)
+    >>> transform = tl.vision.transforms.Compose([
+    >>>     tl.vision.transforms.RandomCrop(size=28),
+    >>>     tl.vision.transforms.RandomFlipHorizontal(),
+    >>>     tl.vision.transforms.Normalize(mean=(155.0, 155.0, 155.0), std=(75.0, 75.0, 75.0)),
+    >>> ], batched=True)
+    >>> images = transform(images)
+    >>> images shape : (128, 28, 28, 3)
+
+    The rotation, shear and zoom below are applied with a single warp
+
+    >>> transform = tl.vision.transforms.Compose([
+    >>>     tl.vision.transforms.RandomRotation(degrees=30),
+    >>>     tl.vision.transforms.RandomShear(degrees=10),
+    >>>     tl.vision.transforms.RandomZoom(zoom=(0.8, 1.2)),
+    >>> ])
+
     """
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, batched=False, fuse_affine=True):
 
         self.transforms = transforms
+        self.batched = batched
+        self.fuse_affine = fuse_affine
 
     def __call__(self, data):
 
-        for t in self.transforms:
+        if self.batched:
+            return self.batch_call(data)
 
-            data = t(data)
+        for t in self._fuse_affine_runs():
+            if isinstance(t, list):
+                height, width = _get_image_size(data)
+                matrix = _chain_affine_matrices(t, height, width)
+                data = F.affine_transform(data, matrix, t[0].interpolation, t[0].fill)
+            else:
+                data = t(data)
 
         return data
 
+    def batch_call(self, images):
+
+        for t in self._fuse_affine_runs():
+            if isinstance(t, list):
+                height, width = np.shape(images)[1:3]
+                matrices = [_chain_affine_matrices(t, height, width) for _ in range(len(images))]
+                images = F_batch.affine_transform(images, matrices, t[0].interpolation, t[0].fill)
+            elif hasattr(t, 'batch_call'):
+                images = t.batch_call(images)
+            else:
+                images = np.stack([np.asarray(t(image)) for image in images])
+
+        return images
+
+    def _fuse_affine_runs(self):
+        """Return the transforms, with each run of fusable affine transforms grouped in a list."""
+
+        steps = []
+        for t in self.transforms:
+            if not (self.fuse_affine and _is_affine(t)):
+                steps.append(t)
+            elif steps and isinstance(steps[-1], list) and steps[-1][0].interpolation == t.interpolation \
+                    and steps[-1][0].fill == t.fill:
+                steps[-1].append(t)
+            else:
+                steps.append([t])
+        return steps
+
+
+def _is_affine(transform):
+    return hasattr(transform, 'get_affine_matrix') and not getattr(transform, 'expand', False)
+
+
+def _get_image_size(image):
+    if isinstance(image, Image.Image):
+        return image.size[::-1]
+    return int(image.shape[0]), int(image.shape[1])
+
+
+def _affine_matrix(center, angle=0.0, translate=(0.0, 0.0), scale=1.0, shear=(0.0, 0.0)):
+    matrix = get_affine_matrix(center, angle, translate, scale, shear)
+    return np.array([matrix[0:3], matrix[3:6], [0.0, 0.0, 1.0]])
+
+
+def _chain_affine_matrices(transforms, height, width):
+    # each matrix maps output to input coordinates, so the first transform is the leftmost factor
+    matrix = np.eye(3)
+    for t in transforms:
+        matrix = np.dot(matrix, t.get_affine_matrix(height, width))
+    return matrix
+
 
 class Crop(object):
     """Crops an image to a specified bounding box.
@@ -313,6 +402,10 @@ class HWC2CHW(object):
 
         F.hwc_to_chw(image)
 
+    def batch_call(self, images):
+
+        return F_batch.hwc_to_chw(images)
+
 
 class CHW2HWC(object):
     """Transpose a image shape (C, H, W) to shape (H, W, C).
@@ -333,6 +426,10 @@ class CHW2HWC(object):
 
         F.chw_to_hwc(image)
 
+    def batch_call(self, images):
+
+        return F_batch.chw_to_hwc(images)
+
 
 class RgbToHsv(object):
     """Converts a image from RGB to HSV.
@@ -430,6 +527,10 @@ class AdjustBrightness(object):
 
         return F.adjust_brightness(image, self.brightness_factor)
 
+    def batch_call(self, images):
+
+        return F_batch.adjust_brightness(images, self.brightness_factor)
+
 
 class AdjustContrast(object):
     """Adjust contrast of the image.
@@ -459,6 +560,10 @@ class AdjustContrast(object):
 
         return F.adjust_contrast(image, self.contrast_factor)
 
+    def batch_call(self, images):
+
+        return F_batch.adjust_contrast(images, self.contrast_factor)
+
 
 class AdjustHue(object):
     """Adjust hue of the image.
@@ -490,6 +595,10 @@ class AdjustHue(object):
 
         return F.adjust_hue(image, self.hue_factor)
 
+    def batch_call(self, images):
+
+        return F_batch.adjust_hue(images, self.hue_factor)
+
 
 class AdjustSaturation(object):
     """Adjust saturation of the image.
@@ -519,6 +628,10 @@ class AdjustSaturation(object):
 
         return F.adjust_saturation(image, self.saturation_factor)
 
+    def batch_call(self, images):
+
+        return F_batch.adjust_saturation(images, self.saturation_factor)
+
 
 class FlipHorizontal(object):
     """Flip an image horizontally.
@@ -538,6 +651,10 @@ class FlipHorizontal(object):
 
         return F.hflip(image)
 
+    def batch_call(self, images):
+
+        return F_batch.hflip(images)
+
 
 class FlipVertical(object):
     """Flip an image vertically.
@@ -557,6 +674,10 @@ class FlipVertical(object):
 
         return F.vflip(image)
 
+    def batch_call(self, images):
+
+        return F_batch.vflip(images)
+
 
 class PadToBoundingbox(object):
     """Pad image with the specified height and width to target size.
@@ -632,6 +753,10 @@ class Normalize(object):
 
         return F.normalize(image, self.mean, self.std, self.data_format)
 
+    def batch_call(self, images):
+
+        return F_batch.normalize(images, self.mean, self.std, self.data_format)
+
 
 class StandardizePerImage(object):
     """For each 3-D image x in image, computes (x - mean) / adjusted_stddev, where mean is the average of all values in x.
@@ -653,6 +778,10 @@ class StandardizePerImage(object):
 
         return F.standardize(image)
 
+    def batch_call(self, images):
+
+        return F_batch.standardize(images)
+
 
 class RandomBrightness(object):
     """Random adjust brightness of the image.
@@ -682,6 +811,11 @@ class RandomBrightness(object):
 
         return F.random_brightness(image, self.brighthness_factor)
 
+    def batch_call(self, images):
+
+        factors = F.random_factor(self.brighthness_factor, name='brightness', size=len(images))
+        return F_batch.adjust_brightness(images, factors)
+
 
 class RandomContrast(object):
     """Random adjust contrast of the image.
@@ -712,6 +846,11 @@ class RandomContrast(object):
 
         return F.random_contrast(image, self.contrast_factor)
 
+    def batch_call(self, images):
+
+        factors = F.random_factor(self.contrast_factor, name='contrast', size=len(images))
+        return F_batch.adjust_contrast(images, factors)
+
 
 class RandomSaturation(object):
     """Random adjust saturation of the image.
@@ -742,6 +881,11 @@ class RandomSaturation(object):
 
         return F.random_saturation(image, self.saturation_factor)
 
+    def batch_call(self, images):
+
+        factors = F.random_factor(self.saturation_factor, name='saturation', size=len(images))
+        return F_batch.adjust_saturation(images, factors)
+
 
 class RandomHue(object):
     """Random adjust hue of the image.
@@ -772,6 +916,13 @@ class RandomHue(object):
 
         return F.random_hue(image, self.hue_factor)
 
+    def batch_call(self, images):
+
+        factors = F.random_factor(
+            self.hue_factor, name='hue', center=0, bound=(-0.5, 0.5), non_negative=False, size=len(images)
+        )
+        return F_batch.adjust_hue(images, factors)
+
 
 class RandomCrop(object):
     """Crop the given image at a random location.
@@ -828,6 +979,17 @@ class RandomCrop(object):
             padding_mode=self.padding_mode,
         )
 
+    def batch_call(self, images):
+
+        return F_batch.random_crop(
+            images,
+            size=self.size,
+            padding=self.padding,
+            pad_if_needed=self.pad_if_needed,
+            fill=self.fill,
+            padding_mode=self.padding_mode,
+        )
+
 
 class RandomResizedCrop(object):
     """Crop the given image to random size and aspect ratio.
@@ -895,6 +1057,10 @@ class RandomFlipVertical(object):
 
         return F.random_vflip(image, self.prob)
 
+    def batch_call(self, images):
+
+        return F_batch.random_vflip(images, self.prob)
+
 
 class RandomFlipHorizontal(object):
     """Horizontally flip the given image randomly with a given probability.
@@ -923,6 +1089,10 @@ class RandomFlipHorizontal(object):
 
         return F.random_hflip(image, self.prob)
 
+    def batch_call(self, images):
+
+        return F_batch.random_hflip(images, self.prob)
+
 
 class RandomRotation(object):
     """Rotate the image by random angle.
@@ -969,6 +1139,15 @@ class RandomRotation(object):
 
         return F.random_rotation(image, self.degrees, self.interpolation, self.expand, self.center, self.fill)
 
+    def get_affine_matrix(self, height, width):
+        """Draw a random angle and return the 3x3 matrix mapping output to input pixel coordinates."""
+
+        degrees = (-self.degrees, self.degrees) if isinstance(self.degrees, numbers.Number) else self.degrees
+        angle = np.random.uniform(degrees[0], degrees[1])
+        center = (width / 2.0, height / 2.0) if self.center is None else self.center
+        # the angle is counter clockwise, get_affine_matrix rotates clockwise
+        return _affine_matrix(center, angle=-angle)
+
 
 class RandomShear(object):
     """Shear the image by random angle.
@@ -1006,6 +1185,17 @@ class RandomShear(object):
 
         return F.random_shear(image, self.degrees, self.interpolation, self.fill)
 
+    def get_affine_matrix(self, height, width):
+        """Draw random shear angles and return the 3x3 matrix mapping output to input pixel coordinates."""
+
+        degrees = self.degrees
+        if isinstance(degrees, numbers.Number):
+            degrees = (-degrees, degrees, 0, 0)
+        elif len(degrees) == 2:
+            degrees = (degrees[0], degrees[1], 0, 0)
+        shear = (np.random.uniform(degrees[0], degrees[1]), np.random.uniform(degrees[2], degrees[3]))
+        return _affine_matrix((width / 2.0, height / 2.0), shear=shear)
+
 
 class RandomShift(object):
     """Shift the image by random translations.
@@ -1042,6 +1232,15 @@ class RandomShift(object):
 
         return F.random_shift(image, self.shift, self.interpolation, self.fill)
 
+    def get_affine_matrix(self, height, width):
+        """Draw a random translation and return the 3x3 matrix mapping output to input pixel coordinates."""
+
+        translate = (
+            np.random.uniform(-self.shift[0], self.shift[0]) * width,
+            np.random.uniform(-self.shift[1], self.shift[1]) * height
+        )
+        return _affine_matrix((width / 2.0, height / 2.0), translate=translate)
+
 
 class RandomZoom(object):
     """Zoom the image by random scale.
@@ -1076,6 +1275,12 @@ class RandomZoom(object):
 
         return F.random_zoom(image, self.zoom, self.interpolation, self.fill)
 
+    def get_affine_matrix(self, height, width):
+        """Draw a random scale and return the 3x3 matrix mapping output to input pixel coordinates."""
+
+        scale = np.random.uniform(self.zoom[0], self.zoom[1])
+        return _affine_matrix((width / 2.0, height / 2.0), scale=scale)
+
 
 class RandomAffine(object):
     """Random affine transformation of the image keeping center invariant.
@@ -1254,3 +1459,7 @@ class ColorJitter(object):
                 image = F.adjust_hue(image, hue_factor)
 
         return image
+
+    def batch_call(self, images):
+
+        return F_batch.color_jitter(images, self.brightness, self.contrast, self.saturation, self.hue)
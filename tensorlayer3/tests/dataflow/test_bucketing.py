@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorlayer as tl
+
+from tests.utils import CustomTestCase
+
+
+class BucketBatch_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.sequences = [rng.randint(1, 100, size=n) for n in rng.randint(1, 50, size=100)]
+        cls.labels = np.arange(100)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_labels_follow_sequences(self):
+        batches = tl.dataflow.BucketBatch(
+            self.sequences, self.labels, bucket_boundaries=[16, 32], max_tokens=256, shuffle=True, seed=0
+        )
+        epochs = []
+        for _ in range(2):
+            labels = []
+            for x, mask, y in batches:
+                self.assertEqual(x.dtype, np.int32)
+                self.assertEqual(x.shape, mask.shape)
+                for row, label in enumerate(y):
+                    np.testing.assert_array_equal(x[row][mask[row] == 1], self.sequences[label])
+                labels.append(y.tolist())
+            self.assertEqual(len(labels), len(batches))
+            self.assertEqual(sorted(sum(labels, [])), list(range(100)))
+            epochs.append(labels)
+        # every epoch is shuffled again
+        self.assertNotEqual(epochs[0], epochs[1])
+
+    def test_less_padding(self):
+        n_padded = sum(x.size for x, _ in tl.dataflow.BucketBatch(self.sequences, max_tokens=256))
+        n_tokens = sum(len(s) for s in self.sequences)
+        self.assertLess(n_padded, len(self.sequences) * max(len(s) for s in self.sequences))
+        self.assertGreaterEqual(n_padded, n_tokens)
+
+    def test_label_count_mismatch(self):
+        with self.assertRaises(ValueError):
+            tl.dataflow.BucketBatch(self.sequences, self.labels[:10])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
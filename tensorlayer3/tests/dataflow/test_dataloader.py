@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorlayer as tl
+
+from tests.utils import CustomTestCase
+
+
+class IndexDataset(tl.dataflow.Dataset):
+
+    def __init__(self, n):
+        self.n = n
+
+    def __getitem__(self, index):
+        if index >= self.n:
+            raise IndexError
+        return np.full((4, 4, 3), index, np.float32), np.int64(index)
+
+    def __len__(self):
+        return self.n
+
+
+class BadShapeDataset(IndexDataset):
+
+    def __getitem__(self, index):
+        data, label = super(BadShapeDataset, self).__getitem__(index)
+        return (data if index < 5 else data[:2]), label
+
+
+class Dataloader_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_num_workers_matches_single_process(self):
+        dataset = IndexDataset(37)
+        serial = tl.dataflow.Dataloader(tl.dataflow.FromGenerator(dataset, [tl.float32, tl.int64]), batch_size=8)
+        parallel = tl.dataflow.Dataloader(dataset, batch_size=8, num_workers=3)
+
+        n_batch = 0
+        for (X1, y1), (X2, y2) in zip(serial, parallel):
+            np.testing.assert_array_equal(X1.numpy(), X2.numpy())
+            np.testing.assert_array_equal(y1.numpy(), y2.numpy())
+            n_batch += 1
+        self.assertEqual(n_batch, 5)
+
+    def test_num_workers_shuffle_drop_last(self):
+        dataset = IndexDataset(37)
+        loader = tl.dataflow.Dataloader(dataset, batch_size=8, shuffle=True, drop_last=True, num_workers=2)
+        for _ in range(2):
+            labels = [y.numpy() for _, y in loader]
+            self.assertEqual(len(labels), 4)
+            labels = np.concatenate(labels)
+            self.assertEqual(len(set(labels)), 32)
+            for X, y in loader:
+                np.testing.assert_array_equal(X.numpy()[:, 0, 0, 0], y.numpy())
+
+    def test_num_workers_errors(self):
+        with self.assertRaises(TypeError):
+            tl.dataflow.Dataloader(
+                tl.dataflow.FromGenerator(IndexDataset(8), [tl.float32, tl.int64]), batch_size=4, num_workers=2
+            )
+        with self.assertRaises(Exception):
+            for _ in tl.dataflow.Dataloader(BadShapeDataset(16), batch_size=4, num_workers=2):
+                pass
+
+
+if __name__ == '__main__':
+
+    unittest.main()
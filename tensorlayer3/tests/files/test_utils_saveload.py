@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import tempfile
 import unittest
 
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
@@ -112,6 +113,93 @@ class Model_Core_Test(CustomTestCase):
         self.dynamic_model._all_weights = ori_weights
 
 
+class MLP(Module):
+
+    def __init__(self):
+        super(MLP, self).__init__()
+        self.dense1 = Dense(16, act=tl.ReLU, in_channels=8, name="dense1")
+        self.dense2 = Dense(4, in_channels=16, name="dense2")
+
+    def forward(self, x):
+        return self.dense2(self.dense1(x))
+
+
+class Save_Load_By_Name_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.net = MLP()
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.path.exists("./model_basic.tlw"):
+            os.remove("./model_basic.tlw")
+
+    def test_tlw(self):
+        ori_vals = [w.numpy() for w in self.net.all_weights]
+        self.net.save_weights("./model_basic.tlw")
+
+        weights = tl.files.load_tlw("./model_basic.tlw")
+        self.assertEqual(list(weights.keys()), [w.name for w in self.net.all_weights])
+        for value, ori_val in zip(weights.values(), ori_vals):
+            self.assertIsInstance(value, np.memmap)
+            self.assertEqual(value.ctypes.data % 64, 0)
+            np.testing.assert_array_equal(value, ori_val)
+        weights = None
+
+        for w in self.net.all_weights:
+            w.assign(tf.zeros_like(w))
+        self.net.load_weights("./model_basic.tlw")
+        for w, ori_val in zip(self.net.all_weights, ori_vals):
+            np.testing.assert_array_equal(w.numpy(), ori_val)
+
+        ori_weights = self.net._all_weights
+        self.net._all_weights = ori_weights[1:]
+        with self.assertRaises(RuntimeError):
+            self.net.load_weights("./model_basic.tlw", format='tlw')
+        self.net.load_weights("./model_basic.tlw", format='tlw', skip=True)
+        self.net._all_weights = ori_weights
+
+    def test_tlw_sharded(self):
+        ori_vals = [w.numpy() for w in self.net.all_weights]
+        with tempfile.TemporaryDirectory() as save_dir:
+            file_path = os.path.join(save_dir, 'model.tlw')
+            # dense1/W alone fills the first shard, the other tensors share the second one
+            tl.files.save_tlw(self.net.all_weights, file_path, max_shard_size=500)
+            self.assertEqual(sorted(os.listdir(save_dir)), ['model-00001.tlw', 'model-00002.tlw', 'model.tlw'])
+
+            weights = tl.files.load_tlw(file_path)
+            self.assertEqual(list(weights.keys()), [w.name for w in self.net.all_weights])
+            for value, ori_val in zip(weights.values(), ori_vals):
+                np.testing.assert_array_equal(value, ori_val)
+            weights = None
+
+            for w in self.net.all_weights:
+                w.assign(tf.zeros_like(w))
+            self.net.load_weights(file_path)
+            for w, ori_val in zip(self.net.all_weights, ori_vals):
+                np.testing.assert_array_equal(w.numpy(), ori_val)
+
+    def test_npz_dict_by_name(self):
+        ori_vals = {w.name: w.numpy() for w in self.net.all_weights}
+        self.net.save_weights("./model_basic.npz", format='npz_dict')
+        # compressed members are read through np.load
+        np.savez_compressed("./model_compressed.npz", **ori_vals)
+
+        for file_path in ["./model_basic.npz", "./model_compressed.npz"]:
+            for w in self.net.all_weights:
+                w.assign(tf.zeros_like(w))
+            self.net.load_weights(file_path, format='npz_dict')
+            for w in self.net.all_weights:
+                np.testing.assert_array_equal(w.numpy(), ori_vals[w.name])
+            os.remove(file_path)
+
+        # the name index is cached on the network
+        index = tl.files.utils._weights_by_name(self.net)
+        self.assertIs(tl.files.utils._weights_by_name(self.net), index)
+        self.assertEqual(set(index.keys()), set(ori_vals.keys()))
+
+
 if __name__ == '__main__':
 
     unittest.main()
@@ -6,6 +6,7 @@ import unittest
 
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
+import numpy as np
 import tensorlayer as tl
 
 from tests.utils import CustomTestCase
@@ -68,6 +69,23 @@ class Layer_Core_Test(CustomTestCase):
     def test_model(self):
         self.assertEqual(len(self.net.all_weights), 4)
 
+    def test_deferred_init(self):
+        with tl.layers.deferred_init():
+            dense1 = tl.layers.Dense(n_units=16, in_channels=8, name='deferred_dense1')
+            dense2 = tl.layers.Dense(n_units=16, in_channels=8, name='deferred_dense2')
+        self.assertEqual(dense1.all_weights[0].shape, (8, 16))
+        self.assertFalse(bool(dense1.all_weights[0].is_initialized()))
+
+        # an assigned weight keeps its value, the others are initialized on the first call
+        value = np.ones((8, 16), dtype=np.float32)
+        dense1.all_weights[0].assign(value)
+        dense1(tl.layers.Input([2, 8]))
+        np.testing.assert_array_equal(dense1.all_weights[0].numpy(), value)
+        self.assertTrue(bool(dense1.all_weights[1].is_initialized()))
+
+        dense2.materialize_weights()
+        self.assertTrue(all(bool(w.is_initialized()) for w in dense2.all_weights))
+
 
 if __name__ == '__main__':
 
@@ -58,6 +58,35 @@ class Layer_nested(CustomTestCase):
         model_dynamic.layer.input_layer.b.assign_add(tl.ops.ones((20, )))
         cls.assertEqual(np.sum(model_dynamic.all_weights[-1].numpy() - tl.ops.ones(20, ).numpy()), 0)
 
+    def test_cached_layers_and_weights(self):
+
+        class Stack(tl.layers.Module):
+
+            def __init__(self):
+                super(Stack, self).__init__()
+                self.blocks = tl.layers.LayerList([tl.layers.Dense(n_units=4, in_channels=4) for _ in range(2)])
+
+            def forward(self, x):
+                for block in self.blocks:
+                    x = block(x)
+                return x
+
+        net = Stack()
+        self.assertEqual(len(net.all_weights), 4)
+        # cached until the layer tree changes
+        self.assertIs(net.all_weights, net.all_weights)
+        self.assertIs(net._flat_layers(), net._flat_layers())
+
+        # mutating a sublayer invalidates the lists of its parents
+        net.blocks.append(tl.layers.Dense(n_units=4, in_channels=4, b_init=None))
+        self.assertEqual(len(net.all_weights), 5)
+        self.assertEqual(len(net.trainable_weights), 5)
+
+        net.set_eval()
+        self.assertTrue(all(not layer.is_train for _, layer in net.layers_and_names()))
+        net.set_train()
+        self.assertTrue(all(layer.is_train for _, layer in net.layers_and_names()))
+
 
 if __name__ == '__main__':
 
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorlayer as tl
+
+from tests.utils import CustomTestCase
+
+
+def randomize_batchnorm(net, rng):
+    for _, layer in net.layers_and_names():
+        if isinstance(layer, tl.layers.BatchNorm):
+            shape = layer.moving_mean.shape
+            layer.moving_mean.assign(rng.randn(*shape).astype(np.float32))
+            layer.moving_var.assign(rng.uniform(0.5, 2.0, size=shape).astype(np.float32))
+            layer.beta.assign(rng.randn(*shape).astype(np.float32))
+            layer.gamma.assign(rng.uniform(0.5, 2.0, size=shape).astype(np.float32))
+
+
+class Layer_Fusion_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.x = rng.rand(4, 8, 8, 3).astype(np.float32)
+        cls.net = tl.layers.SequentialLayer(
+            [
+                tl.layers.Conv2d(8, (3, 3), in_channels=3, b_init=None),
+                tl.layers.BatchNorm2d(num_features=8, act=tl.ReLU),
+                tl.layers.Dropout(keep=0.5),
+                tl.layers.SequentialLayer(
+                    [
+                        tl.layers.Conv2d(8, (3, 3), in_channels=8),
+                        tl.layers.BatchNorm2d(num_features=8),
+                        tl.layers.LeakyReLU(alpha=0.1),
+                    ]
+                ),
+                tl.layers.Flatten(),
+                tl.layers.Dense(n_units=10, in_channels=8 * 8 * 8),
+                tl.layers.BatchNorm1d(num_features=10),
+                tl.layers.Swish(),
+                tl.layers.HardTanh(),
+            ]
+        )
+        randomize_batchnorm(cls.net, rng)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_fused_nodes(self):
+        graph = tl.layers.capture_graph(self.net, self.x)
+        self.assertEqual([node.kind for node in graph.nodes], ['conv_bn', 'conv_bn', 'layer', 'dense_bn'])
+        self.assertEqual([len(node.layers) for node in graph.nodes], [2, 3, 1, 4])
+
+    def test_matches_eager(self):
+        self.net.set_eval()
+        expected = self.net(self.x).numpy()
+        for fuse in [False, True]:
+            graph = tl.layers.capture_graph(self.net, self.x, fuse=fuse)
+            self.assertLess(np.max(np.abs(graph(self.x).numpy() - expected)), 1e-4)
+            # a smaller batch reuses the same trace
+            self.assertLess(np.max(np.abs(graph(self.x[:1]).numpy() - expected[:1])), 1e-4)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -921,6 +921,76 @@ class Layer_RNN_Test(CustomTestCase):
         os.remove(filename)
 
 
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def _reference_rnn(mode, x, weights, biases, h, c):
+    """Step through one direction of one layer with numpy, x is [time_step, batch_size, input_size]."""
+    w_ih, w_hh = weights
+    b_ih, b_hh = biases
+    ys = []
+    for x_t in x:
+        x_gates = x_t @ w_ih.T + b_ih
+        h_gates = h @ w_hh.T + b_hh
+        if mode == 'LSTM':
+            i, f, g, o = np.split(x_gates + h_gates, 4, axis=-1)
+            c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+            h = _sigmoid(o) * np.tanh(c)
+        elif mode == 'GRU':
+            x_r, x_z, x_c = np.split(x_gates, 3, axis=-1)
+            h_r, h_z, h_c = np.split(h_gates, 3, axis=-1)
+            r = _sigmoid(x_r + h_r)
+            z = _sigmoid(x_z + h_z)
+            n = np.tanh(x_c + r * h_c)
+            h = (1 - z) * n + z * h
+        else:
+            h = np.tanh(x_gates + h_gates)
+        ys.append(h)
+    return np.stack(ys), h, c
+
+
+class Layer_RNNBase_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.x = np.random.random([3, 7, 5]).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def _check(self, layer, mode, num_layers, bidirect):
+        y, states = layer(self.x)
+        h, c = states if mode == 'LSTM' else (states, None)
+
+        pre_layer = np.transpose(self.x, (1, 0, 2))
+        zeros = np.zeros((3, 4), np.float32)
+        for i in range(num_layers):
+            outs = []
+            for d, (weights, biases) in enumerate([(layer.weights_fw, layer.bias_fw),
+                                                   (layer.weights_bw, layer.bias_bw)][:bidirect]):
+                w = [v.numpy() for v in weights[2 * i:2 * i + 2]]
+                b = [v.numpy() for v in biases[2 * i:2 * i + 2]]
+                x = pre_layer if d == 0 else pre_layer[::-1]
+                ys, h_ref, c_ref = _reference_rnn(mode, x, w, b, zeros, zeros)
+                outs.append(ys if d == 0 else ys[::-1])
+                self.assertLess(np.max(np.abs(h[i * bidirect + d].numpy() - h_ref)), 1e-5)
+                if c is not None:
+                    self.assertLess(np.max(np.abs(c[i * bidirect + d].numpy() - c_ref)), 1e-5)
+            pre_layer = np.concatenate(outs, axis=-1)
+        self.assertLess(np.max(np.abs(y.numpy() - np.transpose(pre_layer, (1, 0, 2)))), 1e-5)
+
+    def test_fused_matches_step_loop(self):
+        for layer_class, mode in [(tl.layers.LSTM, 'LSTM'), (tl.layers.GRU, 'GRU'), (tl.layers.RNN, 'RNN_TANH')]:
+            for bidirectional in [False, True]:
+                kwargs = {} if layer_class is not tl.layers.RNN else {'act': 'tanh'}
+                layer = layer_class(
+                    input_size=5, hidden_size=4, num_layers=2, batch_first=True, bidirectional=bidirectional, **kwargs
+                )
+                self._check(layer, mode, 2, 2 if bidirectional else 1)
+
+
 if __name__ == '__main__':
 
     unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorlayer as tl
+from tensorlayer.layers import BatchNorm, BatchNorm1d, BatchNorm2d, Conv2d, Dense, Flatten, Module, SequentialLayer
+
+from tests.utils import CustomTestCase
+
+
+def randomize_batchnorm(net, rng):
+    for _, layer in net.layers_and_names():
+        if isinstance(layer, BatchNorm):
+            shape = layer.moving_mean.shape
+            layer.moving_mean.assign(rng.randn(*shape).astype(np.float32))
+            layer.moving_var.assign(rng.uniform(0.5, 2.0, size=shape).astype(np.float32))
+            layer.beta.assign(rng.randn(*shape).astype(np.float32))
+            layer.gamma.assign(rng.uniform(0.5, 2.0, size=shape).astype(np.float32))
+
+
+def count_batchnorm(net):
+    return len([layer for _, layer in net.layers_and_names() if isinstance(layer, BatchNorm)])
+
+
+class Block(Module):
+
+    def __init__(self):
+        super(Block, self).__init__()
+        self.conv = Conv2d(4, (3, 3), in_channels=4, b_init=None)
+        self.bn = BatchNorm2d(num_features=4, act=tl.ReLU)
+
+    def forward(self, x):
+        return x + self.bn(self.conv(x))
+
+
+class LeakyBlock(Block):
+    # the output of the conv is also used outside of a layer call
+
+    def forward(self, x):
+        y = self.conv(x)
+        return y + self.bn(y)
+
+
+class Model_Fold_BatchNorm_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rng = np.random.RandomState(0)
+        cls.x = cls.rng.rand(2, 6, 6, 4).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def _check_fold(self, net, **kwargs):
+        randomize_batchnorm(net, self.rng)
+        net.set_eval()
+        expected = net(self.x).numpy()
+        tl.models.fold_batchnorm(net, **kwargs)
+        np.testing.assert_allclose(net(self.x).numpy(), expected, rtol=1e-4, atol=1e-4)
+        return net
+
+    def test_sequential(self):
+        net = SequentialLayer(
+            [
+                Conv2d(4, (3, 3), in_channels=4, b_init=None),
+                BatchNorm2d(num_features=4, act=tl.ReLU),
+                Flatten(),
+                Dense(n_units=8, in_channels=6 * 6 * 4),
+                BatchNorm1d(num_features=8),
+            ]
+        )
+        n_weights = len(net.all_weights)
+        self._check_fold(net)
+        self.assertEqual(count_batchnorm(net), 0)
+        # 4 statistics per BatchNorm are gone, the conv gained a bias
+        self.assertEqual(len(net.all_weights), n_weights - 8 + 1)
+
+    def test_traced(self):
+        net = SequentialLayer([Block(), Block()])
+        self._check_fold(net, inputs=self.x)
+        self.assertEqual(count_batchnorm(net), 0)
+
+    def test_traced_changed_output_is_restored(self):
+        net = LeakyBlock()
+        randomize_batchnorm(net, self.rng)
+        net.set_eval()
+        expected = net(self.x).numpy()
+        with self.assertRaises(RuntimeError):
+            tl.models.fold_batchnorm(net, inputs=self.x)
+        self.assertIsInstance(net.bn, BatchNorm2d)
+        np.testing.assert_array_equal(net(self.x).numpy(), expected)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorflow as tf
+import tensorlayer as tl
+from tensorlayer.layers import Conv2d, Dense, Flatten, Module, SequentialLayer
+from tensorlayer.models.transforms import _int8_matmul
+
+from tests.utils import CustomTestCase
+
+
+class TwoHeads(Module):
+
+    def __init__(self):
+        super(TwoHeads, self).__init__()
+        self.body = Dense(n_units=16, in_channels=8, act=tl.ReLU)
+        self.head = Dense(n_units=4, in_channels=16)
+        self.unused_head = Dense(n_units=4, in_channels=16)
+
+    def forward(self, x):
+        return self.head(self.body(x))
+
+
+class Model_Quantize_Int8_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rng = np.random.RandomState(0)
+        cls.x = cls.rng.rand(64, 8, 8, 3).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        # the weights are drawn from the global TF generator
+        tf.random.set_seed(0)
+
+    def _network(self):
+        return SequentialLayer(
+            [
+                Conv2d(16, (3, 3), in_channels=3, act=tl.ReLU),
+                Flatten(),
+                Dense(n_units=64, in_channels=8 * 8 * 16, act=tl.ReLU),
+                Dense(n_units=10, in_channels=64),
+            ]
+        )
+
+    def _error_std(self, net, activations):
+        """The standard deviation of the output error of the int8 network, propagated through its layers.
+
+        Rounding to a step of `scale` adds an independent error of variance scale ** 2 / 12: a quantized layer
+        adds the error of its weights, with the per channel weight scales, and of its int8 inputs, with the input
+        scale. Inputs clipped off above the calibrated range add their full error. ReLU and Flatten do not
+        increase the error.
+        """
+
+        variance = tf.zeros_like(activations[0])
+        for layer, x in zip(net.layer_list, activations):
+            if not hasattr(layer, 'W_scale'):
+                variance = layer(variance)
+                continue
+            W = layer.dequantized_weights()
+            weight_variance = tf.broadcast_to(layer.W_scale**2 / 12, W.shape)
+            if hasattr(layer, 'matmul'):
+                op = layer.matmul
+                if _int8_matmul:
+                    clipped = tf.maximum(tf.abs(x) - 127 * layer.input_scale, 0)
+                    variance += layer.input_scale**2 / 12 + clipped**2
+            else:
+                op = layer.conv2d
+            variance = op(x**2, weight_variance) + op(variance, W**2)
+        return np.sqrt(variance.numpy())
+
+    def test_quantize(self):
+        net = self._network()
+        net.set_eval()
+        activations = [tf.constant(self.x)]
+        for layer in net.layer_list:
+            activations.append(layer(activations[-1]))
+        expected = activations.pop().numpy()
+        labels = np.argmax(expected, axis=-1)
+        validation_data = [(self.x[i:i + 16], labels[i:i + 16]) for i in range(0, 64, 16)]
+
+        report = tl.models.quantize_int8(net, [self.x[:32]], validation_data=validation_data)
+        self.assertEqual(report['layers'], 3)
+        self.assertGreater(report['size_ratio'], 3.5)
+        self.assertEqual(report['float_accuracy'], 1.0)
+        self.assertLess(report['accuracy_drop'], 0.1)
+        self.assertEqual(report['agreement'], report['int8_accuracy'])
+
+        for weight in net.all_weights:
+            if 'weights_int8' in weight.name:
+                self.assertEqual(weight.dtype, tl.int8)
+        outputs = net(self.x).numpy()
+        std = self._error_std(net, activations)
+        np.testing.assert_array_less(np.abs(outputs - expected), 6 * std + 1e-6)
+
+    def test_uncalibrated_layer_is_kept(self):
+        net = TwoHeads()
+        report = tl.models.quantize_int8(net, [self.rng.rand(4, 8).astype(np.float32)])
+        self.assertEqual(report['layers'], 2)
+        self.assertNotIsInstance(net.head, Dense)
+        self.assertIsInstance(net.unused_head, Dense)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorflow as tf
+import tensorlayer as tl
+from tensorlayer.layers import Module, Dense
+
+from tests.utils import CustomTestCase
+
+
+class MLP(Module):
+
+    def __init__(self):
+        super(MLP, self).__init__()
+        self.dense1 = Dense(16, act=tl.ReLU, in_channels=8)
+        self.dense2 = Dense(4, in_channels=16)
+
+    def forward(self, x):
+        return self.dense2(self.dense1(x))
+
+
+def copy_weights(src, dst):
+    for w_src, w_dst in zip(src.all_weights, dst.all_weights):
+        w_dst.assign(w_src)
+
+
+class Model_Train_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.X = rng.rand(70, 8).astype(np.float32)
+        cls.y = rng.randint(0, 4, size=(70, )).astype(np.int64)
+        # the last batch is smaller than the others
+        cls.dataset = [(cls.X[i:i + 16], cls.y[i:i + 16]) for i in range(0, 70, 16)]
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def _train(self, net, **kwargs):
+        model = tl.models.Model(
+            network=net, loss_fn=tl.cost.softmax_cross_entropy_with_logits, optimizer=tl.optimizers.SGD(0.1),
+            metrics=tl.metric.Accuracy()
+        )
+        model.train(n_epoch=2, train_dataset=self.dataset, print_freq=10, **kwargs)
+        return net
+
+    def test_jit_matches_eager(self):
+        net_eager = MLP()
+        net_jit = MLP()
+        copy_weights(net_eager, net_jit)
+
+        self._train(net_eager)
+        self._train(net_jit, jit=True)
+
+        for w_eager, w_jit in zip(net_eager.all_weights, net_jit.all_weights):
+            self.assertLess(np.max(np.abs(w_eager.numpy() - w_jit.numpy())), 1e-5)
+
+    def test_grad_accum_matches_big_batch(self):
+        net_big = MLP()
+        net_accum = MLP()
+        copy_weights(net_big, net_accum)
+
+        X, y = self.X[:64], self.y[:64]
+        big_batch = [(X, y)]
+        micro_batches = [(X[i:i + 16], y[i:i + 16]) for i in range(0, 64, 16)]
+
+        for net, dataset, steps in [(net_big, big_batch, 1), (net_accum, micro_batches, 4)]:
+            model = tl.models.Model(
+                network=net, loss_fn=tl.cost.softmax_cross_entropy_with_logits, optimizer=tl.optimizers.SGD(0.1)
+            )
+            model.train(n_epoch=1, train_dataset=dataset, print_freq=10, grad_accum_steps=steps)
+
+        for w_big, w_accum in zip(net_big.all_weights, net_accum.all_weights):
+            self.assertLess(np.max(np.abs(w_big.numpy() - w_accum.numpy())), 1e-5)
+
+    def test_grad_accum_trailing_group(self):
+        net_big = MLP()
+        net_accum = MLP()
+        copy_weights(net_big, net_accum)
+
+        # 5 micro-batches in groups of 2, the trailing group has a single micro-batch
+        X, y = self.X[:40], self.y[:40]
+        big_batches = [(X[i:i + 16], y[i:i + 16]) for i in range(0, 40, 16)]
+        micro_batches = [(X[i:i + 8], y[i:i + 8]) for i in range(0, 40, 8)]
+
+        for jit in [False, True]:
+            for net, dataset, steps in [(net_big, big_batches, 1), (net_accum, micro_batches, 2)]:
+                model = tl.models.Model(
+                    network=net, loss_fn=tl.cost.softmax_cross_entropy_with_logits, optimizer=tl.optimizers.SGD(0.1)
+                )
+                model.train(n_epoch=2, train_dataset=dataset, print_freq=10, jit=jit, grad_accum_steps=steps)
+
+            for w_big, w_accum in zip(net_big.all_weights, net_accum.all_weights):
+                self.assertLess(np.max(np.abs(w_big.numpy() - w_accum.numpy())), 1e-5)
+
+    def test_train_one_step_grad_accum(self):
+        net_big = MLP()
+        net_accum = MLP()
+        copy_weights(net_big, net_accum)
+        loss_fn = tl.cost.softmax_cross_entropy_with_logits
+
+        X, y = self.X[:64], self.y[:64]
+        train_big = tl.models.TrainOneStep(
+            tl.models.WithLoss(net_big, loss_fn), tl.optimizers.SGD(0.1), net_big.trainable_weights
+        )
+        train_accum = tl.models.TrainOneStep(
+            tl.models.WithLoss(net_accum, loss_fn), tl.optimizers.SGD(0.1), net_accum.trainable_weights,
+            grad_accum_steps=4
+        )
+        train_big(X, y)
+        for i in range(0, 48, 16):
+            train_accum(X[i:i + 16], y[i:i + 16])
+            # weights are untouched until the group is complete
+            self.assertGreater(np.max(np.abs(net_big.all_weights[0].numpy() - net_accum.all_weights[0].numpy())), 0)
+        train_accum(X[48:], y[48:])
+
+        for w_big, w_accum in zip(net_big.all_weights, net_accum.all_weights):
+            self.assertLess(np.max(np.abs(w_big.numpy() - w_accum.numpy())), 1e-5)
+
+    def test_eval_metrics_accumulate_over_dataset(self):
+        net = MLP()
+        metric = tl.metric.Accuracy()
+        model = tl.models.Model(network=net, loss_fn=tl.cost.softmax_cross_entropy_with_logits, metrics=metric)
+        model.eval(self.dataset)
+
+        # the metric is not reset per batch, so it holds the accuracy over all samples
+        expected = np.mean(np.argmax(net(self.X).numpy(), 1) == self.y)
+        self.assertAlmostEqual(float(metric.result()), expected, places=5)
+
+    def test_compute_dtype_bfloat16(self):
+        net_fp32 = MLP()
+        net_bf16 = MLP()
+        copy_weights(net_fp32, net_bf16)
+        net_bf16.set_compute_dtype('bfloat16')
+
+        out = net_bf16(self.X)
+        self.assertEqual(out.dtype, tf.float32)
+        self.assertLess(np.max(np.abs(out.numpy() - net_fp32(self.X).numpy())), 5e-2)
+
+        self._train(net_fp32)
+        self._train(net_bf16)
+        # the master weights stay in float32 and follow the float32 run closely
+        for w_fp32, w_bf16 in zip(net_fp32.all_weights, net_bf16.all_weights):
+            self.assertEqual(w_bf16.dtype, tf.float32)
+            self.assertLess(np.max(np.abs(w_fp32.numpy() - w_bf16.numpy())), 5e-2)
+
+        with self.assertRaises(ValueError):
+            net_bf16.set_compute_dtype('int8')
+
+    def test_compute_dtype_activations(self):
+        net = tl.layers.SequentialLayer(
+            [Dense(16, in_channels=8),
+             tl.layers.BatchNorm1d(num_features=16),
+             Dense(4, in_channels=16)]
+        )
+        net.set_compute_dtype('bfloat16')
+        self.assertEqual(net(self.X).dtype, tf.float32)
+
+        # the activations between the layers stay in bfloat16, BatchNorm computes in float32
+        hidden = net[0](self.X)
+        self.assertEqual(hidden.dtype, tf.bfloat16)
+        self.assertEqual(net[1](hidden).dtype, tf.bfloat16)
+
+        net.set_compute_dtype(None)
+        self.assertEqual(net[0](self.X).dtype, tf.float32)
+
+    def test_train_one_step_loss_scale(self):
+        net_ref = MLP()
+        net_scaled = MLP()
+        copy_weights(net_ref, net_scaled)
+        loss_fn = tl.cost.softmax_cross_entropy_with_logits
+
+        loss_scale = tl.models.DynamicLossScale(initial_scale=2.0**10, growth_interval=2)
+        train_ref = tl.models.TrainOneStep(
+            tl.models.WithLoss(net_ref, loss_fn), tl.optimizers.SGD(0.1), net_ref.trainable_weights
+        )
+        train_scaled = tl.models.TrainOneStep(
+            tl.models.WithLoss(net_scaled, loss_fn), tl.optimizers.SGD(0.1), net_scaled.trainable_weights,
+            loss_scale=loss_scale
+        )
+        for X, y in self.dataset[:2]:
+            train_ref(X, y)
+            train_scaled(X, y)
+        self.assertEqual(loss_scale.scale, 2.0**11)
+        for w_ref, w_scaled in zip(net_ref.all_weights, net_scaled.all_weights):
+            self.assertLess(np.max(np.abs(w_ref.numpy() - w_scaled.numpy())), 1e-5)
+
+        # an overflowing step is skipped and the scale is lowered
+        weights = [np.array(w.numpy(), copy=True) for w in net_scaled.all_weights]
+        X_inf = np.full_like(self.X[:16], np.inf)
+        train_scaled(X_inf, self.y[:16])
+        self.assertEqual(loss_scale.scale, 2.0**10)
+        for w_before, w_after in zip(weights, net_scaled.all_weights):
+            np.testing.assert_array_equal(w_before, w_after.numpy())
+
+    def test_async_checkpointer(self):
+        net = MLP()
+        with tempfile.TemporaryDirectory() as save_dir:
+            checkpointer = tl.files.AsyncCheckpointer(save_dir=save_dir, save_steps=2, max_to_keep=2)
+            # 2 epochs of 5 batches save at steps 2, 4, 6, 8 and 10
+            self._train(net, checkpointer=checkpointer)
+
+            self.assertEqual(sorted(os.listdir(save_dir)), ['model-10.tlw', 'model-8.tlw'])
+            self.assertEqual(checkpointer.latest_checkpoint, os.path.join(save_dir, 'model-10.tlw'))
+            weights = tl.files.load_tlw(checkpointer.latest_checkpoint)
+            for w in net.all_weights:
+                np.testing.assert_array_equal(weights[w.name], w.numpy())
+            weights = None
+
+            # existing checkpoints are picked up and still count towards max_to_keep
+            checkpointer = tl.files.AsyncCheckpointer(save_dir=save_dir, save_steps=2, max_to_keep=2)
+            self.assertEqual(checkpointer.checkpoints, [os.path.join(save_dir, 'model-%d.tlw' % i) for i in (8, 10)])
+            checkpointer.save(net.all_weights, step=12)
+            checkpointer.wait()
+            self.assertEqual(sorted(os.listdir(save_dir)), ['model-10.tlw', 'model-12.tlw'])
+
+            # step() continues from the highest saved step, and checkpoints are ordered by step
+            checkpointer = tl.files.AsyncCheckpointer(save_dir=save_dir, save_steps=2, max_to_keep=2)
+            checkpointer.step(net.all_weights)
+            checkpointer.step(net.all_weights)
+            checkpointer.save(net.all_weights, step=4)
+            checkpointer.wait()
+            self.assertEqual(sorted(os.listdir(save_dir)), ['model-12.tlw', 'model-14.tlw'])
+            self.assertEqual(checkpointer.latest_checkpoint, os.path.join(save_dir, 'model-14.tlw'))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
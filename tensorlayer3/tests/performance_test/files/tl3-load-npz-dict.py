@@ -0,0 +1,39 @@
+import os
+import tempfile
+import time
+
+from tensorlayer.layers import Dense, Module
+
+num_layers = 1000
+num_iters = 5
+
+
+class DeepMLP(Module):
+    # 2 weight tensors per layer
+
+    def __init__(self):
+        super(DeepMLP, self).__init__()
+        self.layers = [Dense(32, in_channels=32, name='dense%d' % i) for i in range(num_layers)]
+        for i, layer in enumerate(self.layers):
+            setattr(self, 'dense%d' % i, layer)
+
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+net = DeepMLP()
+print('{} weight tensors'.format(len(net.all_weights)))
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    for format in ['npz_dict', 'tlw']:
+        file_path = os.path.join(tmp_dir, 'model.' + ('tlw' if format == 'tlw' else 'npz'))
+        net.save_weights(file_path, format=format)
+        # warm up
+        net.load_weights(file_path, format=format)
+
+        start_time = time.time()
+        for _ in range(num_iters):
+            net.load_weights(file_path, format=format)
+        print('load_weights(format={!r}): {:.3f}s'.format(format, (time.time() - start_time) / num_iters))
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import tensorlayer as tl
+
+vocab_size = 30000
+num_sentences = 2000
+num_iters = 10
+
+rng = np.random.RandomState(0)
+words = ['w%d' % i for i in range(vocab_size)]
+sentences = [[words[i % vocab_size] for i in rng.zipf(1.3, size=rng.randint(5, 60))] for _ in range(num_sentences)]
+
+with tempfile.TemporaryDirectory() as tmp:
+    vocab_path = os.path.join(tmp, 'vocab.txt')
+    tl.nlp.create_vocab(sentences, word_counts_output_file=vocab_path)
+    vocab = tl.nlp.Vocabulary(vocab_path)
+    cached_vocab = tl.nlp.Vocabulary(vocab_path, cache_size=num_sentences)
+
+
+def per_token(vocab, sentences):
+    # what pipelines do today, one call per token, then padding
+    max_length = max(len(s) for s in sentences)
+    ids = np.full((len(sentences), max_length), vocab.pad_id, dtype=np.int32)
+    for i, s in enumerate(sentences):
+        for j, w in enumerate(s):
+            ids[i, j] = vocab.word_to_id(w)
+    return ids, [' '.join(vocab.id_to_word(word_id) for word_id in row[:len(s)]) for row, s in zip(ids, sentences)]
+
+
+def batched(vocab, sentences):
+    ids, lengths = vocab.encode_batch(sentences)
+    return ids, vocab.decode_batch(ids, lengths)
+
+
+for name, fn, v in [('per token', per_token, vocab), ('batched', batched, vocab),
+                    ('batched + cache', batched, cached_vocab)]:
+    start_time = time.time()
+    for _ in range(num_iters):
+        fn(v, sentences)
+    print('{}: {:.1f}ms per {} sentences'.format(name, (time.time() - start_time) / num_iters * 1e3, num_sentences))
@@ -0,0 +1,38 @@
+import time
+
+import numpy as np
+import tensorflow as tf
+import tensorlayer as tl
+
+batch_size = 32
+seq_len = 200
+input_size = 64
+hidden_size = 128
+num_iters = 5
+
+x = tf.constant(np.random.rand(batch_size, seq_len, input_size).astype(np.float32))
+
+
+def sequences_per_sec(bidirectional):
+    lstm = tl.layers.LSTM(
+        input_size=input_size, hidden_size=hidden_size, num_layers=2, batch_first=True, bidirectional=bidirectional
+    )
+    lstm.set_train()
+
+    def train_step():
+        with tf.GradientTape() as tape:
+            y, _ = lstm(x)
+            loss = tf.reduce_mean(y)
+        return tape.gradient(loss, lstm.trainable_weights)
+
+    # warm up
+    train_step()
+
+    start_time = time.time()
+    for _ in range(num_iters):
+        train_step()
+    return num_iters * batch_size / (time.time() - start_time)
+
+
+print('LSTM seq_len={} forward+backward: {:.1f} sequences/sec'.format(seq_len, sequences_per_sec(False)))
+print('BiLSTM seq_len={} forward+backward: {:.1f} sequences/sec'.format(seq_len, sequences_per_sec(True)))
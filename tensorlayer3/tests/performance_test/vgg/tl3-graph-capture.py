@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+
+import tensorflow as tf
+import tensorlayer as tl
+from exp_config import random_input_generator, BATCH_SIZE
+
+# the VGG16 and ResNet50 of TensorLayer 3 live in the model zoo of the examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from examples.model_zoo.vgg import vgg16
+from examples.model_zoo.resnet import ResNet50
+
+gpus = tf.config.experimental.list_physical_devices('GPU')
+if gpus:
+    for gpu in gpus:
+        tf.config.experimental.set_memory_growth(gpu, True)
+
+num_iter = 20
+
+
+def images_per_sec(fn, x):
+    # warm up, the captured graph is traced during the first call
+    fn(x).numpy()
+    start_time = time.time()
+    for _ in range(num_iter):
+        fn(x).numpy()
+    return num_iter * x.shape[0] / (time.time() - start_time)
+
+
+x, _ = next(random_input_generator(1, BATCH_SIZE))
+for name, net in [('vgg16', vgg16()), ('resnet50', ResNet50())]:
+    net.set_eval()
+    eager = images_per_sec(net, x)
+    captured = images_per_sec(tl.layers.capture_graph(net, x), x)
+    xla = images_per_sec(tl.layers.capture_graph(net, x, jit_compile=True), x)
+    print(
+        '{}: eager {:.1f} img/s, captured {:.1f} img/s, captured with XLA {:.1f} img/s'.format(
+            name, eager, captured, xla
+        )
+    )
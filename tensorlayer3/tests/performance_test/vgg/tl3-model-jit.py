@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import tensorflow as tf
+import tensorlayer as tl
+from exp_config import random_input_generator, NUM_ITERS, BATCH_SIZE, LERANING_RATE
+
+# the VGG16 of TensorLayer 3 lives in the model zoo of the examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from examples.model_zoo.vgg import vgg16
+
+gpus = tf.config.experimental.list_physical_devices('GPU')
+if gpus:
+    for gpu in gpus:
+        tf.config.experimental.set_memory_growth(gpu, True)
+
+tl.logging.set_verbosity(tl.logging.DEBUG)
+
+# training setting
+num_iter = NUM_ITERS
+batch_size = BATCH_SIZE
+loss_object = tl.cost.softmax_cross_entropy_with_logits
+
+
+def steps_per_sec(jit):
+    vgg = vgg16()
+    optimizer = tl.optimizers.Adam(learning_rate=LERANING_RATE)
+    model = tl.models.Model(network=vgg, loss_fn=loss_object, optimizer=optimizer)
+    data = list(random_input_generator(num_iter, batch_size))
+
+    # warm up, the compiled step is traced during the first batch
+    model.train(n_epoch=1, train_dataset=data[:1], print_freq=1, jit=jit)
+
+    start_time = time.time()
+    model.train(n_epoch=1, train_dataset=data[1:], print_freq=1, jit=jit)
+    return (num_iter - 1) / (time.time() - start_time)
+
+
+eager = steps_per_sec(jit=False)
+compiled = steps_per_sec(jit=True)
+print('eager:    {:.2f} steps/sec'.format(eager))
+print('jit=True: {:.2f} steps/sec'.format(compiled))
+print('speedup:  {:.2f}x'.format(compiled / eager))
@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+from tensorlayer.vision import transforms
+
+batch_size = 32
+num_iters = 5
+images = (np.random.rand(batch_size, 224, 224, 3) * 255.).astype(np.uint8)
+
+
+def pipeline(fuse_affine, batched=False):
+    return transforms.Compose(
+        [
+            transforms.RandomRotation(degrees=30),
+            transforms.RandomShear(degrees=10),
+            transforms.RandomShift(shift=(0.1, 0.1)),
+            transforms.RandomZoom(zoom=(0.9, 1.1)),
+        ], batched=batched, fuse_affine=fuse_affine
+    )
+
+
+def images_per_sec(transform, batched=False):
+    # warm up
+    transform(images if batched else images[0])
+
+    start_time = time.time()
+    for _ in range(num_iters):
+        if batched:
+            transform(images)
+        else:
+            for image in images:
+                transform(image)
+    return num_iters * batch_size / (time.time() - start_time)
+
+
+chained = images_per_sec(pipeline(fuse_affine=False))
+fused = images_per_sec(pipeline(fuse_affine=True))
+fused_batched = images_per_sec(pipeline(fuse_affine=True, batched=True), batched=True)
+
+print('four warps per image:    {:.1f} images/sec'.format(chained))
+print('one fused warp per image: {:.1f} images/sec ({:.1f}x)'.format(fused, fused / chained))
+print('fused and batched:        {:.1f} images/sec ({:.1f}x)'.format(fused_batched, fused_batched / chained))
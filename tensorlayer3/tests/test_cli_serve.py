@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+from tensorlayer.cli.serve import DynamicBatcher, _make_handler, _Request
+
+from tests.utils import CustomTestCase
+
+
+class Test_Serve(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pass
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def _predict_concurrently(self, batcher, n_requests):
+        results = [None] * n_requests
+
+        def request(i):
+            results[i] = batcher.predict(np.full((1, 3), i, dtype=np.float32))
+
+        threads = [threading.Thread(target=request, args=(i, )) for i in range(n_requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_dynamic_batching(self):
+        batch_sizes = []
+
+        def predict_fn(x):
+            batch_sizes.append(len(x))
+            return x * 2
+
+        batcher = DynamicBatcher(predict_fn, max_batch_size=8, max_latency=0.05)
+        results = self._predict_concurrently(batcher, 32)
+        batcher.stop()
+
+        for i, outputs in enumerate(results):
+            np.testing.assert_array_equal(outputs, np.full((1, 3), 2 * i))
+        self.assertEqual(sum(batch_sizes), 32)
+        self.assertLessEqual(max(batch_sizes), 8)
+        self.assertLess(len(batch_sizes), 32)
+
+        stats = batcher.stats()
+        self.assertEqual(stats['requests'], 32)
+        self.assertEqual(stats['batches'], len(batch_sizes))
+        self.assertLessEqual(stats['latency_p50_ms'], stats['latency_p99_ms'])
+        with self.assertRaises(RuntimeError):
+            batcher.predict(np.zeros((1, 3)))
+
+    def test_error_is_raised_in_caller(self):
+
+        def predict_fn(x):
+            raise ValueError("bad inputs")
+
+        batcher = DynamicBatcher(predict_fn, max_batch_size=4, max_latency=0.001)
+        with self.assertRaises(ValueError):
+            batcher.predict(np.zeros((1, 3)))
+        batcher.stop()
+
+    def test_scalar_inputs_do_not_stop_the_worker(self):
+        batcher = DynamicBatcher(lambda x: x * 2, max_batch_size=4, max_latency=0.001)
+        with self.assertRaises(ValueError):
+            batcher.predict(np.float32(1))
+        # a malformed request that reaches the worker fails alone
+        request = _Request(np.float32(1))
+        batcher._queue.put(request)
+        self.assertTrue(request.done.wait(5))
+        self.assertIsInstance(request.error, ValueError)
+        np.testing.assert_array_equal(batcher.predict(np.ones((1, 3))), np.full((1, 3), 2))
+        batcher.stop()
+
+    def test_mismatched_shapes_are_not_batched(self):
+        batch_shapes = []
+
+        def predict_fn(x):
+            batch_shapes.append(x.shape)
+            return x.sum(axis=1)
+
+        batcher = DynamicBatcher(predict_fn, max_batch_size=8, max_latency=0.05)
+        results = [None] * 8
+
+        def request(i):
+            results[i] = batcher.predict(np.ones((1, 3 + i % 2), dtype=np.float32))
+
+        threads = [threading.Thread(target=request, args=(i, )) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.stop()
+
+        for i, outputs in enumerate(results):
+            np.testing.assert_array_equal(outputs, [3 + i % 2])
+        self.assertEqual(sum(shape[0] for shape in batch_shapes), 8)
+
+    def test_http(self):
+        batcher = DynamicBatcher(lambda x: x.sum(axis=1), max_batch_size=4, max_latency=0.001)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(batcher, 'float32'))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = 'http://127.0.0.1:%d' % server.server_address[1]
+        try:
+            body = json.dumps({'inputs': [[1, 2], [3, 4]]}).encode('utf-8')
+            reply = json.loads(urlopen(url + '/predict', data=body).read())
+            self.assertEqual(reply['outputs'], [3.0, 7.0])
+            stats = json.loads(urlopen(url + '/stats').read())
+            self.assertEqual(stats['samples'], 2)
+            with self.assertRaises(HTTPError) as cm:
+                urlopen(url + '/predict', data=json.dumps({'inputs': 1}).encode('utf-8'))
+            self.assertEqual(cm.exception.code, 400)
+            reply = json.loads(urlopen(url + '/predict', data=body).read())
+            self.assertEqual(reply['outputs'], [3.0, 7.0])
+        finally:
+            server.shutdown()
+            server.server_close()
+            batcher.stop()
+
+
+if __name__ == '__main__':
+
+    unittest.main()
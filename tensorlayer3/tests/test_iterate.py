@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorlayer as tl
+
+from tests.utils import CustomTestCase
+
+
+class Iterate_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.inputs = np.arange(103 * 2).reshape(103, 2)
+        cls.targets = np.arange(103) + 1000
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_seq_minibatches(self):
+        for batch_size, seq_length, stride in [(2, 2, 1), (4, 5, 3), (3, 4, 4)]:
+            batches = list(tl.iterate.seq_minibatches(self.inputs, self.targets, batch_size, seq_length, stride))
+            n_loads = batch_size * stride + seq_length - stride
+            starts = range(0, len(self.inputs) - n_loads + 1, batch_size * stride)
+            self.assertEqual(len(batches), len(starts))
+            for (x, y), start_idx in zip(batches, starts):
+                rows = [start_idx + b * stride + i for b in range(batch_size) for i in range(seq_length)]
+                np.testing.assert_array_equal(x, self.inputs[rows])
+                np.testing.assert_array_equal(y, self.targets[rows])
+
+    def test_seq_minibatches2(self):
+        batches = list(tl.iterate.seq_minibatches2(self.inputs, self.targets, batch_size=2, num_steps=3))
+        self.assertEqual(len(batches), (51 - 1) // 3)
+        x, y = batches[1]
+        np.testing.assert_array_equal(x, self.inputs[[[3, 4, 5], [54, 55, 56]]])
+        np.testing.assert_array_equal(y, self.targets[[[3, 4, 5], [54, 55, 56]]])
+
+    def test_ptb_iterator(self):
+        raw_data = list(range(20))
+        batches = list(tl.iterate.ptb_iterator(raw_data, batch_size=2, num_steps=3))
+        self.assertEqual(len(batches), 3)
+        x, y = batches[1]
+        self.assertEqual(x.dtype, np.int32)
+        self.assertEqual(x.tolist(), [[3, 4, 5], [13, 14, 15]])
+        self.assertEqual(y.tolist(), [[4, 5, 6], [14, 15, 16]])
+
+    def test_batches_are_read_only(self):
+        corpus = np.arange(40, dtype=np.int32)
+        batches = [next(tl.iterate.seq_minibatches(self.inputs, self.targets, 2, 3, stride)) for stride in (1, 3)]
+        batches.append(next(tl.iterate.seq_minibatches2(self.inputs, self.targets, batch_size=2, num_steps=3)))
+        batches.append(next(tl.iterate.ptb_iterator(corpus, batch_size=2, num_steps=3)))
+        for x, y in batches:
+            for batch in (x, y):
+                with self.assertRaises(ValueError):
+                    batch += 1
+        np.testing.assert_array_equal(corpus, np.arange(40))
+
+    def test_ptb_iterator_token_file(self):
+        tokens = np.arange(1000, dtype=np.uint16)
+        expected = list(tl.iterate.ptb_iterator(tokens.astype(np.int32), batch_size=4, num_steps=10))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tokens.npy')
+            np.save(path, tokens)
+            batches = list(tl.iterate.ptb_iterator(path, batch_size=4, num_steps=10))
+        self.assertEqual(len(batches), len(expected))
+        for (x, y), (x_expected, y_expected) in zip(batches, expected):
+            self.assertEqual(x.dtype, np.int32)
+            np.testing.assert_array_equal(x, x_expected)
+            np.testing.assert_array_equal(y, y_expected)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
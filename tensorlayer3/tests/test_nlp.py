@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import collections
 import os
+import tempfile
 import unittest
 
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
+import numpy as np
 import tensorflow as tf
 import tensorlayer as tl
 
@@ -74,6 +77,89 @@ class Test_Leaky_ReLUs(CustomTestCase):
         # print(ids)
         # print(context)
 
+    def test_count_words(self):
+        rng = np.random.RandomState(0)
+        words = ['w%d' % i for i in rng.zipf(1.5, size=20000) if i < 5000]
+        sentences = [words[i:i + 20] for i in range(0, len(words), 20)]
+        expected = collections.Counter(words)
+
+        counter = tl.nlp.count_words(sentences, num_workers=2, chunk_size=50)
+        self.assertEqual(counter, expected)
+        self.assertEqual(list(counter.items()), list(expected.items()))
+
+        pruned = tl.nlp.count_words(sentences, chunk_size=50, max_words=100)
+        self.assertLessEqual(len(pruned), 100)
+        for word, count in expected.most_common(5):
+            self.assertEqual(pruned[word], count)
+
+        data, count, dictionary, _ = tl.nlp.build_words_dataset(words, 100, printable=False, num_workers=2)
+        self.assertEqual(count[1:], expected.most_common(99))
+        self.assertEqual(tl.nlp.build_vocab(words, num_workers=2), tl.nlp.build_vocab(words))
+
+    def test_create_vocabulary_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, 'data.txt')
+            with open(data_path, 'w') as f:
+                for i in range(300):
+                    f.write("sentence %d has words , a few %d words .\n" % (i % 7, i % 13))
+            paths = [os.path.join(tmp, 'vocab%d.txt' % n) for n in [1, 3]]
+            for path, num_workers in zip(paths, [1, 3]):
+                tl.nlp.create_vocabulary(path, data_path, 100, num_workers=num_workers, chunk_size=16)
+            vocab, rev_vocab = tl.nlp.initialize_vocabulary(paths[1])
+            self.assertEqual(rev_vocab, tl.nlp.initialize_vocabulary(paths[0])[1])
+            # digits are normalized to 0, so 10 to 12 become "00" and "0" is less frequent than "words"
+            self.assertEqual(rev_vocab[:6], [b"_PAD", b"_GO", b"_EOS", b"_UNK", b"words", b"0"])
+
+    def test_vocabulary_batch(self):
+        sentences = [['<S>', 'one', 'two', ',', 'three', '</S>'], ['<S>', 'four', 'five', 'five', '</S>'], []]
+        with tempfile.TemporaryDirectory() as tmp:
+            vocab_path = os.path.join(tmp, 'vocab.txt')
+            tl.nlp.create_vocab(sentences[:2], word_counts_output_file=vocab_path, min_word_count=1)
+            vocab = tl.nlp.Vocabulary(vocab_path, cache_size=2)
+
+        batch = sentences + [['six', 'one'], sentences[0]]
+        ids, lengths = vocab.encode_batch(batch)
+        self.assertEqual(ids.shape, (5, 6))
+        self.assertEqual(lengths.tolist(), [6, 5, 0, 2, 6])
+        for row, words in zip(ids, batch):
+            self.assertEqual(row[:len(words)].tolist(), [vocab.word_to_id(w) for w in words])
+            self.assertTrue(np.all(row[len(words):] == vocab.pad_id))
+
+        decoded = vocab.decode_batch(ids, lengths)
+        self.assertEqual(decoded[0], ' '.join(sentences[0]))
+        self.assertEqual(decoded[2], '')
+        self.assertEqual(decoded[3], '<UNK> one')
+        self.assertEqual(vocab.decode_batch(ids), decoded)
+        self.assertEqual(vocab.decode_batch([[len(vocab.reverse_vocab)]]), ['<UNK>'])
+
+        ids, lengths = vocab.encode_batch(batch, max_length=3)
+        self.assertEqual(ids.shape, (5, 3))
+        self.assertEqual(lengths.tolist(), [3, 3, 0, 2, 3])
+
+    def test_data_to_token_ids_npy(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, 'data.txt')
+            vocab_path = os.path.join(tmp, 'vocab.txt')
+            with open(data_path, 'w') as f:
+                f.write("the cat sat on the mat .\n\nthe dog ran 42 miles\n" * 50)
+            with open(vocab_path, 'w') as f:
+                f.write("_PAD\n_GO\n_EOS\n_UNK\nthe\ncat\nsat\non\nmat\n.\ndog\n00\n")
+
+            tl.nlp.data_to_token_ids(data_path, os.path.join(tmp, 'ids.txt'), vocab_path)
+            for num_workers in [1, 2]:
+                target_path = os.path.join(tmp, 'ids%d' % num_workers)
+                tl.nlp.data_to_token_ids(
+                    data_path, target_path, vocab_path, format='npy', num_workers=num_workers, chunk_size=7
+                )
+                corpus = tl.nlp.TokenIdCorpus(target_path)
+                self.assertEqual(corpus.tokens.dtype, np.uint16)
+                with open(os.path.join(tmp, 'ids.txt')) as f:
+                    expected = [[int(tok) for tok in line.split()] for line in f]
+                self.assertEqual(len(corpus), 150)
+                self.assertEqual([sentence.tolist() for sentence in corpus[:]], expected)
+                self.assertEqual(corpus[-1].tolist(), [4, 10, 3, 11, 3])
+                del corpus
+
 
 if __name__ == '__main__':
 
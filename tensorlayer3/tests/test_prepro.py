@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+import tensorlayer as tl
+
+from tests.utils import CustomTestCase
+
+
+class Threading_Data_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.images = np.random.rand(10, 16, 16, 1).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_thread_and_process_executor(self):
+        expected = self.images[:, :, ::-1]
+        for executor in ['thread', 'process']:
+            out = tl.prepro.threading_data(self.images, tl.prepro.flip_axis, executor=executor, chunk_size=3, axis=1)
+            self.assertEqual(out.dtype, np.float32)
+            np.testing.assert_array_equal(out, expected)
+
+            # with thread_count, fn gets a slice of the batch
+            out = tl.prepro.threading_data(self.images, tl.prepro.flip_axis, 3, executor=executor, axis=2)
+            np.testing.assert_array_equal(out, expected)
+
+    def test_ragged_results(self):
+        data = [np.zeros((i + 1, 2)) for i in range(5)]
+        out = tl.prepro.threading_data(data, lambda x: x + 1)
+        self.assertIsInstance(out, list)
+        for x, y in zip(data, out):
+            np.testing.assert_array_equal(x + 1, y)
+
+        with self.assertRaises(ValueError):
+            tl.prepro.threading_data(self.images, tl.prepro.flip_axis, executor='greenlet', axis=1)
+
+    def test_results_are_not_cast(self):
+        out = tl.prepro.threading_data(['a', 'bbbb', 'cc'], str.upper)
+        self.assertEqual(out.tolist(), ['A', 'BBBB', 'CC'])
+
+        out = tl.prepro.threading_data([1, 2, 3], lambda x: np.uint8(x) if x == 1 else 100 * x)
+        self.assertEqual(out.tolist(), [1, 200, 300])
+
+
+class Keypoint_Random_Affine_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.keypoints = np.random.uniform(40, 200, size=(3, 19, 2)).astype(np.float32)
+        cls.keypoints[0, 3] = -1000
+        # mark every visible keypoint in the image
+        cls.image = np.zeros((240, 320, 3), np.float32)
+        for x, y in np.rint(cls.keypoints[cls.keypoints[..., 0] >= 0]).astype(int):
+            cls.image[y - 2:y + 3, x - 2:x + 3] = 1
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_keypoints_follow_image(self):
+        mask = np.ones((240, 320), np.float32)
+        for prob in [0, 1]:
+            image, keypoints, visible, mask_ = tl.prepro.keypoint_random_affine(
+                self.image, self.keypoints, mask=mask, size=(200, 160), rg=20, prob=prob
+            )
+            self.assertEqual(image.shape, (200, 160, 3))
+            self.assertEqual(mask_.shape, (200, 160))
+            self.assertEqual(keypoints.shape, (3, 19, 2))
+            for x, y in np.rint(keypoints[visible]).astype(int):
+                self.assertGreater(image[y, x].max(), 0)
+            # the missing joint stays invisible, after flipping it is joint 6
+            self.assertFalse(visible[0, 6 if prob else 3])
+
+    def test_bad_shape(self):
+        with self.assertRaises(ValueError):
+            tl.prepro.keypoint_random_affine(self.image, self.keypoints[0])
+
+    def test_flip_list_length(self):
+        keypoints = self.keypoints[:, :14]
+        with self.assertRaises(ValueError):
+            tl.prepro.keypoint_random_affine(self.image, keypoints, size=(200, 160), prob=1)
+
+        flip_list = (0, 1, 5, 6, 7, 2, 3, 4, 11, 12, 13, 8, 9, 10)
+        for flip in [flip_list, ()]:
+            _, out, _, _ = tl.prepro.keypoint_random_affine(
+                self.image, keypoints, size=(200, 160), prob=1, flip_list=flip
+            )
+            self.assertEqual(out.shape, (3, 14, 2))
+        # without flipping the default flip_list is not used
+        tl.prepro.keypoint_random_affine(self.image, keypoints, size=(200, 160), prob=0)
+
+
+class Bucket_Sequences_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.sequences = [list(rng.randint(1, 100, size=n)) for n in rng.randint(0, 40, size=200)]
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_docstring_example(self):
+        sequences = [[1, 1, 1, 1, 1], [2, 2, 2], [3, 3], [4, 4, 4, 4]]
+        batches = list(tl.prepro.bucket_sequences(sequences, bucket_boundaries=[4], max_tokens=8))
+        self.assertEqual(
+            [x.tolist() for x, _, _ in batches], [[[3, 3, 0], [2, 2, 2]], [[4, 4, 4, 4]], [[1, 1, 1, 1, 1]]]
+        )
+        self.assertEqual(batches[0][1].tolist(), [[1, 1, 0], [1, 1, 1]])
+
+    def test_token_budget_and_coverage(self):
+        for padding in ['post', 'pre']:
+            seen = []
+            batches = tl.prepro.bucket_sequences(
+                self.sequences, bucket_boundaries=[10, 20], max_tokens=128, padding=padding, shuffle=True, seed=1
+            )
+            for x, mask, indices in batches:
+                self.assertTrue(x.flags['C_CONTIGUOUS'])
+                self.assertTrue(x.size <= 128 or len(indices) == 1)
+                self.assertEqual(x.shape[1], max(len(self.sequences[i]) for i in indices))
+                for row, i in enumerate(indices):
+                    tokens = x[row][mask[row] == 1].tolist()
+                    self.assertEqual(tokens, self.sequences[i])
+                seen.extend(indices.tolist())
+            self.assertEqual(sorted(seen), list(range(len(self.sequences))))
+
+    def test_max_batch_size(self):
+        batches = list(tl.prepro.bucket_sequences([[1]] * 10, max_tokens=100, max_batch_size=4))
+        self.assertEqual([len(indices) for _, _, indices in batches], [4, 4, 2])
+
+    def test_pad_sequences(self):
+        out = tl.prepro.pad_sequences([[1, 1, 1, 1, 1], [2, 2, 2], [3, 3]], value=9)
+        self.assertEqual(out, [[1, 1, 1, 1, 1], [2, 2, 2, 9, 9], [3, 3, 9, 9, 9]])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+from tensorlayer.vision import transforms
+
+from tests.utils import CustomTestCase
+
+
+class Vision_Transforms_Affine_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # a smooth image, so that resampling errors stay small
+        y, x = np.mgrid[0:64, 0:64]
+        cls.image = np.stack([x * 2, y * 2, (x + y)], axis=-1).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_fused_matches_chained(self):
+        steps = [
+            transforms.RandomRotation(degrees=(20, 20)),
+            transforms.RandomShear(degrees=(10, 10)),
+            transforms.RandomZoom(zoom=(1.2, 1.2)),
+            transforms.RandomShift(shift=(0.1, 0.05)),
+        ]
+        np.random.seed(0)
+        fused = np.asarray(transforms.Compose(steps)(self.image))
+        np.random.seed(0)
+        chained = np.asarray(transforms.Compose(steps, fuse_affine=False)(self.image))
+
+        center = (slice(16, 48), slice(16, 48))
+        self.assertEqual(fused.shape, self.image.shape)
+        self.assertLess(np.max(np.abs(fused[center] - chained[center])), 1.0)
+
+    def test_fused_shift_matches_chained(self):
+        image = np.zeros((64, 64, 1), np.float32)
+        image[20, 30] = 255
+        shift = transforms.RandomShift(shift=(0.2, 0))
+        np.random.seed(0)
+        fused = np.asarray(transforms.Compose([shift])(image))[..., 0]
+        np.random.seed(0)
+        chained = np.asarray(shift(image))[..., 0]
+        # the first shift fraction moves the image along x only
+        self.assertEqual(np.argmax(fused) // 64, 20)
+        self.assertEqual(
+            np.unravel_index(np.argmax(fused), fused.shape), np.unravel_index(np.argmax(chained), chained.shape)
+        )
+
+    def test_rotation_is_counter_clockwise(self):
+        image = np.zeros((21, 21, 1), np.uint8)
+        image[10, 15] = 255
+        transform = transforms.Compose([transforms.RandomRotation(degrees=(90, 90), interpolation='nearest')])
+        batched = transforms.Compose(transform.transforms, batched=True)
+        for out in [np.asarray(transform(image)), batched(image[None])[0]]:
+            rows, cols = np.nonzero(out[..., 0])
+            self.assertTrue(np.all(rows < 10) and np.all(np.abs(cols - 10) <= 1))
+
+    def test_fuse_runs(self):
+        transform = transforms.Compose(
+            [
+                transforms.RandomRotation(degrees=10),
+                transforms.RandomShear(degrees=10),
+                transforms.RandomZoom(zoom=(0.9, 1.1), fill=1),
+                transforms.RandomRotation(degrees=10, expand=True),
+                transforms.RandomShift(shift=(0.1, 0.1)),
+            ]
+        )
+        runs = [len(t) if isinstance(t, list) else 0 for t in transform._fuse_affine_runs()]
+        self.assertEqual(runs, [2, 1, 0, 1])
+        transform.fuse_affine = False
+        self.assertEqual(transform._fuse_affine_runs(), transform.transforms)
+
+    def test_batched_matches_per_image(self):
+        transform = transforms.Compose(
+            [transforms.RandomShear(degrees=(15, 15)),
+             transforms.RandomZoom(zoom=(0.8, 0.8))]
+        )
+        per_image = np.asarray(transform(self.image))
+        transform.batched = True
+        batched = transform(np.stack([self.image, self.image]))
+        self.assertEqual(batched.shape, (2, 64, 64, 3))
+        # cv2 interpolates with fixed point weights, compare away from the border
+        center = (slice(16, 48), slice(16, 48))
+        self.assertLess(np.mean(np.abs(batched[0][center] - per_image[center])), 0.5)
+        np.testing.assert_array_equal(batched[0], batched[1])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
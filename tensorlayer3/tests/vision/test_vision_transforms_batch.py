@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+import numpy as np
+from tensorlayer.vision import transforms
+
+from tests.utils import CustomTestCase
+
+
+class Vision_Transforms_Batch_Test(CustomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        cls.images = (rng.rand(16, 12, 10, 3) * 255.).astype(np.uint8)
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def test_deterministic_ops_match_per_image(self):
+        for transform in [
+                transforms.FlipHorizontal(),
+                transforms.FlipVertical(),
+                transforms.Normalize(mean=(155.0, 100.0, 50.0), std=(75.0, 70.0, 65.0)),
+                transforms.StandardizePerImage(),
+        ]:
+            batched = transforms.Compose([transform], batched=True)(self.images)
+            expected = np.stack([np.asarray(transform(image)) for image in self.images])
+            np.testing.assert_allclose(batched, expected, rtol=1e-5, atol=1e-4)
+
+        for transform in [
+                transforms.AdjustBrightness(1.5),
+                transforms.AdjustContrast(0.5),
+                transforms.AdjustSaturation(1.5),
+                transforms.AdjustHue(0.2),
+        ]:
+            batched = transforms.Compose([transform], batched=True)(self.images)
+            expected = np.stack([np.asarray(transform(image)) for image in self.images])
+            self.assertEqual(batched.dtype, np.uint8)
+            self.assertLessEqual(np.max(np.abs(batched.astype(np.int32) - expected)), 2)
+
+        # invalid factors are rejected like in the per-image ops
+        for transform in [
+                transforms.AdjustBrightness(-0.5),
+                transforms.AdjustContrast(-0.5),
+                transforms.AdjustSaturation(-0.5),
+                transforms.AdjustHue(0.7),
+        ]:
+            with self.assertRaises(ValueError):
+                transform.batch_call(self.images)
+
+    def test_random_ops_draw_per_sample(self):
+        flipped = transforms.RandomFlipHorizontal(prob=0.5).batch_call(self.images)
+        is_flipped = [np.array_equal(out, image[:, ::-1]) for out, image in zip(flipped, self.images)]
+        is_same = [np.array_equal(out, image) for out, image in zip(flipped, self.images)]
+        self.assertTrue(all(f or s for f, s in zip(is_flipped, is_same)))
+        self.assertTrue(any(is_flipped) and any(is_same))
+
+        cropped = transforms.RandomCrop(size=(8, 6), padding=2).batch_call(self.images)
+        self.assertEqual(cropped.shape, (16, 8, 6, 3))
+        padded = np.pad(self.images, ((0, 0), (2, 2), (2, 2), (0, 0)))
+        offsets = set()
+        for out, image in zip(cropped, padded):
+            matches = [
+                (y, x)
+                for y in range(image.shape[0] - 7)
+                for x in range(image.shape[1] - 5)
+                if np.array_equal(image[y:y + 8, x:x + 6], out)
+            ]
+            self.assertTrue(matches)
+            offsets.add(matches[0])
+        self.assertGreater(len(offsets), 1)
+
+        brightness = transforms.RandomBrightness(brightness_factor=(0.5, 1.5)).batch_call(self.images)
+        ratios = brightness.reshape(16, -1).astype(np.float32).sum(1) / self.images.reshape(16, -1).sum(1)
+        self.assertGreater(np.std(ratios), 0.01)
+
+    def test_compose_batched(self):
+        transform = transforms.Compose(
+            [
+                transforms.RandomCrop(size=8),
+                transforms.Resize(size=(6, 6)),
+                transforms.ColorJitter(brightness=0.4, contrast=0.4, saturation=0.4, hue=0.1),
+                transforms.RandomFlipVertical(),
+                transforms.Normalize(mean=(127.0, 127.0, 127.0), std=(64.0, 64.0, 64.0)),
+                transforms.HWC2CHW(),
+            ], batched=True
+        )
+        images = transform(self.images)
+        self.assertEqual(images.shape, (16, 3, 6, 6))
+        self.assertEqual(images.dtype, np.float32)
+
+        with self.assertRaises(ValueError):
+            transforms.Compose([transforms.FlipHorizontal()], batched=True)(self.images[0])
+
+
+if __name__ == '__main__':
+
+    unittest.main()